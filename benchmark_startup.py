@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# benchmark_startup.py
+#
+# Measures how long a fresh worker takes to be ready: Django setup with
+# formsaurus' models, importing the respondent and manage views, and the
+# latency of the first requests to the respondent views compared to the
+# following ones. Each run is a new interpreter, as a new worker would be.
+#
+#   python benchmark_startup.py [runs]
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+# Modules formsaurus only needs on first use, they should not be loaded at startup
+LAZY_MODULES = ['requests', 'dateutil', 'django.test']
+
+
+def imports():
+    start = time.perf_counter()
+    from boot_django import boot_django
+    boot_django()
+    setup = time.perf_counter()
+    import formsaurus.views  # noqa: F401
+    respondent = time.perf_counter()
+    import formsaurus.manage.views  # noqa: F401
+    manage = time.perf_counter()
+    return {
+        'setup': setup - start,
+        'respondent views': respondent - setup,
+        'manage views': manage - respondent,
+        'loaded': [name for name in LAZY_MODULES if name in sys.modules],
+    }
+
+
+def first_requests():
+    from boot_django import boot_django
+    boot_django()
+    from django.conf import settings
+    from django.test.utils import setup_test_environment
+    from django.test.runner import DiscoverRunner
+    setup_test_environment()
+    settings.ALLOWED_HOSTS = ['testserver']
+    runner = DiscoverRunner(verbosity=0)
+    databases = runner.setup_databases()
+    try:
+        from django.contrib.auth import get_user_model
+        from django.test import Client
+        from django.urls import reverse
+        from formsaurus.models import Survey, Submission
+
+        user = get_user_model().objects.create_user('benchmark')
+        survey = Survey.objects.create(name='Benchmark', user=user)
+        survey.add_welcome_screen('Welcome!')
+        survey.add_multiple_choice('Flavor?', required=True, choices=['Vanilla', 'Chocolate'])
+        survey.add_short_text('Name?', required=True)
+        survey.add_date('Birthday?', required=True)
+        survey.publish()
+
+        client = Client()
+        timings = {}
+        for label in ['first', 'next']:
+            start = time.perf_counter()
+            client.get(reverse('formsaurus:survey', args=[survey.id]))
+            timings[f'survey ({label})'] = time.perf_counter() - start
+            submission = Submission.objects.filter(survey=survey).order_by('-created_at').first()
+            for question in survey.questions:
+                url = reverse('formsaurus:question', args=[survey.id, question.id, submission.id])
+                start = time.perf_counter()
+                client.get(url)
+                elapsed = time.perf_counter() - start
+                timings.setdefault(f'questions ({label})', 0)
+                timings[f'questions ({label})'] += elapsed
+        return timings
+    finally:
+        runner.teardown_databases(databases)
+
+
+def run(mode):
+    output = subprocess.run([sys.executable, __file__, '--child', mode],
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def report(results):
+    for key in results[0]:
+        if key == 'loaded':
+            loaded = sorted(set(name for result in results for name in result[key]))
+            print(f"{'loaded at startup':>24}: {', '.join(loaded) or 'none of ' + ', '.join(LAZY_MODULES)}")
+            continue
+        values = [result[key] * 1000 for result in results]
+        print(f"{key:>24}: median {statistics.median(values):7.1f} ms, min {min(values):7.1f} ms")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ['--child']:
+        mode = imports if sys.argv[2] == 'imports' else first_requests
+        print(json.dumps(mode()))
+        sys.exit(0)
+
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print(f"Import time, {runs} run(s)")
+    report([run('imports') for _ in range(runs)])
+    print(f"Request latency, {runs} run(s)")
+    report([run('requests') for _ in range(runs)])
@@ -17,7 +17,15 @@ def boot_django():
             "default":{
                 "ENGINE":"django.db.backends.sqlite3",
                 "NAME": os.path.join(BASE_DIR, "db.sqlite3"),
-            }
+            },
+            "replica":{
+                "ENGINE":"django.db.backends.sqlite3",
+                "NAME": os.path.join(BASE_DIR, "replica.sqlite3"),
+            },
+            "shard1":{
+                "ENGINE":"django.db.backends.sqlite3",
+                "NAME": os.path.join(BASE_DIR, "shard1.sqlite3"),
+            },
         },
         INSTALLED_APPS=(
             'formsaurus',
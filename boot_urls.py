@@ -2,4 +2,5 @@ from django.urls import path, include
 
 urlpatterns = [
     path('', include('formsaurus.urls')),
+    path('', include('formsaurus.manage.urls')),
 ]
\ No newline at end of file
@@ -0,0 +1,197 @@
+import json
+import logging
+import zlib
+
+from django.core import serializers
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, transaction
+
+from formsaurus.models import (ANSWER_MODELS, ArchivedSubmission, Choice, FilledField, HiddenField,
+                               Submission, SubmissionArchive)
+from formsaurus.utils import get_answer_storage
+
+logger = logging.getLogger('formsaurus')
+
+#
+# An archive document is laid out by column, rows being the archived
+# submissions:
+#
+# {
+#     'submissions': {'id': [...], 'created_at': [...], 'completed_at': [...]},
+#     'fields': {hidden field name: [value, ...]},
+#     'answers': {
+#         question id: {
+#             'model': 'formsaurus.shorttextanswer',
+#             'id': [answer id or None, ...],
+#             'fields': {field name: [value, ...]},
+#             'choices': [[choice id, ...], ...],  # choice based answers only
+#         },
+#     },
+# }
+#
+# The summary stored next to it counts boolean, small integer and choice
+# values per question so stats never have to decompress an archive.
+#
+
+
+def encode(document):
+    return zlib.compress(json.dumps(document, cls=DjangoJSONEncoder).encode('utf-8'), 9)
+
+
+def decode(data):
+    return json.loads(zlib.decompress(bytes(data)).decode('utf-8'))
+
+
+def summarized(field):
+    return isinstance(field, (models.BooleanField, models.PositiveSmallIntegerField))
+
+
+def build_document(submissions):
+    size = len(submissions)
+    ids = [submission.id for submission in submissions]
+    index = {str(submission.id): i for i, submission in enumerate(submissions)}
+    document = {
+        'submissions': {
+            'id': [str(submission.id) for submission in submissions],
+            'created_at': [submission.created_at for submission in submissions],
+            'completed_at': [submission.completed_at for submission in submissions],
+        },
+        'fields': {},
+        'answers': {},
+    }
+    summary = {}
+
+    for field in FilledField.objects.filter(submission__in=ids).select_related('field'):
+        column = document['fields'].setdefault(field.field.name, [None] * size)
+        column[index[str(field.submission_id)]] = field.value
+
+    for model in ANSWER_MODELS.values():
+        names = [field.name for field in model._meta.concrete_fields
+                 if not field.primary_key and field.name not in ['question', 'submission']]
+        has_choices = any(field.name == 'choices' for field in model._meta.many_to_many)
+        qs = model.objects.filter(submission__in=ids)
+        if has_choices:
+            qs = qs.prefetch_related('choices')
+        for answer in qs:
+            record = serializers.serialize('python', [answer], fields=names)[0]
+            question_id = str(answer.question_id)
+            row = index[str(answer.submission_id)]
+            column = document['answers'].get(question_id)
+            if column is None:
+                column = {
+                    'model': record['model'],
+                    'id': [None] * size,
+                    'fields': {name: [None] * size for name in names},
+                }
+                if has_choices:
+                    column['choices'] = [None] * size
+                document['answers'][question_id] = column
+            column['id'][row] = record['pk']
+            counts = summary.setdefault(question_id, {})
+            for name in names:
+                column['fields'][name][row] = record['fields'][name]
+                if summarized(model._meta.get_field(name)):
+                    value = str(getattr(answer, name))
+                    counts.setdefault(name, {})
+                    counts[name][value] = counts[name].get(value, 0) + 1
+            if has_choices:
+                choices = [str(choice.pk) for choice in answer.choices.all()]
+                column['choices'][row] = choices
+                counts.setdefault('choices', {})
+                for choice in choices:
+                    counts['choices'][choice] = counts['choices'].get(choice, 0) + 1
+
+    return document, summary
+
+
+def archive_survey(survey, before, batch_size=500):
+    """
+    Moves the completed submissions of a survey completed before `before`
+    into archives of at most `batch_size` submissions.
+    Returns the number of archived submissions.
+    """
+    # Pending answers have to reach the answer tables before being archived
+    get_answer_storage().compact(survey=survey)
+
+    count = 0
+    while True:
+        submissions = list(Submission.objects.filter(
+            survey=survey,
+            is_preview=False,
+            completed=True,
+            completed_at__lt=before,
+        ).order_by('completed_at')[:batch_size])
+        if len(submissions) == 0:
+            break
+        with transaction.atomic():
+            document, summary = build_document(submissions)
+            archive = SubmissionArchive.objects.create(
+                survey_id=survey.id,
+                count=len(submissions),
+                summary=json.dumps(summary),
+                data=encode(document),
+            )
+            ArchivedSubmission.objects.bulk_create([
+                ArchivedSubmission(
+                    id=submission.id,
+                    survey_id=survey.id,
+                    archive=archive,
+                    created_at=submission.created_at,
+                    completed_at=submission.completed_at,
+                ) for submission in submissions
+            ])
+            Submission.objects.filter(pk__in=[submission.id for submission in submissions]).delete()
+        logger.info(f'Archived {len(submissions)} submission(s) of survey {survey.id} into {archive.id}')
+        count = count + len(submissions)
+    return count
+
+
+def archived_summary(survey):
+    """Returns the merged archive summaries of a survey, {question id: {field: {value: count}}}"""
+    merged = {}
+    for summary in SubmissionArchive.objects.filter(survey_id=survey.id).values_list('summary', flat=True):
+        for question_id, fields in json.loads(summary).items():
+            question = merged.setdefault(question_id, {})
+            for name, counts in fields.items():
+                field = question.setdefault(name, {})
+                for value, count in counts.items():
+                    field[value] = field.get(value, 0) + count
+    return merged
+
+
+def archived_answers(archived):
+    """Rebuilds the (unsaved) answers of an archived submission"""
+    document = archived.archive.document
+    submission_id = str(archived.id)
+    row = document['submissions']['id'].index(submission_id)
+    answers = []
+    for question_id, column in document['answers'].items():
+        if column['id'][row] is None:
+            continue
+        fields = {name: values[row] for name, values in column['fields'].items()}
+        fields['question'] = question_id
+        fields['submission'] = submission_id
+        answer = next(serializers.deserialize('python', [{
+            'model': column['model'],
+            'pk': column['id'][row],
+            'fields': fields,
+        }], ignorenonexistent=True)).object
+        answer._state.adding = False
+        if 'choices' in column:
+            answer._prefetched_objects_cache = {
+                'choices': Choice.objects.filter(pk__in=column['choices'][row]).order_by('position'),
+            }
+        answers.append(answer)
+    return answers
+
+
+def archived_filled_fields(archived):
+    """Rebuilds the (unsaved) hidden fields of an archived submission"""
+    document = archived.archive.document
+    row = document['submissions']['id'].index(str(archived.id))
+    hidden_fields = {field.name: field for field in HiddenField.objects.filter(survey_id=archived.survey_id)}
+    fields = []
+    for name, values in document['fields'].items():
+        field = hidden_fields.get(name, HiddenField(survey_id=archived.survey_id, name=name))
+        fields.append(FilledField(field=field, value=values[row]))
+    return fields
@@ -0,0 +1,90 @@
+import re
+import unicodedata
+
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+
+from formsaurus.models import MAX_DIGITS, PRECISION, DateParameters
+
+#
+# Parsers compiled from the parameters of a question.
+#
+# Parsers are built once per distinct set of parameters and shared by every
+# question using them, Question.parser keeps the one of a question for the
+# lifetime of the instance. They return the parsed value or raise
+# ValueError when the input is invalid or out of range.
+#
+
+# Order of the year, month and day groups for each DateParameters format
+DATE_ORDERS = {
+    DateParameters.YYYYMMDD: ('year', 'month', 'day'),
+    DateParameters.DDMMYYYY: ('day', 'month', 'year'),
+    DateParameters.MMDDYYYY: ('month', 'day', 'year'),
+}
+
+DATE_GROUPS = {
+    'year': r'(?P<year>\d{4})',
+    'month': r'(?P<month>\d{1,2})',
+    'day': r'(?P<day>\d{1,2})',
+}
+
+
+@lru_cache(maxsize=None)
+def date_parser(date_format, date_separator):
+    """Strict parser for dates written as `date_format` with `date_separator`"""
+    order = DATE_ORDERS.get(date_format, DATE_ORDERS[DateParameters.YYYYMMDD])
+    pattern = re.compile(re.escape(date_separator or '/').join(DATE_GROUPS[part] for part in order))
+
+    def parse(raw):
+        match = pattern.fullmatch(raw.strip())
+        if match is None:
+            raise ValueError(f'Expected a date formatted as {date_format}{date_separator}')
+        # date() validates the day of the month
+        return date(int(match['year']), int(match['month']), int(match['day']))
+
+    return parse
+
+
+def compile_date(parameters):
+    return date_parser(parameters.date_format, parameters.date_separator)
+
+
+def parse_decimal(raw):
+    """Decimal value of `raw`, which can also be a single numeric character such as '四'"""
+    raw = raw.strip()
+    try:
+        number = Decimal(raw)
+    except InvalidOperation:
+        if len(raw) != 1:
+            raise ValueError(f'{raw} is not a number')
+        number = Decimal(str(unicodedata.numeric(raw)))
+    if not number.is_finite():
+        raise ValueError(f'{raw} is not a number')
+    return number
+
+
+@lru_cache(maxsize=1024)
+def number_parser(min_value, max_value):
+    """Parser for numbers between `min_value` and `max_value`, None meaning unbounded"""
+    # Largest number NumberAnswer can store
+    limit = Decimal(10) ** (MAX_DIGITS - PRECISION)
+
+    def parse(raw):
+        number = parse_decimal(raw)
+        if abs(number) >= limit:
+            raise ValueError(f'{number} has too many digits')
+        if min_value is not None and number < min_value:
+            raise ValueError(f'{number} is lower than {min_value}')
+        if max_value is not None and number > max_value:
+            raise ValueError(f'{number} is greater than {max_value}')
+        return number
+
+    return parse
+
+
+def compile_number(parameters):
+    return number_parser(
+        parameters.min_value if parameters.enable_min else None,
+        parameters.max_value if parameters.enable_max else None,
+    )
@@ -0,0 +1,69 @@
+import hashlib
+
+from django.conf import settings
+from django.db.models import Max
+from django.middleware.csrf import get_token
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+#
+# Conditional GET for respondent pages.
+#
+# Respondent pages only change when their survey or one of its questions
+# is edited (editing parameters or choices saves the question too), so
+# their ETag and Last-Modified derive from those modified_at. Published
+# surveys are immutable versions (see formsaurus.versions), publishing
+# saved the survey after its questions: its own modified_at is enough,
+# without querying the questions. Pages of a
+# published survey that are the same for everyone are public and can be
+# kept by a reverse proxy for FORMSAURUS_PUBLIC_CACHE_MAX_AGE seconds,
+# pages of a submission are private and revalidated on every visit.
+#
+# Pages embedding a form carry a CSRF token: their ETag also covers the
+# client's CSRF secret and they have no Last-Modified, so a client whose
+# secret rotated (login, flushed session, expired cookie) gets a fresh
+# page instead of a 304 with a dead token; the cookie is (re)sent either way.
+#
+
+
+def public_max_age():
+    return getattr(settings, 'FORMSAURUS_PUBLIC_CACHE_MAX_AGE', 60)
+
+
+def survey_last_modified(survey):
+    """Last change to a survey or to one of its questions"""
+    if survey.published:
+        return survey.modified_at
+    last = survey.question_set.aggregate(last=Max('modified_at'))['last']
+    if last is None or last < survey.modified_at:
+        return survey.modified_at
+    return last
+
+
+def conditional_page(request, survey, render, variant='', public=False, form=False):
+    """
+    Response of `render()` with validators for the current version of
+    `survey`, or a 304 Not Modified when the client's copy is current.
+    `variant` distinguishes pages of the same survey, e.g. a submission,
+    `form` marks pages embedding a CSRF token.
+    """
+    last_modified = survey_last_modified(survey)
+    timestamp = int(last_modified.timestamp())
+    version = f'{survey.id}:{last_modified.isoformat()}:{variant}'
+    if form:
+        # Creates the secret if the client has none, and sends the cookie even with a 304
+        get_token(request)
+        version = f"{version}:{request.META.get('CSRF_COOKIE', '')}"
+    etag = quote_etag(hashlib.sha1(version.encode('utf-8')).hexdigest())
+
+    response = get_conditional_response(request, etag=etag, last_modified=None if form else timestamp)
+    if response is None:
+        response = render()
+    response['ETag'] = etag
+    if not form:
+        response['Last-Modified'] = http_date(timestamp)
+    if public and survey.published:
+        patch_cache_control(response, public=True, max_age=public_max_age())
+    else:
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
@@ -0,0 +1,122 @@
+import random
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from formsaurus.models import ArchivedSubmission, Submission, Survey, SurveyCounter
+
+#
+# Denormalized submission counters.
+#
+# Survey.submission_count and Survey.completed_count count the responses
+# to a survey (archived ones included, previews excluded) so listing
+# surveys never aggregates submissions. Completions are counted on the
+# survey row by Submission.complete, which also enforces the quota.
+# Every visit starts a submission though, and a popular survey would
+# serialize its respondents on that one row: with FORMSAURUS_COUNTER_SLOTS
+# set, new submissions are counted in one of that many SurveyCounter rows
+# picked at random, and `counts()` adds them up. `fold()` moves slot
+# totals back to the survey row, `reconcile()` recounts from the
+# submissions, see the formsaurus_reconcile_counters command.
+#
+# A published version's counters include those of the versions before
+# it, see formsaurus.versions.
+#
+
+
+def counter_slots():
+    return getattr(settings, 'FORMSAURUS_COUNTER_SLOTS', 0)
+
+
+def submission_started(submission):
+    """Counts a new, published, submission"""
+    using = submission._state.db
+    survey_id = submission.counted_survey_id
+    slots = counter_slots()
+    if slots <= 0:
+        Survey.objects.using(using).filter(pk=survey_id).update(
+            submission_count=F('submission_count') + 1)
+        return
+    slot = random.randrange(slots)
+    counters = SurveyCounter.objects.using(using).filter(survey_id=survey_id, slot=slot)
+    if counters.update(submission_count=F('submission_count') + 1) == 0:
+        try:
+            with transaction.atomic(using=using):
+                SurveyCounter.objects.using(using).create(
+                    survey_id=survey_id, slot=slot, submission_count=1)
+        except IntegrityError:
+            # Created concurrently
+            counters.update(submission_count=F('submission_count') + 1)
+
+
+def counts(surveys):
+    """
+    {survey id: (submissions, completed)} for `surveys`, all on the same
+    database, without aggregating submissions.
+    """
+    results = {survey.id: (survey.submission_count, survey.completed_count) for survey in surveys}
+    if counter_slots() <= 0 or len(results) == 0:
+        return results
+    using = surveys[0]._state.db
+    pending = SurveyCounter.objects.using(using).filter(survey_id__in=list(results)).values('survey_id').annotate(
+        submissions=Sum('submission_count')).order_by()
+    for row in pending:
+        submissions, completed = results[row['survey_id']]
+        results[row['survey_id']] = (submissions + row['submissions'], completed)
+    return results
+
+
+def fold(using, survey_ids=None):
+    """Adds the slot counters to their survey rows and deletes them, returns the number of surveys"""
+    qs = SurveyCounter.objects.using(using)
+    if survey_ids is not None:
+        qs = qs.filter(survey_id__in=survey_ids)
+    folded = 0
+    for survey_id in qs.values_list('survey_id', flat=True).distinct():
+        with transaction.atomic(using=using):
+            rows = list(SurveyCounter.objects.using(using).select_for_update().filter(survey_id=survey_id))
+            total = sum(row.submission_count for row in rows)
+            Survey.objects.using(using).filter(pk=survey_id).update(submission_count=F('submission_count') + total)
+            SurveyCounter.objects.using(using).filter(pk__in=[row.pk for row in rows]).delete()
+        folded = folded + 1
+    return folded
+
+
+def counted(model, using, **filters):
+    qs = model.objects.using(using).filter(survey=OuterRef('pk'), **filters).order_by().values('survey')
+    return Coalesce(Subquery(qs.annotate(count=Count('pk')).values('count'), output_field=IntegerField()), Value(0))
+
+
+def reconcile(using, survey_ids=None):
+    """
+    Recounts the submissions of surveys in one UPDATE, then adds the
+    counters of their previous versions to published versions. Returns
+    the number of surveys.
+    """
+    with transaction.atomic(using=using):
+        surveys = Survey.objects.using(using)
+        counters = SurveyCounter.objects.using(using)
+        if survey_ids is not None:
+            # With all the versions of their survey
+            heads = set(survey_ids) | set(surveys.filter(pk__in=survey_ids, superseded_by__isnull=False).values_list(
+                'superseded_by_id', flat=True))
+            surveys = surveys.filter(Q(pk__in=heads) | Q(superseded_by__in=heads))
+            counters = counters.filter(survey_id__in=surveys.values('pk'))
+        counters.delete()
+        archived = counted(ArchivedSubmission, using)
+        reconciled = surveys.update(
+            submission_count=counted(Submission, using, is_preview=False) + archived,
+            completed_count=counted(Submission, using, is_preview=False, completed=True) + archived,
+        )
+        # Oldest versions first, each one adds up the ones before it
+        versions = surveys.filter(published=True, previous_version__isnull=False).order_by('version')
+        for pk, previous_id in versions.values_list('pk', 'previous_version_id'):
+            previous = Survey.objects.using(using).filter(pk=previous_id).values_list(
+                'submission_count', 'completed_count').first()
+            if previous is not None:
+                Survey.objects.using(using).filter(pk=pk).update(
+                    submission_count=F('submission_count') + previous[0],
+                    completed_count=F('completed_count') + previous[1])
+        return reconciled
@@ -0,0 +1,160 @@
+import logging
+
+from django.conf import settings
+from django.db import connections, models, transaction
+from django.db.models import Subquery
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from formsaurus.counters import reconcile
+from formsaurus.models import Submission
+from formsaurus.utils import get_survey_model
+
+logger = logging.getLogger('formsaurus')
+
+Survey = get_survey_model()
+
+#
+# Bulk deletion without Django's collector, which loads every related row
+# in memory before deleting anything.
+#
+# Relations are walked from the model being deleted: rows pointing to it
+# with on_delete=CASCADE (including many to many through tables) are
+# deleted first, in chunks of raw `DELETE ... WHERE id IN (SELECT ...)`,
+# nullable references with on_delete=SET_NULL are cleared with an UPDATE.
+# Chunks are committed one by one and the root rows are deleted last, so
+# an interrupted deletion can simply be run again. Signals are not sent.
+#
+# Requests don't delete surveys themselves: `schedule_survey_deletion`
+# marks the survey deleted, which hides it right away, and hands it over
+# to the task configured with FORMSAURUS_DELETION_TASK, a dotted path to
+# a callable taking the survey id and its database (e.g. a function
+# queueing a job that calls `delete_survey`). Without one, run
+# `formsaurus_delete --pending` periodically.
+#
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def relations(model):
+    """Relations pointing to `model`, including hidden many to many through tables"""
+    return [
+        field for field in model._meta.get_fields(include_hidden=True)
+        if field.auto_created and not field.concrete and (field.one_to_many or field.one_to_one)
+    ]
+
+
+def prefixed(filters, name):
+    return {f'{name}__{key}': value for key, value in filters.items()}
+
+
+def delete_chunks(model, filters, using, chunk_size):
+    """Deletes the rows of `model` matching `filters`, `chunk_size` rows at a time"""
+    connection = connections[using]
+    file_fields = [field for field in model._meta.concrete_fields if isinstance(field, models.FileField)]
+    qs = model._base_manager.using(using).filter(**filters)
+    deleted = 0
+    while True:
+        chunk = qs.values('pk')[:chunk_size]
+        if len(file_fields) > 0 or not connection.features.allow_sliced_subqueries_with_in:
+            pks = list(chunk.values_list('pk', flat=True))
+            if len(pks) == 0:
+                break
+            files = []
+            for field in file_fields:
+                for name in model._base_manager.using(using).filter(pk__in=pks).values_list(field.attname, flat=True):
+                    if name:
+                        files.append((field, name))
+            count = model._base_manager.using(using).filter(pk__in=pks)._raw_delete(using)
+            delete_files(files)
+        else:
+            count = model._base_manager.using(using).filter(pk__in=Subquery(chunk))._raw_delete(using)
+        deleted = deleted + count
+        if count < chunk_size:
+            break
+    return deleted
+
+
+def delete_files(files):
+    for field, name in files:
+        try:
+            field.storage.delete(name)
+        except Exception:
+            logger.exception(f'Could not delete {name}')
+
+
+def bulk_delete(model, filters, using, chunk_size=DEFAULT_CHUNK_SIZE, _stack=()):
+    """
+    Deletes the rows of `model` matching `filters` and everything depending
+    on them. Returns the number of deleted rows per model label.
+    """
+    if model in _stack:
+        raise ValueError(f'Cascading cycle through {model._meta.label}')
+    counts = {}
+    for relation in relations(model):
+        related_model = relation.related_model
+        related_filters = prefixed(filters, relation.field.name)
+        on_delete = relation.on_delete
+        if on_delete == models.CASCADE:
+            for label, count in bulk_delete(related_model, related_filters, using,
+                                            chunk_size=chunk_size, _stack=_stack + (model,)).items():
+                counts[label] = counts.get(label, 0) + count
+        elif on_delete == models.SET_NULL:
+            related_model._base_manager.using(using).filter(**related_filters).update(
+                **{relation.field.name: None})
+        elif on_delete == models.DO_NOTHING:
+            continue
+        else:
+            raise ValueError(f'Cannot bulk delete through {relation.field} ({on_delete.__name__})')
+    count = delete_chunks(model, filters, using, chunk_size)
+    counts[model._meta.label] = counts.get(model._meta.label, 0) + count
+    return counts
+
+
+def delete_survey(survey, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Deletes a survey with its questions, submissions and answers"""
+    using = survey._state.db or 'default'
+    counts = bulk_delete(type(survey), {'pk': survey.pk}, using, chunk_size=chunk_size)
+    logger.info(f'Deleted survey {survey.pk}: {counts}')
+    return counts
+
+
+def delete_submissions(survey, is_preview=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Deletes the submissions of a survey, optionally only preview ones"""
+    using = survey._state.db or 'default'
+    filters = {'survey': survey.pk}
+    if is_preview is not None:
+        filters['is_preview'] = is_preview
+    counts = bulk_delete(Submission, filters, using, chunk_size=chunk_size)
+    if is_preview is not True:
+        # Published submissions are counted, see formsaurus.counters
+        reconcile(using, [survey.pk])
+        survey.refresh_from_db(using=using, fields=survey.COUNTERS)
+    logger.info(f'Deleted submissions of survey {survey.pk}: {counts}')
+    return counts
+
+
+def deletion_task():
+    path = getattr(settings, 'FORMSAURUS_DELETION_TASK', None)
+    return import_string(path) if path is not None else None
+
+
+def schedule_survey_deletion(survey):
+    """Marks a survey deleted and hands it over to the deletion task once the current transaction commits"""
+    using = survey._state.db or 'default'
+    survey.deleted_at = timezone.now()
+    type(survey).objects.using(using).filter(pk=survey.pk).update(deleted_at=survey.deleted_at)
+    task = deletion_task()
+    if task is not None:
+        survey_id = survey.pk
+        transaction.on_commit(lambda: task(survey_id, using), using=using)
+
+
+def delete_pending_surveys(using, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Deletes the surveys marked deleted on `using`, returns the number of deleted rows per model label"""
+    counts = {}
+    for survey in Survey.objects.using(using).filter(deleted_at__isnull=False):
+        for label, count in delete_survey(survey, chunk_size=chunk_size).items():
+            counts[label] = counts.get(label, 0) + count
+    return counts
+
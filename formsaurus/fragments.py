@@ -0,0 +1,75 @@
+import hashlib
+import json
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.middleware.csrf import get_token
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+#
+# Cache of rendered question fragments.
+#
+# A question renders the same for every respondent but for the submission
+# id in its form action and the CSRF token. Fragments are rendered once
+# with placeholders for those, cached under a digest of everything else
+# the template is given (the serialized question with its parameters and
+# choices, the survey, layout, shape, error flag and host), and the
+# placeholders are replaced for each respondent. Editing a question
+# changes its serialized form, hence its key: stale entries simply expire.
+# A randomized question is cached once per order of its choices, see
+# FORMSAURUS_CHOICE_VARIANTS.
+#
+# Enable it with FORMSAURUS_FRAGMENT_CACHE set to a cache alias.
+#
+
+PLACEHOLDER_SUBMISSION = str(uuid.UUID(int=0))
+PLACEHOLDER_CSRF_TOKEN = 'formsaurus-csrf-token-placeholder'
+
+
+def fragment_cache():
+    alias = getattr(settings, 'FORMSAURUS_FRAGMENT_CACHE', None)
+    if alias is None:
+        return None
+    return caches[alias]
+
+
+def fragment_timeout():
+    return getattr(settings, 'FORMSAURUS_FRAGMENT_CACHE_TIMEOUT', 3600)
+
+
+def fragment_key(request, template_name, context):
+    shape = context.get('question_shape')
+    version = json.dumps([
+        template_name,
+        context['question'],
+        context['survey'],
+        context.get('question_base'),
+        shape.shape if shape is not None else None,
+        bool(context.get('error')),
+        context['submission']['is_preview'],
+        request.scheme,
+        request.get_host(),
+    ], sort_keys=True, default=str)
+    digest = hashlib.sha1(version.encode('utf-8')).hexdigest()
+    return f"formsaurus:fragment:{context['question']['id']}:{digest}"
+
+
+def render_question(request, template_name, context):
+    """Renders the question fragment `template_name`, from the cache when possible"""
+    cache = fragment_cache()
+    if cache is None or context.get('submission') is None:
+        return render_to_string(template_name, context, request=request)
+
+    key = fragment_key(request, template_name, context)
+    html = cache.get(key)
+    if html is None:
+        generic = dict(context)
+        generic['submission'] = dict(context['submission'], id=PLACEHOLDER_SUBMISSION)
+        generic['csrf_token'] = PLACEHOLDER_CSRF_TOKEN
+        html = str(render_to_string(template_name, generic, request=request))
+        cache.set(key, html, fragment_timeout())
+
+    html = html.replace(PLACEHOLDER_SUBMISSION, context['submission']['id'])
+    return mark_safe(html.replace(PLACEHOLDER_CSRF_TOKEN, get_token(request)))
@@ -0,0 +1,85 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+
+#
+# Cached access gates.
+#
+# `AbstractSurvey.can_view` and `AbstractSurvey.answerable` are hooks
+# surveys override to restrict access, and they are checked on every
+# respondent page. Their results are cached per survey (and per user for
+# can_view) for FORMSAURUS_GATE_CACHE_TIMEOUT seconds in the
+# FORMSAURUS_GATE_CACHE cache, stamped with the survey's modified_at so
+# publishing or editing a survey re-evaluates them at once. Completing a
+# submission drops the cached `answerable`, for hooks closing a survey
+# after a number of responses; those can count with `completions()`, the
+# survey's completed_count counter, instead of a COUNT query.
+#
+#   @property
+#   def answerable(self):
+#       return completions(self) < 100
+#
+# The default `answerable` already closes surveys on their schedule and
+# quota, see `AbstractSurvey.is_open`.
+#
+# Set FORMSAURUS_GATE_CACHE to None to evaluate the hooks every time.
+#
+
+
+def gate_cache():
+    alias = getattr(settings, 'FORMSAURUS_GATE_CACHE', 'default')
+    if alias is None:
+        return None
+    return caches[alias]
+
+
+def gate_timeout():
+    return getattr(settings, 'FORMSAURUS_GATE_CACHE_TIMEOUT', 30)
+
+
+def gate_key(survey_id, name, argument=''):
+    return f'formsaurus:gate:{survey_id}:{name}:{argument}'
+
+
+def cached_gate(survey, name, evaluate, argument='', timeout=None):
+    """Result of `evaluate()` for `survey`, cached until the survey changes or the gate times out"""
+    cache = gate_cache()
+    if cache is None:
+        return evaluate()
+    key = gate_key(survey.id, name, argument)
+    stamp = survey.modified_at.isoformat() if survey.modified_at is not None else None
+    cached = cache.get(key)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    value = evaluate()
+    cache.set(key, (stamp, value), gate_timeout() if timeout is None else timeout)
+    return value
+
+
+def can_view(survey, user):
+    return cached_gate(survey, 'can_view', lambda: survey.can_view(user),
+                       argument=user.pk if user.is_authenticated else 'anonymous')
+
+
+def answerable(survey):
+    # Not cached past the next opening or closing time
+    timeout = gate_timeout()
+    now = timezone.now()
+    for boundary in [survey.opens_at, survey.closes_at]:
+        if boundary is not None and boundary > now:
+            timeout = min(timeout, int((boundary - now).total_seconds()))
+    return cached_gate(survey, 'answerable', lambda: survey.answerable, timeout=timeout)
+
+
+def completions(survey):
+    """Completed submissions of `survey`, archived ones included, from its counter"""
+    return survey.completed_count
+
+
+def submission_completed(submission):
+    """Called once `submission` is completed, re-evaluates `answerable`"""
+    cache = gate_cache()
+    if cache is None or submission.is_preview:
+        return
+    cache.delete_many([gate_key(survey_id, 'answerable')
+                       for survey_id in set([submission.survey_id, submission.counted_survey_id])])
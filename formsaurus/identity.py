@@ -0,0 +1,85 @@
+from django.db.models import F, FilteredRelation, Q
+from django.http import Http404
+
+from formsaurus.models import Question, Submission
+from formsaurus.utils import get_survey_model
+
+#
+# Request scoped identity map.
+#
+# Objects loaded while handling a request are kept by model and primary
+# key, so every part of the request works with the same instance and the
+# values derived from it (parameters, rating shapes, serialized survey)
+# are computed once.
+#
+
+
+class IdentityMap:
+    def __init__(self):
+        self.instances = {}
+        self.memo = {}
+
+    def get(self, model, pk):
+        return self.instances.get((model._meta.label, str(pk)))
+
+    def add(self, instance):
+        key = (instance._meta.label, str(instance.pk))
+        return self.instances.setdefault(key, instance)
+
+    def memoize(self, instance, name, compute):
+        """Value `name` derived from `instance`, computed on first use"""
+        key = (instance._meta.label, str(instance.pk), name)
+        if key not in self.memo:
+            self.memo[key] = compute()
+        return self.memo[key]
+
+
+def identity_map(request):
+    """Identity map of `request`, created on first use"""
+    if not hasattr(request, '_formsaurus_identity_map'):
+        request._formsaurus_identity_map = IdentityMap()
+    return request._formsaurus_identity_map
+
+
+def submission_columns():
+    return [field.attname for field in Submission._meta.concrete_fields]
+
+
+def resolve_route(request, survey_id, question_id, submission_id):
+    """
+    Loads the (survey, question, submission) of a respondent URL with one
+    query: the question joined to its survey, its next question and the
+    submission, which must all belong together. Raises Http404 otherwise.
+    """
+    identities = identity_map(request)
+    survey = identities.get(Question.survey.field.related_model, survey_id)
+    question = identities.get(Question, question_id)
+    submission = identities.get(Submission, submission_id)
+    if survey is not None and question is not None and submission is not None:
+        return survey, question, submission
+
+    Survey = get_survey_model()
+    related = ['next_question']
+    # A swapped survey model is not the one Question.survey points to
+    joined = Survey is Question.survey.field.related_model
+    if joined:
+        related.append('survey')
+    columns = submission_columns()
+    qs = Question.objects.select_related(*related).filter(pk=question_id, survey_id=survey_id).annotate(
+        route_submission=FilteredRelation('survey__submission', condition=Q(survey__submission__pk=submission_id)),
+    ).annotate(**{f'route_submission_{column}': F(f'route_submission__{column}') for column in columns})
+    question = qs.first()
+    if question is None or getattr(question, 'route_submission_id') is None:
+        raise Http404
+
+    values = [getattr(question, f'route_submission_{column}') for column in columns]
+    submission = Submission.from_db(question._state.db, columns, values)
+    if joined:
+        survey = question.survey
+        submission.survey = survey
+    else:
+        survey = Survey.objects.filter(pk=survey_id).first()
+        if survey is None:
+            raise Http404
+
+    return identities.add(survey), identities.add(question), identities.add(submission)
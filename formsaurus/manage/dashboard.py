@@ -0,0 +1,136 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.paginator import Paginator
+from django.db.models import Max, Q
+from django.db.models.functions import Coalesce
+
+from formsaurus.counters import counts
+from formsaurus.models import ArchivedSubmission, Submission
+from formsaurus.routers import read_from_replica
+from formsaurus.sharding import sharding_enabled, shards
+from formsaurus.utils import get_survey_model
+from formsaurus.versions import latest_versions
+
+Survey = get_survey_model()
+
+#
+# Owner dashboard: every survey of a user with its response counts,
+# completion rate and last response, a page at a time. A survey is its
+# latest version, which counts the responses of all its versions. Only
+# the surveys of the page are loaded, across shards only their ids and
+# creation dates are merged to find them. Counts come from the survey
+# counters, last responses from one grouped query per shard for the
+# whole page (the partial index on completed submissions serves it).
+# Pages are cached for FORMSAURUS_DASHBOARD_CACHE_TIMEOUT seconds in the
+# FORMSAURUS_DASHBOARD_CACHE cache, set it to None to disable.
+#
+
+DEFAULT_PER_PAGE = 25
+MAX_PER_PAGE = 100
+
+
+def dashboard_cache():
+    alias = getattr(settings, 'FORMSAURUS_DASHBOARD_CACHE', 'default')
+    if alias is None:
+        return None
+    return caches[alias]
+
+
+def dashboard_timeout():
+    return getattr(settings, 'FORMSAURUS_DASHBOARD_CACHE_TIMEOUT', 60)
+
+
+def page_of_surveys(user, page, per_page):
+    """The `page`-th page of the surveys of `user`, newest first, and its paginator"""
+    surveys = latest_versions(Survey.objects.filter(user_id=user.id, deleted_at=None)).order_by('-created_at', 'id')
+    if not sharding_enabled():
+        paginator = Paginator(surveys, per_page)
+        current = paginator.get_page(page)
+        return current, paginator, list(current.object_list)
+    keys = []
+    for alias in shards():
+        keys.extend((created_at, survey_id, alias)
+                    for created_at, survey_id in surveys.using(alias).values_list('created_at', 'id'))
+    keys.sort(key=lambda key: key[0], reverse=True)
+    paginator = Paginator(keys, per_page)
+    current = paginator.get_page(page)
+    loaded = {}
+    for alias in set(key[2] for key in current.object_list):
+        ids = [key[1] for key in current.object_list if key[2] == alias]
+        loaded.update((survey.id, survey) for survey in Survey.objects.using(alias).filter(pk__in=ids))
+    return current, paginator, [loaded[key[1]] for key in current.object_list if key[1] in loaded]
+
+
+def last_per_survey(queryset, ids):
+    """Latest completed_at in `queryset` per survey in `ids`, counting the versions they supersede"""
+    rows = queryset.filter(
+        Q(survey_id__in=ids) | Q(survey__superseded_by__in=ids),
+    ).annotate(latest=Coalesce('survey__superseded_by', 'survey')).values('latest').annotate(
+        last=Max('completed_at')).order_by()
+    return {row['latest']: row['last'] for row in rows}
+
+
+def last_responses(surveys):
+    """
+    {survey id: completed_at of its last completed submission} for
+    `surveys`, latest versions all on the same database, whichever version
+    the submission was made on.
+    """
+    ids = [survey.id for survey in surveys]
+    using = surveys[0]._state.db
+    # Stats tolerate replication lag
+    with read_from_replica():
+        results = last_per_survey(
+            Submission.objects.using(using).filter(is_preview=False, completed=True), ids)
+        # Surveys whose responses were all archived
+        archived = [survey_id for survey_id in ids if survey_id not in results]
+        if len(archived) > 0:
+            results.update(last_per_survey(ArchivedSubmission.objects.using(using), archived))
+    return results
+
+
+def survey_rows(surveys):
+    totals = {}
+    last = {}
+    # Surveys of a user may be on several shards
+    for database in set(survey._state.db for survey in surveys):
+        on_shard = [survey for survey in surveys if survey._state.db == database]
+        totals.update(counts(on_shard))
+        last.update(last_responses(on_shard))
+    rows = []
+    for survey in surveys:
+        submissions, completed = totals[survey.id]
+        last_response = last.get(survey.id)
+        rows.append({
+            'id': str(survey.id),
+            'name': survey.name,
+            'published': survey.published,
+            'version': survey.version,
+            'submissions': submissions,
+            'completed': completed,
+            'ratio': completed / submissions * 100 if submissions > 0 else 0,
+            'last_response_at': last_response.isoformat() if last_response is not None else None,
+        })
+    return rows
+
+
+def dashboard(user, page=1, per_page=DEFAULT_PER_PAGE):
+    """A page of the dashboard of `user`, cached"""
+    per_page = max(1, min(per_page, MAX_PER_PAGE))
+    cache = dashboard_cache()
+    key = f'formsaurus:dashboard:{user.pk}:{page}:{per_page}'
+    if cache is not None:
+        result = cache.get(key)
+        if result is not None:
+            return result
+
+    current, paginator, surveys = page_of_surveys(user, page, per_page)
+    result = {
+        'page': current.number,
+        'pages': paginator.num_pages,
+        'count': paginator.count,
+        'surveys': survey_rows(surveys),
+    }
+    if cache is not None:
+        cache.set(key, result, dashboard_timeout())
+    return result
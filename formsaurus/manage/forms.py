@@ -10,7 +10,15 @@ Survey = get_survey_model()
 class SurveyForm(forms.ModelForm):
     class Meta:
         model = Survey
-        fields = ['name']
+        fields = ['name', 'opens_at', 'closes_at', 'max_completions']
+
+    def clean(self):
+        cleaned_data = super().clean()
+        opens_at = cleaned_data.get('opens_at')
+        closes_at = cleaned_data.get('closes_at')
+        if opens_at is not None and closes_at is not None and closes_at <= opens_at:
+            raise forms.ValidationError('The form must close after it opens')
+        return cleaned_data
 
 
 class HiddenFieldForm(forms.ModelForm):
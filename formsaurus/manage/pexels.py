@@ -1,6 +1,3 @@
-import requests
-
-
 class Pexels:
     def __init__(self, api_key):
         self.api_key = api_key
@@ -16,5 +13,6 @@ class Pexels:
             url = f'{url}&page={page}'
         print(url)
         print(headers)
+        import requests
         result = requests.get(url, headers=headers)
         return result.json()
@@ -1,161 +1,98 @@
 from django.db.models import Count, Sum, Case, When, Value, IntegerField
-from formsaurus.models import (Question, MultipleChoiceAnswer, PictureChoiceAnswer, OpinionScaleAnswer, YesNoAnswer, LegalAnswer, RatingAnswer, DropdownAnswer)
+from formsaurus.archive import archived_summary
+from formsaurus.routers import read_from_replica
 
 class Stats:
     @classmethod
-    def answers(cls, survey):
-        stats = {}
-        for question in survey.questions:
-            if question.question_type == Question.MULTIPLE_CHOICE:
-                answers = MultipleChoiceAnswer.objects.filter(
-                    question=question,
-                    submission__survey=survey,
-                    submission__completed=True,
-                    submission__is_preview=False,
-                ).values('choices').annotate(count=Count('choices')).values('choices', 'count')
-
-                stats_map = {}
-                for row in answers:
-                    stats_map[row['choices']] = row['count']
-
-                rows = {}
-                for choice in question.choice_set.all():
-                    rows[choice.choice] = stats_map[choice.id] if choice.id in stats_map else 0
-                stats[str(question.id)] = {
-                    'question': question.question,
-                    'stats': rows,
-                }
-            elif question.question_type == Question.PHONE_NUMBER:
-                pass
-            elif question.question_type == Question.SHORT_TEXT:
-                pass
-            elif question.question_type == Question.LONG_TEXT:
-                pass
-            elif question.question_type == Question.PICTURE_CHOICE:
-                answers = PictureChoiceAnswer.objects.filter(
-                    question=question,
-                    submission__survey=survey,
-                    submission__completed=True,
-                    submission__is_preview=False,
-                ).values('choices').annotate(count=Count('choices')).values('choices', 'count')
+    def counts(cls, rows, field, archived):
+        """
+        Merges grouped answer rows with the counts of archived submissions.
+        Values are keyed by their string representation.
+        """
+        stats_map = {}
+        for row in rows:
+            key = str(row[field])
+            stats_map[key] = stats_map.get(key, 0) + row['count']
+        for key, count in archived.get(field, {}).items():
+            stats_map[key] = stats_map.get(key, 0) + count
+        return stats_map
 
-                stats_map = {}
-                for row in answers:
-                    stats_map[row['choices']] = row['count']
+    @classmethod
+    def answers(cls, survey):
+        # Stats tolerate replication lag
+        with read_from_replica():
+            return cls.compute(survey)
 
-                rows = {}
-                for choice in question.choice_set.all():
-                    rows[choice.choice] = stats_map[choice.id] if choice.id in stats_map else 0
-                stats[str(question.id)] = {
-                    'question': question.question,
-                    'stats': rows,
-                }
-            elif question.question_type == Question.YES_NO:
-                answers = YesNoAnswer.objects.filter(
-                    question=question,
-                    submission__survey=survey,
-                    submission__completed=True,
-                    submission__is_preview=False,
-                ).values('yes').annotate(count=Count('yes')).values('yes', 'count')
-                stats_map = {}
-                for row in answers:
-                    stats_map[row['yes']] = row['count']
-                rows = {}
-                rows['Yes'] = stats_map[True] if True in stats_map else 0
-                rows['No'] = stats_map[False] if False in stats_map else 0
+    @classmethod
+    def grouped(cls, question, field, archived):
+        """Counts the completed answers of a question per value of `field`"""
+        answers = question.handler.answer_model.objects.filter(
+            question=question,
+            submission__survey=question.survey_id,
+            submission__completed=True,
+            submission__is_preview=False,
+        ).values(field).annotate(count=Count(field)).values(field, 'count')
+        return cls.counts(answers, field, archived)
 
-                stats[str(question.id)] = {
-                    'question': question.question,
-                    'stats': rows,
-                }
-            elif question.question_type == Question.EMAIL:
-                pass
-            elif question.question_type == Question.OPINION_SCALE:
-                answers = OpinionScaleAnswer.objects.filter(
-                    question=question,
-                    submission__survey=survey,
-                    submission__completed=True,
-                    submission__is_preview=False,
-                ).values('opinion').annotate(count=Count('opinion')).values('opinion', 'count')
-                stats_map = {}
-                for row in answers:
-                    stats_map[row['opinion']] = row['count']
-                parameters = question.parameters
-                start = 1 if parameters.start_at_one else 0
-                end = start + parameters.number_of_steps
+    @classmethod
+    def choices(cls, question, archived):
+        stats_map = cls.grouped(question, 'choices', archived)
+        rows = {}
+        for choice in question.choice_set.all():
+            rows[choice.choice] = stats_map.get(str(choice.id), 0)
+        return rows
 
-                rows = {}
-                for index in range(start, end):
-                    rows[index] = stats_map[index] if index in stats_map else 0
+    @classmethod
+    def yes_no(cls, question, archived):
+        stats_map = cls.grouped(question, 'yes', archived)
+        rows = {}
+        rows['Yes'] = stats_map.get(str(True), 0)
+        rows['No'] = stats_map.get(str(False), 0)
+        return rows
 
-                stats[str(question.id)] = {
-                    'question': question.question,
-                    'stats': rows,
-                }
-            elif question.question_type == Question.RATING:
-                answers = RatingAnswer.objects.filter(
-                    question=question,
-                    submission__survey=survey,
-                    submission__completed=True,
-                    submission__is_preview=False,
-                ).values('rating').annotate(count=Count('rating')).values('rating', 'count')
-                stats_map = {}
-                for row in answers:
-                    stats_map[row['rating']] = row['count']
-                parameters = question.parameters
-                end = parameters.number_of_steps
+    @classmethod
+    def opinion_scale(cls, question, archived):
+        stats_map = cls.grouped(question, 'opinion', archived)
+        parameters = question.parameters
+        start = 1 if parameters.start_at_one else 0
+        end = start + parameters.number_of_steps
 
-                rows = {}
-                for index in range(0, end):
-                    rows[index] = stats_map[index] if index in stats_map else 0
+        rows = {}
+        for index in range(start, end):
+            rows[index] = stats_map.get(str(index), 0)
+        return rows
 
-                stats[str(question.id)] = {
-                    'question': question.question,
-                    'stats': rows,
-                }
-            elif question.question_type == Question.DATE:
-                pass
-            elif question.question_type == Question.NUMBER:
-                pass
-            elif question.question_type == Question.DROPDOWN:
-                answers = DropdownAnswer.objects.filter(
-                    question=question,
-                    submission__survey=survey,
-                    submission__completed=True,
-                    submission__is_preview=False,
-                ).values('choices').annotate(count=Count('choices')).values('choices', 'count')
-                stats_map = {}
-                for row in answers:
-                    stats_map[row['choices']] = row['count']
+    @classmethod
+    def rating(cls, question, archived):
+        stats_map = cls.grouped(question, 'rating', archived)
+        end = question.parameters.number_of_steps
 
-                rows = {}
-                for choice in question.choice_set.all():
-                    rows[choice.choice] = stats_map[choice.id] if choice.id in stats_map else 0
+        rows = {}
+        for index in range(0, end):
+            rows[index] = stats_map.get(str(index), 0)
+        return rows
 
-                stats[str(question.id)] = {
-                    'question': question.question,
-                    'stats': rows,
-                }
-            elif question.question_type == Question.LEGAL:
-                answers = LegalAnswer.objects.filter(
-                    question=question,
-                    submission__survey=survey,
-                    submission__completed=True,
-                    submission__is_preview=False,
-                ).values('accept').annotate(count=Count('accept')).values('accept', 'count')
-                stats_map = {}
-                for row in answers:
-                    stats_map[row['accept']] = row['count']
-                rows = {}
-                rows['Accept'] = stats_map[True] if True in stats_map else 0
-                rows['Does Not Accept'] = stats_map[False] if False in stats_map else 0
+    @classmethod
+    def legal(cls, question, archived):
+        stats_map = cls.grouped(question, 'accept', archived)
+        rows = {}
+        rows['Accept'] = stats_map.get(str(True), 0)
+        rows['Does Not Accept'] = stats_map.get(str(False), 0)
+        return rows
 
-                stats[str(question.id)] = {
-                    'question': question.question,
-                    'stats': rows,
-                }
-            elif question.question_type == Question.FILE_UPLOAD:
-                pass
+    @classmethod
+    def compute(cls, survey):
+        stats = {}
+        summary = archived_summary(survey)
+        for question in survey.questions:
+            # The handler names the Stats method aggregating its answers
+            handler = question.handler
+            if handler is None or handler.stats is None:
+                continue
+            archived = summary.get(str(question.id), {})
+            stats[str(question.id)] = {
+                'question': question.question,
+                'stats': getattr(cls, handler.stats)(question, archived),
+            }
 
         return stats
-
@@ -1,6 +1,3 @@
-import requests
-
-
 class Tenor:
     def __init__(self, api_key):
         self.api_key = api_key
@@ -9,5 +6,6 @@ class Tenor:
         url = f"https://api.tenor.com/v1/search?q={query}&key={self.api_key}"
         if per_page is not None:
             url = f'{url}&limit={per_page}'
+        import requests
         result = requests.get(url)
         return result.json()
@@ -1,6 +1,3 @@
-import requests
-
-
 class Unsplash:
     def __init__(self, access_key):
         self.access_key = access_key
@@ -11,5 +8,7 @@ class Unsplash:
             url = f'{url}&per_page={per_page}'
         if page is not None:
             url = f'{url}&page={page}'
+        # Imported on first search by the image and video clients, requests is slow to load
+        import requests
         result = requests.get(url)
         return result.json()
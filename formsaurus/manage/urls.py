@@ -14,6 +14,8 @@ urlpatterns = [
          views.SurveyView.as_view(), name='survey_preview'),
     path('manage/form/publish/<uuid:survey_id>',
          manage.PublishSurveyView.as_view(), name='survey_publish'),
+    path('manage/form/version/<uuid:survey_id>',
+         manage.NewVersionView.as_view(), name='survey_new_version'),
     path('manage/form/create/<uuid:survey_id>/show_branding/toggle',
           manage.ToggleShowBrandingView.as_view(), name='toggle_show_branding'),
     path('manage/form/create/<uuid:survey_id>/add',
@@ -35,6 +37,7 @@ urlpatterns = [
     path('manage/form/delete/<uuid:survey_id>',
          manage.DeleteSurveyView.as_view(), name='survey_delete'),
     path('manage/form/list', manage.SurveysView.as_view(), name='surveys'),
+    path('manage/dashboard', manage.DashboardView.as_view(), name='dashboard'),
     path('manage/form/submissions/<uuid:survey_id>',
          manage.SubmissionsView.as_view(), name='submissions'),
     path('manage/form/submissions/<uuid:survey_id>/<uuid:submission_id>',
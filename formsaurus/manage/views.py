@@ -7,25 +7,29 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.views.generic.base import View
 from django.urls import reverse
 from django.utils import timezone
-from django.db.models import Count, Sum, Case, When, Value, IntegerField
 from django.conf import settings
 
-from formsaurus.models import (Question, Submission, Choice, RuleSet, Condition,
+from formsaurus.models import (Question, Submission, ArchivedSubmission, Choice, RuleSet, Condition,
                                TextCondition, BooleanCondition, ChoiceCondition, BooleanCondition, DateCondition, NumberCondition)
 from formsaurus.serializer import Serializer
 from formsaurus.utils import get_survey_model
-from formsaurus.manage.forms import (SurveyForm, HiddenFieldForm, AddQuestionForm, WelcomeParametersForm, ThankYouParametersForm, MultipleChoiceParametersForm, PhoneNumberParametersForm, ShortTextParametersForm, LongTextParametersForm, StatementParametersForm, PictureChoiceParametersForm,
-                              YesNoParametersForm, EmailParametersForm, OpinionScaleParametersForm, RatingParametersForm, DateParameters, NumberParametersForm, DropdownParametersForm, LegalParametersForm, FileUploadParametersForm, PaymentParametersForm, WebsiteParametersForm)
+from formsaurus.routers import ReplicaReadMixin
+from formsaurus.sharding import ShardMixin, surveys_for_user
+from formsaurus.counters import counts
+from formsaurus.deletion import schedule_survey_deletion
+from formsaurus.warmup import schedule_warmup
+from formsaurus.manage.forms import SurveyForm, HiddenFieldForm, AddQuestionForm
 from formsaurus.manage.unsplash import Unsplash
 from formsaurus.manage.pexels import Pexels
 from formsaurus.manage.tenor import Tenor
 from formsaurus.manage.stats import Stats
+from formsaurus.manage.dashboard import dashboard, DEFAULT_PER_PAGE
 
 logger = logging.getLogger('formsaurus')
 
 Survey = get_survey_model()
 
-class ManageBaseView(LoginRequiredMixin, View):
+class ManageBaseView(LoginRequiredMixin, ShardMixin, View):
     navbar_template_name = 'formsaurus/manage/navbar.html'
 
     def context_data(self, **kwargs):
@@ -53,11 +57,30 @@ class SurveysView(ManageBaseView):
     def get(self, request):
         context = self.context_data()
         context['surveys'] = []
-        for survey in Survey.objects.filter(user=request.user).order_by('-created_at'):
-            context['surveys'].append(Serializer.survey(survey))
+        surveys = surveys_for_user(request.user)
+        # Surveys of a user may be on several shards
+        totals = {}
+        for database in set(survey._state.db for survey in surveys):
+            totals.update(counts([survey for survey in surveys if survey._state.db == database]))
+        for survey in surveys:
+            result = Serializer.survey(survey)
+            result['submissions'], result['completed'] = totals[survey.id]
+            context['surveys'].append(result)
         return render(request, self.template_name, context)
 
 
+class DashboardView(ManageBaseView):
+    """Response counts, completion ratio and last response of the forms of authorized user, paginated."""
+
+    def get(self, request):
+        try:
+            page = int(request.GET.get('page', 1))
+            per_page = int(request.GET.get('per_page', DEFAULT_PER_PAGE))
+        except ValueError:
+            raise Http404
+        return JsonResponse(dashboard(request.user, page=page, per_page=per_page))
+
+
 class SurveyWizardView(ManageBaseView):
     template_name = 'formsaurus/manage/survey_wizard.html'
 
@@ -71,31 +94,47 @@ class SurveyWizardView(ManageBaseView):
         for question in survey.questions:
             context['survey']['questions'].append(Serializer.question(question))
         if survey.published:
-            # Stats about submissions
+            # Stats about submissions, from the survey's counters
+            count, completed = counts([survey])[survey.id]
             context['submissions'] = {}
-            row = Submission.objects.filter(survey=survey, is_preview=False).aggregate(
-                count=Count('id'),
-                sum=Sum(Case(
-                    When(completed=True, then=1),
-                    default=Value(0),
-                    output_field=IntegerField()
-                ))
-            )
-            completed = 1 if row['sum'] is True else 0 if row['sum'] is None or row['sum'] is False else row['sum']
-            context['submissions']['count'] = row['count']
+            context['submissions']['count'] = count
             context['submissions']['completed'] = completed
-            context['submissions']['ratio'] = completed / \
-                row['count'] * 100 if row['count'] > 0 else 0
+            context['submissions']['ratio'] = completed / count * 100 if count > 0 else 0
         return context
 
     def get(self, request, survey_id):
         survey = get_object_or_404(Survey, pk=survey_id)
         if survey.user != request.user:
             raise Http404
+        if survey.superseded_by_id is not None:
+            # The latest version counts the responses of every version
+            return redirect('formsaurus_manage:survey_wizard', survey.superseded_by_id)
         context = self.context_data(survey=survey)
         return render(request, self.template_name, context)
 
 
+def posted_choices(request, question_type):
+    """Choices posted by the question editor, in the shape Survey.add_<slug>() expects"""
+    if question_type == Question.PICTURE_CHOICE:
+        images = request.POST.getlist('choice')
+        labels = request.POST.getlist('label')
+        return [{'label': labels[index], 'image_url': images[index]} for index in range(len(images))]
+    return request.POST.getlist('choice')
+
+
+def edited_choices(request, question_type):
+    """Choices posted by the question editor with the ids of the choices they edit, in the shape Question.update_choices() expects"""
+    choices = posted_choices(request, question_type)
+    ids = request.POST.getlist('choice_id')
+    ids = ids + [''] * (len(choices) - len(ids))
+    if question_type == Question.PICTURE_CHOICE:
+        return [
+            {'choice': choice['label'], 'image_url': choice['image_url'], 'id': ids[index]}
+            for index, choice in enumerate(choices)
+        ]
+    return [{'choice': choice, 'id': ids[index]} for index, choice in enumerate(choices) if choice != ""]
+
+
 class AddQuestionView(ManageBaseView):
     template_name = 'formsaurus/manage/survey_add_question.html'
     add_question_url = 'formsaurus_manage:survey_add_question'
@@ -136,397 +175,28 @@ class AddQuestionView(ManageBaseView):
         logger.info('Question Type %s', question_type)
         if question_form.is_valid():
             logger.debug('Valid question form')
-            if question_type == Question.WELCOME_SCREEN:
-                parameters_form = WelcomeParametersForm(request.POST)
-                if parameters_form.is_valid():
-                    question = survey.add_welcome_screen(
-                        question_form.cleaned_data['question'],
-                        description=question_form.cleaned_data['description'],
-                        button_label=parameters_form.cleaned_data['button_label'],
-                        image_url=parameters_form.cleaned_data['image_url'],
-                        video_url=parameters_form.cleaned_data['video_url'],
-                        orientation=parameters_form.cleaned_data['orientation'],
-                        position_x=parameters_form.cleaned_data['position_x'],
-                        position_y=parameters_form.cleaned_data['position_y'],
-                        opacity=parameters_form.cleaned_data['opacity'],
-                    )
-                    logger.info('Created Welcome Screen %s', question.id)
-                    return redirect(self.success_url, survey.id)
-                else:
-                    logger.warning(
-                        'Failed to validate welcome_screen parameters %s', parameters_form.errors)
-            elif question_type == Question.THANK_YOU_SCREEN:
-                parameters_form = ThankYouParametersForm(request.POST)
-                if parameters_form.is_valid():
-                    question = survey.add_thank_you_screen(
-                        question_form.cleaned_data['question'],
-                        description=question_form.cleaned_data['description'],
-                        show_button=parameters_form.cleaned_data['show_button'],
-                        button_label=parameters_form.cleaned_data['button_label'],
-                        button_link=parameters_form.cleaned_data['button_link'],
-                        show_social_media=parameters_form.cleaned_data['show_social_media'],
-                        image_url=parameters_form.cleaned_data['image_url'],
-                        video_url=parameters_form.cleaned_data['video_url'],
-                        orientation=parameters_form.cleaned_data['orientation'],
-                        position_x=parameters_form.cleaned_data['position_x'],
-                        position_y=parameters_form.cleaned_data['position_y'],
-                        opacity=parameters_form.cleaned_data['opacity'],
-                    )
-                    logger.info('Created Thank You Screen %s', question.id)
-                    return redirect(self.success_url, survey.id)
-                else:
-                    logger.warning(
-                        'Failed to validate thank_you_screen parameters %s', parameters_form.errors)
-            elif question_type == Question.MULTIPLE_CHOICE:
-                parameters_form = MultipleChoiceParametersForm(request.POST)
-                if parameters_form.is_valid():
-                    question = survey.add_multiple_choice(
-                        question_form.cleaned_data['question'],
-                        description=question_form.cleaned_data['description'],
-                        required=question_form.cleaned_data['required'],
-                        multiple_selection=parameters_form.cleaned_data['multiple_selection'],
-                        randomize=parameters_form.cleaned_data['randomize'],
-                        other_option=parameters_form.cleaned_data['other_option'],
-                        choices=request.POST.getlist('choice'),
-                        image_url=parameters_form.cleaned_data['image_url'],
-                        video_url=parameters_form.cleaned_data['video_url'],
-                        orientation=parameters_form.cleaned_data['orientation'],
-                        position_x=parameters_form.cleaned_data['position_x'],
-                        position_y=parameters_form.cleaned_data['position_y'],
-                        opacity=parameters_form.cleaned_data['opacity'],
-                    )
-                    logger.info('Created Multiple Choice %s', question.id)
-                    return redirect(self.success_url, survey.id)
-                else:
-                    logger.warning(
-                        'Failed to validate multiple_choice parameters %s', parameters_form.errors)
-            elif question_type == Question.PHONE_NUMBER:
-                parameters_form = PhoneNumberParametersForm(request.POST)
-                if parameters_form.is_valid():
-                    question = survey.add_phone_number(
-                        question_form.cleaned_data['question'],
-                        description=question_form.cleaned_data['description'],
-                        required=question_form.cleaned_data['required'],
-                        default_country_code=parameters_form.cleaned_data['default_country_code'],
-                        image_url=parameters_form.cleaned_data['image_url'],
-                        video_url=parameters_form.cleaned_data['video_url'],
-                        orientation=parameters_form.cleaned_data['orientation'],
-                        position_x=parameters_form.cleaned_data['position_x'],
-                        position_y=parameters_form.cleaned_data['position_y'],
-                        opacity=parameters_form.cleaned_data['opacity'],
-                    )
-                    logger.info('Created Phone Number %s', question.id)
-                    return redirect(self.success_url, survey.id)
-                else:
-                    logger.warning(
-                        'Failed to validate phone_number parameters %s', parameters_form.errors)
-            elif question_type == Question.SHORT_TEXT:
-                parameters_form = ShortTextParametersForm(request.POST)
-                if parameters_form.is_valid():
-                    question = survey.add_short_text(
-                        question_form.cleaned_data['question'],
-                        description=question_form.cleaned_data['description'],
-                        required=question_form.cleaned_data['required'],
-                        limit_character=parameters_form.cleaned_data['limit_character'],
-                        limit=parameters_form.cleaned_data['limit'],
-                        image_url=parameters_form.cleaned_data['image_url'],
-                        video_url=parameters_form.cleaned_data['video_url'],
-                        orientation=parameters_form.cleaned_data['orientation'],
-                        position_x=parameters_form.cleaned_data['position_x'],
-                        position_y=parameters_form.cleaned_data['position_y'],
-                        opacity=parameters_form.cleaned_data['opacity'],
-                    )
-                    logger.info('Created Short Text %s', question.id)
-                    return redirect(self.success_url, survey.id)
-                else:
-                    logger.warning(
-                        'Failed to validate short_text parameters %s', parameters_form.errors)
-            elif question_type == Question.LONG_TEXT:
-                parameters_form = LongTextParametersForm(request.POST)
-                if parameters_form.is_valid():
-                    question = survey.add_long_text(
-                        question_form.cleaned_data['question'],
-                        description=question_form.cleaned_data['description'],
-                        required=question_form.cleaned_data['required'],
-                        limit_character=parameters_form.cleaned_data['limit_character'],
-                        limit=parameters_form.cleaned_data['limit'],
-                        image_url=parameters_form.cleaned_data['image_url'],
-                        video_url=parameters_form.cleaned_data['video_url'],
-                        orientation=parameters_form.cleaned_data['orientation'],
-                        position_x=parameters_form.cleaned_data['position_x'],
-                        position_y=parameters_form.cleaned_data['position_y'],
-                        opacity=parameters_form.cleaned_data['opacity'],
-                    )
-                    logger.info('Created Long Text %s', question.id)
-                    return redirect(self.success_url, survey.id)
-                else:
-                    logger.warning(
-                        'Failed to validate long_text parameters %s', parameters_form.errors)
-
-            elif question_type == Question.STATEMENT:
-                parameters_form = StatementParametersForm(request.POST)
-                if parameters_form.is_valid():
-                    question = survey.add_statement(
-                        question_form.cleaned_data['question'],
-                        description=question_form.cleaned_data['description'],
-                        button_label=parameters_form.cleaned_data['button_label'],
-                        show_quotation_mark=parameters_form.cleaned_data['show_quotation_mark'],
-                        image_url=parameters_form.cleaned_data['image_url'],
-                        video_url=parameters_form.cleaned_data['video_url'],
-                        orientation=parameters_form.cleaned_data['orientation'],
-                        position_x=parameters_form.cleaned_data['position_x'],
-                        position_y=parameters_form.cleaned_data['position_y'],
-                        opacity=parameters_form.cleaned_data['opacity'],
-                    )
-                    logger.info('Created Statement %s', question.id)
-                    return redirect(self.success_url, survey.id)
-                else:
-                    logger.warning(
-                        'Failed to validate statement parameters %s', parameters_form.errors)
-            elif question_type == Question.PICTURE_CHOICE:
-                parameters_form = PictureChoiceParametersForm(request.POST)
-                if parameters_form.is_valid():
-                    images = request.POST.getlist('choice')
-                    labels = request.POST.getlist('label')
-                    choices = []
-                    for index in range(len(images)):
-                        choices.append({
-                            'label': labels[index],
-                            'image_url': images[index],
-                        })
-
-                    question = survey.add_picture_choice(
-                        question_form.cleaned_data['question'],
-                        description=question_form.cleaned_data['description'],
-                        required=question_form.cleaned_data['required'],
-                        multiple_selection=parameters_form.cleaned_data['multiple_selection'],
-                        randomize=parameters_form.cleaned_data['randomize'],
-                        other_option=parameters_form.cleaned_data['other_option'],
-                        show_labels=parameters_form.cleaned_data['show_labels'],
-                        supersize=parameters_form.cleaned_data['supersize'],
-                        choices=choices,
-                        image_url=parameters_form.cleaned_data['image_url'],
-                        video_url=parameters_form.cleaned_data['video_url'],
-                        orientation=parameters_form.cleaned_data['orientation'],
-                        position_x=parameters_form.cleaned_data['position_x'],
-                        position_y=parameters_form.cleaned_data['position_y'],
-                        opacity=parameters_form.cleaned_data['opacity'],
-                    )
-                    logger.info('Created Picture Choice %s', question.id)
-                    return redirect(self.success_url, survey.id)
-                else:
-                    logger.warning(
-                        'Failed to validate picture_choice parameters %s', parameters_form.errors)
-
-            elif question_type == Question.YES_NO:
-                parameters_form = YesNoParametersForm(request.POST)
-                if parameters_form.is_valid():
-                    question = survey.add_yes_no(
-                        question_form.cleaned_data['question'],
-                        description=question_form.cleaned_data['description'],
-                        required=question_form.cleaned_data['required'],
-                        image_url=parameters_form.cleaned_data['image_url'],
-                        video_url=parameters_form.cleaned_data['video_url'],
-                        orientation=parameters_form.cleaned_data['orientation'],
-                        position_x=parameters_form.cleaned_data['position_x'],
-                        position_y=parameters_form.cleaned_data['position_y'],
-                        opacity=parameters_form.cleaned_data['opacity'],
-                    )
-                    logger.info('Created Yes/No %s', question.id)
-                    return redirect(self.success_url, survey.id)
-                else:
-                    logger.warning(
-                        'Failed to validate yes_no parameters %s', parameters_form.errors)
-            elif question_type == Question.EMAIL:
-                parameters_form = EmailParametersForm(request.POST)
-                if parameters_form.is_valid():
-                    question = survey.add_email(
-                        question_form.cleaned_data['question'],
-                        description=question_form.cleaned_data['description'],
-                        required=question_form.cleaned_data['required'],
-                        image_url=parameters_form.cleaned_data['image_url'],
-                        video_url=parameters_form.cleaned_data['video_url'],
-                        orientation=parameters_form.cleaned_data['orientation'],
-                        position_x=parameters_form.cleaned_data['position_x'],
-                        position_y=parameters_form.cleaned_data['position_y'],
-                        opacity=parameters_form.cleaned_data['opacity'],
-                    )
-                    logger.info('Created Email %s', question.id)
-                    return redirect(self.success_url, survey.id)
-                else:
-                    logger.warning(
-                        'Failed to validate email parameters %s', parameters_form.errors)
-            elif question_type == Question.OPINION_SCALE:
-                parameters_form = OpinionScaleParametersForm(request.POST)
-                if parameters_form.is_valid():
-                    question = survey.add_opinion_scale(
-                        question_form.cleaned_data['question'],
-                        description=question_form.cleaned_data['description'],
-                        required=question_form.cleaned_data['required'],
-                        start_at_one=parameters_form.cleaned_data['start_at_one'],
-                        number_of_steps=parameters_form.cleaned_data['number_of_steps'],
-                        show_labels=parameters_form.cleaned_data['show_labels'],
-                        left_label=parameters_form.cleaned_data['left_label'],
-                        center_label=parameters_form.cleaned_data['center_label'],
-                        right_label=parameters_form.cleaned_data['right_label'],
-                        image_url=parameters_form.cleaned_data['image_url'],
-                        video_url=parameters_form.cleaned_data['video_url'],
-                        orientation=parameters_form.cleaned_data['orientation'],
-                        position_x=parameters_form.cleaned_data['position_x'],
-                        position_y=parameters_form.cleaned_data['position_y'],
-                        opacity=parameters_form.cleaned_data['opacity'],
-                    )
-                    logger.info('Created Opinion Scale %s', question.id)
-                    return redirect(self.success_url, survey.id)
-                else:
-                    logger.warning(
-                        'Failed to validate opinion_scale parameters %s', parameters_form.errors)
-            elif question_type == Question.RATING:
-                parameters_form = RatingParametersForm(request.POST)
-                if parameters_form.is_valid():
-                    question = survey.add_rating(
-                        question_form.cleaned_data['question'],
-                        description=question_form.cleaned_data['description'],
-                        required=question_form.cleaned_data['required'],
-                        number_of_steps=parameters_form.cleaned_data['number_of_steps'],
-                        shape=parameters_form.cleaned_data['shape'],
-                        image_url=parameters_form.cleaned_data['image_url'],
-                        video_url=parameters_form.cleaned_data['video_url'],
-                        orientation=parameters_form.cleaned_data['orientation'],
-                        position_x=parameters_form.cleaned_data['position_x'],
-                        position_y=parameters_form.cleaned_data['position_y'],
-                        opacity=parameters_form.cleaned_data['opacity'],
-                    )
-                    logger.info('Created Rating %s', question.id)
-                    return redirect(self.success_url, survey.id)
-                else:
-                    logger.warning(
-                        'Failed to validate rating parameters %s', parameters_form.errors)
-            elif question_type == Question.DATE:
-                parameters_form = DateParametersForm(request.POST)
-                if parameters_form.is_valid():
-                    question = survey.add_date(
-                        question_form.cleaned_data['question'],
-                        description=question_form.cleaned_data['description'],
-                        required=question_form.cleaned_data['required'],
-                        date_format=parameters_form.cleaned_data['date_format'],
-                        date_separator=parameters_form.cleaned_data['date_separator'],
-                        image_url=parameters_form.cleaned_data['image_url'],
-                        video_url=parameters_form.cleaned_data['video_url'],
-                        orientation=parameters_form.cleaned_data['orientation'],
-                        position_x=parameters_form.cleaned_data['position_x'],
-                        position_y=parameters_form.cleaned_data['position_y'],
-                        opacity=parameters_form.cleaned_data['opacity'],
-                    )
-                    logger.info('Created Date %s', question.id)
-                    return redirect(self.success_url, survey.id)
-                else:
-                    logger.warning(
-                        'Failed to validate date parameters %s', parameters_form.errors)
-            elif question_type == Question.NUMBER:
-                parameters_form = NumberParametersForm(request.POST)
-                if parameters_form.is_valid():
-                    question = survey.add_number(
-                        question_form.cleaned_data['question'],
-                        description=question_form.cleaned_data['description'],
-                        required=question_form.cleaned_data['required'],
-                        enable_min=parameters_form.cleaned_data['enable_min'],
-                        min_value=parameters_form.cleaned_data['min_value'],
-                        enable_max=parameters_form.cleaned_data['enable_max'],
-                        max_value=parameters_form.cleaned_data['max_value'],
-                        image_url=parameters_form.cleaned_data['image_url'],
-                        video_url=parameters_form.cleaned_data['video_url'],
-                        orientation=parameters_form.cleaned_data['orientation'],
-                        position_x=parameters_form.cleaned_data['position_x'],
-                        position_y=parameters_form.cleaned_data['position_y'],
-                        opacity=parameters_form.cleaned_data['opacity'],
-                    )
-                    logger.info('Created Number %s', question.id)
-                    return redirect(self.success_url, survey.id)
-                else:
-                    logger.warning(
-                        'Failed to validate number parameters %s', parameters_form.errors)
-            elif question_type == Question.DROPDOWN:
-                parameters_form = DropdownParametersForm(request.POST)
-                if parameters_form.is_valid():
-                    question = survey.add_dropdown(
-                        question_form.cleaned_data['question'],
-                        description=question_form.cleaned_data['description'],
-                        required=question_form.cleaned_data['required'],
-                        alphabetical=parameters_form.cleaned_data['alphabetical'],
-                        randomize=parameters_form.cleaned_data['randomize'],
-                        choices=request.POST.getlist('choice'),
-                        image_url=parameters_form.cleaned_data['image_url'],
-                        video_url=parameters_form.cleaned_data['video_url'],
-                        orientation=parameters_form.cleaned_data['orientation'],
-                        position_x=parameters_form.cleaned_data['position_x'],
-                        position_y=parameters_form.cleaned_data['position_y'],
-                        opacity=parameters_form.cleaned_data['opacity'],
-                    )
-                    logger.info('Created Dropdown %s', question.id)
-                    return redirect(self.success_url, survey.id)
-                else:
-                    logger.warning(
-                        'Failed to validate dropdown parameters %s', parameters_form.errors)
-            elif question_type == Question.LEGAL:
-                parameters_form = LegalParametersForm(request.POST)
-                if parameters_form.is_valid():
-                    question = survey.add_legal(
-                        question_form.cleaned_data['question'],
-                        description=question_form.cleaned_data['description'],
-                        required=question_form.cleaned_data['required'],
-                        image_url=parameters_form.cleaned_data['image_url'],
-                        video_url=parameters_form.cleaned_data['video_url'],
-                        orientation=parameters_form.cleaned_data['orientation'],
-                        position_x=parameters_form.cleaned_data['position_x'],
-                        position_y=parameters_form.cleaned_data['position_y'],
-                        opacity=parameters_form.cleaned_data['opacity'],
-                    )
-                    logger.info('Created Email %s', question.id)
-                    return redirect(self.success_url, survey.id)
-                else:
-                    logger.warning(
-                        'Failed to validate email parameters %s', parameters_form.errors)
-            elif question_type == Question.FILE_UPLOAD:
-                parameters_form = FileUploadParametersForm(request.POST)
-                if parameters_form.is_valid():
-                    question = survey.add_file_upload(
-                        question_form.cleaned_data['question'],
-                        description=question_form.cleaned_data['description'],
-                        required=question_form.cleaned_data['required'],
-                        image_url=parameters_form.cleaned_data['image_url'],
-                        video_url=parameters_form.cleaned_data['video_url'],
-                        orientation=parameters_form.cleaned_data['orientation'],
-                        position_x=parameters_form.cleaned_data['position_x'],
-                        position_y=parameters_form.cleaned_data['position_y'],
-                        opacity=parameters_form.cleaned_data['opacity'],
-                    )
-                    logger.info('Created File Upload %s', question.id)
-                    return redirect(self.success_url, survey.id)
+            handler = Question.handler_for(question_type)
+            if handler is None:
+                logger.warning('Unsupported type %s', question_type)
             elif question_type == Question.PAYMENT:
                 raise Http404
-            elif question_type == Question.WEBSITE:
-                parameters_form = WebsiteParametersForm(request.POST)
-                if parameters_form.is_valid():
-                    question = survey.add_website(
-                        question_form.cleaned_data['question'],
-                        description=question_form.cleaned_data['description'],
-                        required=question_form.cleaned_data['required'],
-                        image_url=parameters_form.cleaned_data['image_url'],
-                        video_url=parameters_form.cleaned_data['video_url'],
-                        orientation=parameters_form.cleaned_data['orientation'],
-                        position_x=parameters_form.cleaned_data['position_x'],
-                        position_y=parameters_form.cleaned_data['position_y'],
-                        opacity=parameters_form.cleaned_data['opacity'],
-                    )
-                    logger.info('Created Email %s', question.id)
+            else:
+                parameters_form = handler.parameters_form(request.POST)
+                if parameters_form.is_valid():
+                    # Parameters forms mirror the arguments of Survey.add_<slug>()
+                    kwargs = dict(parameters_form.cleaned_data)
+                    kwargs['description'] = question_form.cleaned_data['description']
+                    if handler.answer_model is not None:
+                        kwargs['required'] = question_form.cleaned_data['required']
+                    if handler.has_choices:
+                        kwargs['choices'] = posted_choices(request, question_type)
+                    question = getattr(survey, f'add_{handler.slug}')(
+                        question_form.cleaned_data['question'], **kwargs)
+                    logger.info('Created %s %s', handler.name, question.id)
                     return redirect(self.success_url, survey.id)
                 else:
                     logger.warning(
-                        'Failed to validate email parameters %s', parameters_form.errors)
-
-            else:
-                logger.warning('Unsupported type %s', question_type)
+                        'Failed to validate %s parameters %s', handler.slug, parameters_form.errors)
 
         else:
             logger.warning('Failed to create question %s',
@@ -592,214 +262,29 @@ class EditQuestionView(ManageBaseView):
             # Update the question
             question = question_form.save()
             # Update parameters
-            if question_type == Question.WELCOME_SCREEN:
-                parameters_form = WelcomeParametersForm(
-                    request.POST, instance=question.parameters)
-                if parameters_form.is_valid():
-                    parameters_form.save()
-                    return redirect(self.edit_question_url, survey.id)
-                else:
-                    logger.warning(
-                        'Failed to validate welcome_screen parameters %s', parameters_form.errors)
-            elif question_type == Question.THANK_YOU_SCREEN:
-                parameters_form = ThankYouParametersForm(
-                    request.POST, instance=question.parameters)
-                if parameters_form.is_valid():
-                    parameters_form.save()
-                    return redirect(self.edit_question_url, survey.id)
-                else:
-                    logger.warning(
-                        'Failed to validate thank_you_screen parameters %s', parameters_form.errors)
-            elif question_type == Question.MULTIPLE_CHOICE:
-                parameters_form = MultipleChoiceParametersForm(
-                    request.POST, instance=question.parameters)
-                if parameters_form.is_valid():
-                    parameters_form.save()
-                    question.choice_set.all().delete()
-                    position = 0
-                    for choice in request.POST.getlist('choice'):
-                        Choice.objects.create(
-                            question=question,
-                            choice=choice,
-                            position=position,
-                        )
-                        position = position+1
-
-                    return redirect(self.edit_question_url, survey.id)
-                else:
-                    logger.warning(
-                        'Failed to validate multiple_choice parameters %s', parameters_form.errors)
-            elif question_type == Question.PHONE_NUMBER:
-                parameters_form = PhoneNumberParametersForm(
-                    request.POST, instance=question.parameters)
-                if parameters_form.is_valid():
-                    parameters_form.save()
-                    return redirect(self.edit_question_url, survey.id)
-                else:
-                    logger.warning(
-                        'Failed to validate phone_number parameters %s', parameters_form.errors)
-            elif question_type == Question.SHORT_TEXT:
-                parameters_form = ShortTextParametersForm(
-                    request.POST, instance=question.parameters)
-                if parameters_form.is_valid():
-                    parameters_form.save()
-                    return redirect(self.edit_question_url, survey.id)
-                else:
-                    logger.warning(
-                        'Failed to validate short_text parameters %s', parameters_form.errors)
-            elif question_type == Question.LONG_TEXT:
-                parameters_form = LongTextParametersForm(
-                    request.POST, instance=question.parameters)
-                if parameters_form.is_valid():
-                    parameters_form.save()
-                    return redirect(self.edit_question_url, survey.id)
-                else:
-                    logger.warning(
-                        'Failed to validate long_text parameters %s', parameters_form.errors)
-            elif question_type == Question.STATEMENT:
-                parameters_form = StatementParametersForm(
-                    request.POST, instance=question.parameters)
-                if parameters_form.is_valid():
-                    parameters_form.save()
-                    return redirect(self.edit_question_url, survey.id)
-                else:
-                    logger.warning(
-                        'Failed to validate statement parameters %s', parameters_form.errors)
-            elif question_type == Question.PICTURE_CHOICE:
-                parameters_form = PictureChoiceParametersForm(
-                    request.POST, instance=question.parameters)
-                if parameters_form.is_valid():
-                    parameters_form.save()
-                    question.choice_set.all().delete()
-                    images = request.POST.getlist('choice')
-                    labels = request.POST.getlist('label')
-                    position = 0
-                    for index in range(len(images)):
-                        Choice.objects.create(
-                            question=question,
-                            image_url=images[index],
-                            choice=labels[index],
-                            position=position,
-                        )
-                        position = position + 1
-
-                    return redirect(self.edit_question_url, survey.id)
-                else:
-                    logger.warning(
-                        'Failed to validate picture_choice parameters %s', parameters_form.errors)
-
-            elif question_type == Question.YES_NO:
-                parameters_form = YesNoParametersForm(
-                    request.POST, instance=question.parameters)
-                if parameters_form.is_valid():
-                    parameters_form.save()
-                    return redirect(self.edit_question_url, survey.id)
-                else:
-                    logger.warning(
-                        'Failed to validate yes_no parameters %s', parameters_form.errors)
-            elif question_type == Question.EMAIL:
-                parameters_form = EmailParametersForm(
-                    request.POST, instance=question.parameters)
-                if parameters_form.is_valid():
-                    parameters_form.save()
-                    return redirect(self.edit_question_url, survey.id)
-                else:
-                    logger.warning(
-                        'Failed to validate email parameters %s', parameters_form.errors)
-            elif question_type == Question.OPINION_SCALE:
-                parameters_form = OpinionScaleParametersForm(
-                    request.POST, instance=question.parameters)
-                if parameters_form.is_valid():
-                    parameters_form.save()
-                    return redirect(self.edit_question_url, survey.id)
-                else:
-                    logger.warning(
-                        'Failed to validate opinion_scale parameters %s', parameters_form.errors)
-            elif question_type == Question.RATING:
-                parameters_form = RatingParametersForm(
-                    request.POST, instance=question.parameters)
-                if parameters_form.is_valid():
-                    parameters_form.save()
-                    return redirect(self.edit_question_url, survey.id)
-                else:
-                    logger.warning(
-                        'Failed to validate rating parameters %s', parameters_form.errors)
-            elif question_type == Question.DATE:
-                parameters_form = DateParametersForm(
-                    request.POST, instance=question.parameters)
-                if parameters_form.is_valid():
-                    parameters_form.save()
-                    return redirect(self.edit_question_url, survey.id)
-                else:
-                    logger.warning(
-                        'Failed to validate date parameters %s', parameters_form.errors)
-            elif question_type == Question.NUMBER:
-                parameters_form = NumberParametersForm(
-                    request.POST, instance=question.parameters)
-                if parameters_form.is_valid():
-                    parameters_form.save()
-                    return redirect(self.edit_question_url, survey.id)
-                else:
-                    logger.warning(
-                        'Failed to validate number parameters %s', parameters_form.errors)
-            elif question_type == Question.DROPDOWN:
-                parameters_form = DropdownParametersForm(
-                    request.POST, instance=question.parameters)
-                if parameters_form.is_valid():
-                    parameters_form.save()
-                    question.choice_set.all().delete()
-                    position = 0
-                    for choice in request.POST.getlist('choice'):
-                        if choice != "":
-                            Choice.objects.create(
-                                question=question,
-                                choice=choice,
-                                position=position
-                            )
-                            position = position + 1
-                    return redirect(self.edit_question_url, survey.id)
-                else:
-                    logger.warning(
-                        'Failed to validate dropdown parameters %s', parameters_form.errors)
-            elif question_type == Question.LEGAL:
-                parameters_form = LegalParametersForm(
-                    request.POST, instance=question.parameters)
-                if parameters_form.is_valid():
-                    parameters_form.save()
-                    return redirect(self.edit_question_url, survey.id)
-                else:
-                    logger.warning(
-                        'Failed to validate legal parameters %s', parameters_form.errors)
-            elif question_type == Question.FILE_UPLOAD:
-                parameters_form = FileUploadParametersForm(
-                    request.POST, instance=question.parameters)
-                if parameters_form.is_valid():
-                    parameters_form.save()
-                    return redirect(self.edit_question_url, survey.id)
-                else:
-                    logger.warning(
-                        'Failed to validate file_upload parameters %s', parameters_form.errors)
+            handler = question.handler
+            if handler is None:
+                logger.warning('Unsupported type %s', question_type)
             elif question_type == Question.PAYMENT:
                 raise Http404
-            elif question_type == Question.WEBSITE:
-                parameters_form = WebsiteParametersForm(
+            else:
+                parameters_form = handler.parameters_form(
                     request.POST, instance=question.parameters)
                 if parameters_form.is_valid():
                     parameters_form.save()
+                    if handler.has_choices:
+                        question.update_choices(edited_choices(request, question_type))
                     return redirect(self.edit_question_url, survey.id)
                 else:
                     logger.warning(
-                        'Failed to validate website parameters %s', parameters_form.errors)
-
-            else:
-                logger.warning('Unsupported type %s', question_type)
+                        'Failed to validate %s parameters %s', handler.slug, parameters_form.errors)
 
         else:
             logger.warning('Failed to create question %s',
                            question_form.errors)
 
 
-class DeleteQuestionView(LoginRequiredMixin, View):
+class DeleteQuestionView(LoginRequiredMixin, ShardMixin, View):
     success_url = 'formsaurus_manage:survey_wizard'
 
     def get(self, request, survey_id, question_id):
@@ -815,7 +300,7 @@ class DeleteQuestionView(LoginRequiredMixin, View):
         return redirect(self.success_url, survey.id)
 
 
-class QuestionUpView(LoginRequiredMixin, View):
+class QuestionUpView(LoginRequiredMixin, ShardMixin, View):
     success_url = 'formsaurus_manage:survey_wizard'
 
     def get(self, request, survey_id, question_id):
@@ -831,7 +316,7 @@ class QuestionUpView(LoginRequiredMixin, View):
         return redirect(self.success_url, survey.id)
 
 
-class QuestionDownView(LoginRequiredMixin, View):
+class QuestionDownView(LoginRequiredMixin, ShardMixin, View):
     success_url = 'formsaurus_manage:survey_wizard'
 
     def get(self, request, survey_id, question_id):
@@ -898,7 +383,7 @@ class SurveyEditView(ManageBaseView):
             return render(request, self.template_name, context)
 
 
-class PublishSurveyView(LoginRequiredMixin, View):
+class PublishSurveyView(LoginRequiredMixin, ShardMixin, View):
     success_url = 'formsaurus_manage:survey_wizard'
 
     def get(self, request, survey_id):
@@ -906,9 +391,21 @@ class PublishSurveyView(LoginRequiredMixin, View):
         if survey.user != request.user:
             raise Http404
         survey.publish()
+        schedule_warmup(survey, scheme=request.scheme, host=request.get_host())
         return redirect(self.success_url, survey.id)
 
-class ToggleShowBrandingView(LoginRequiredMixin, View):
+class NewVersionView(LoginRequiredMixin, ShardMixin, View):
+    """Edits a published survey as a draft of its next version."""
+    success_url = 'formsaurus_manage:survey_wizard'
+
+    def get(self, request, survey_id):
+        survey = get_object_or_404(Survey, pk=survey_id)
+        if survey.user != request.user:
+            raise Http404
+        draft = survey.new_version()
+        return redirect(self.success_url, draft.id)
+
+class ToggleShowBrandingView(LoginRequiredMixin, ShardMixin, View):
     def post(self, request, survey_id):
         survey = get_object_or_404(Survey, pk=survey_id)
         if survey.user != request.user:
@@ -918,7 +415,7 @@ class ToggleShowBrandingView(LoginRequiredMixin, View):
             survey.save()
         return JsonResponse(survey.to_dict())
 
-class DeleteSurveyView(LoginRequiredMixin, View):
+class DeleteSurveyView(LoginRequiredMixin, ShardMixin, View):
     success_url = 'formsaurus_manage:surveys'
 
     def get(self, request, survey_id):
@@ -926,7 +423,7 @@ class DeleteSurveyView(LoginRequiredMixin, View):
         if survey.user != request.user:
             raise Http404
         if not survey.published:
-            survey.delete()
+            schedule_survey_deletion(survey)
         return redirect(self.success_url)
 
 
@@ -959,7 +456,7 @@ class HiddenFieldView(ManageBaseView):
         return render(request, self.template_name, context)
 
 
-class SubmissionsView(ManageBaseView):
+class SubmissionsView(ReplicaReadMixin, ManageBaseView):
     template_name = 'formsaurus/manage/submissions.html'
 
     def get(self, request, survey_id):
@@ -974,18 +471,24 @@ class SubmissionsView(ManageBaseView):
         context['survey']['submissions'] = []
         for submission in survey.submissions:
             context['survey']['submissions'].append(submission)
+        for submission in survey.archived_submissions:
+            context['survey']['submissions'].append(submission)
         return render(request, self.template_name, context)
 
 
-class SubmissionView(ManageBaseView):
+class SubmissionView(ReplicaReadMixin, ManageBaseView):
     template_name = 'formsaurus/manage/submission.html'
 
     def get(self, request, survey_id, submission_id):
         survey = get_object_or_404(Survey, pk=survey_id)
         if survey.user != request.user:
             raise Http404
-        submission = get_object_or_404(Submission, pk=submission_id)
-        if submission.survey != survey:
+        try:
+            submission = Submission.objects.get(pk=submission_id)
+        except Submission.DoesNotExist:
+            # Older submissions might have been archived
+            submission = get_object_or_404(ArchivedSubmission, pk=submission_id)
+        if submission.survey_id != survey.id:
             raise Http404
 
         context = self.context_data()
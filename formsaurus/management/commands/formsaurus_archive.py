@@ -0,0 +1,36 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from formsaurus.archive import archive_survey
+from formsaurus.sharding import all_shards, using_shard
+from formsaurus.utils import get_survey_model
+
+Survey = get_survey_model()
+
+class Command(BaseCommand):
+    help = 'Archive completed submissions older than a cutoff'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=365,
+                            help='Archive submissions completed more than this many days ago')
+        parser.add_argument('--survey_id', type=str)
+        parser.add_argument('--batch_size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        if options['days'] < 0:
+            raise CommandError('--days must be positive')
+        before = timezone.now() - datetime.timedelta(days=options['days'])
+
+        surveys = Survey.objects.all()
+        if 'survey_id' in options and options['survey_id'] is not None:
+            surveys = surveys.filter(pk=options['survey_id'])
+
+        total = 0
+        surveys = surveys.filter(submission__completed=True, submission__completed_at__lt=before).distinct()
+        for survey in all_shards(surveys):
+            with using_shard(survey._state.db):
+                count = archive_survey(survey, before, batch_size=options['batch_size'])
+            print(f"Archived {count} submission(s) of {survey.id} {survey.name}")
+            total = total + count
+        print(f"Archived {total} submission(s)")
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+from formsaurus.sharding import shard_for_survey_id
+from formsaurus.utils import get_answer_storage, get_survey_model
+
+Survey = get_survey_model()
+
+class Command(BaseCommand):
+    help = 'Compact pending answers from the answer storage into the answer tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--survey_id', type=str)
+
+    def handle(self, *args, **options):
+        survey = None
+        if 'survey_id' in options and options['survey_id'] is not None:
+            try:
+                survey = Survey.objects.using(shard_for_survey_id(options['survey_id'])).get(pk=options['survey_id'])
+            except Survey.DoesNotExist:
+                raise CommandError(f"Survey {options['survey_id']} does not exist")
+
+        count = get_answer_storage().compact(survey=survey)
+        print(f"Compacted {count} answer(s)")
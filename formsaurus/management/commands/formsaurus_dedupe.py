@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from formsaurus.models import ANSWER_MODELS
+from formsaurus.sharding import shards, sharding_enabled
+from formsaurus.storage import dedupe_answers
+
+class Command(BaseCommand):
+    help = 'Delete duplicate answers, keeping the latest answer per question and submission'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', type=str,
+                            help='Database alias, every shard when sharding is enabled')
+
+    def handle(self, *args, **options):
+        if options.get('database') is not None:
+            databases = [options['database']]
+        elif sharding_enabled():
+            databases = shards()
+        else:
+            databases = ['default']
+
+        total = 0
+        for database in databases:
+            for model in ANSWER_MODELS.values():
+                count = dedupe_answers(model, using=database)
+                if count > 0:
+                    print(f"{database}: deleted {count} duplicate {model.__name__}(s)")
+                total = total + count
+        print(f"Deleted {total} duplicate answer(s)")
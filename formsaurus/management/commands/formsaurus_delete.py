@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand, CommandError
+from formsaurus.deletion import DEFAULT_CHUNK_SIZE, delete_pending_surveys, delete_submissions, delete_survey
+from formsaurus.sharding import shard_for_survey_id, sharding_enabled, shards
+from formsaurus.utils import get_survey_model
+
+Survey = get_survey_model()
+
+class Command(BaseCommand):
+    help = 'Delete a survey, or its submissions, or the surveys marked deleted, in chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--survey_id', type=str)
+        parser.add_argument('--pending', action='store_true',
+                            help='Delete the surveys marked deleted from the manage views')
+        parser.add_argument('--database', type=str, help='Only delete pending surveys of this database')
+        parser.add_argument('--submissions', action='store_true',
+                            help='Only delete the submissions, keep the survey')
+        parser.add_argument('--preview', action='store_true',
+                            help='Only delete the preview submissions')
+        parser.add_argument('--chunk_size', type=int, default=DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] <= 0:
+            raise CommandError('--chunk_size must be positive')
+        if options['pending']:
+            if options['database'] is not None:
+                databases = [options['database']]
+            elif sharding_enabled():
+                databases = shards()
+            else:
+                databases = ['default']
+            counts = {}
+            for database in databases:
+                for label, count in delete_pending_surveys(database, chunk_size=options['chunk_size']).items():
+                    counts[label] = counts.get(label, 0) + count
+            self.report(counts)
+            return
+        if options['survey_id'] is None:
+            raise CommandError('Either --survey_id or --pending is required')
+        try:
+            survey = Survey.objects.using(shard_for_survey_id(options['survey_id'])).get(pk=options['survey_id'])
+        except Survey.DoesNotExist:
+            raise CommandError(f"Survey {options['survey_id']} does not exist")
+
+        if options['submissions'] or options['preview']:
+            counts = delete_submissions(survey, is_preview=True if options['preview'] else None,
+                                        chunk_size=options['chunk_size'])
+        else:
+            counts = delete_survey(survey, chunk_size=options['chunk_size'])
+        self.report(counts)
+
+    def report(self, counts):
+        for label, count in counts.items():
+            if count > 0:
+                print(f"{label}: {count}")
+        print(f"Deleted {sum(counts.values())} row(s)")
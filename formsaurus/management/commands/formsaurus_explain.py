@@ -0,0 +1,89 @@
+import re
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Count
+from formsaurus.models import (ANSWER_MODELS, Question, Submission, MultipleChoiceAnswer)
+from formsaurus.utils import get_survey_model
+
+Survey = get_survey_model()
+
+# How each backend reports a full table scan in its query plan
+SEQUENTIAL_SCANS = {
+    'postgresql': re.compile(r'Seq Scan on (\w+)'),
+    'sqlite': re.compile(r'\bSCAN (?:TABLE )?(\w+)'),
+    'mysql': re.compile(r"'type': 'ALL'|\bALL\b"),
+}
+
+
+def sequential_scans(vendor, plan):
+    """Returns the full table scans found in a query plan"""
+    pattern = SEQUENTIAL_SCANS.get(vendor)
+    if pattern is None:
+        return []
+    scans = []
+    for line in plan.splitlines():
+        # SQLite reports a covering index search as 'SCAN x USING COVERING INDEX'
+        if 'USING' in line and vendor == 'sqlite':
+            continue
+        match = pattern.search(line)
+        if match is not None:
+            scans.append(line.strip())
+    return scans
+
+
+class Command(BaseCommand):
+    help = "Run EXPLAIN on formsaurus' canonical queries and flag sequential scans"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--survey_id', type=str)
+        parser.add_argument('--database', type=str, default='default')
+
+    def queries(self, survey_id, question_id, submission_id):
+        yield 'Published submissions', Submission.objects.filter(
+            survey_id=survey_id, is_preview=False)
+        yield 'Completed submissions', Submission.objects.filter(
+            survey_id=survey_id, is_preview=False, completed=True)
+        yield 'Previous question', Question.objects.filter(
+            survey_id=survey_id, next_question_id=question_id)
+        yield 'Choice stats', MultipleChoiceAnswer.objects.filter(
+            question_id=question_id,
+            submission__survey_id=survey_id,
+            submission__completed=True,
+            submission__is_preview=False,
+        ).values('choices').annotate(count=Count('choices')).values('choices', 'count')
+        for model in ANSWER_MODELS.values():
+            yield f'{model.__name__} lookup', model.objects.filter(
+                question_id=question_id, submission_id=submission_id)
+
+    def handle(self, *args, **options):
+        database = options['database']
+        if database not in connections:
+            raise CommandError(f"Unknown database '{database}'")
+        vendor = connections[database].vendor
+
+        # Plans don't depend on the values, use actual rows when available
+        survey_id = uuid.uuid4()
+        question_id = uuid.uuid4()
+        submission_id = uuid.uuid4()
+        if options.get('survey_id') is not None:
+            survey = Survey.objects.using(database).get(pk=options['survey_id'])
+            survey_id = survey.id
+            question_id = survey.first_question_id or question_id
+            submission = survey.submission_set.using(database).first()
+            submission_id = submission.id if submission is not None else submission_id
+
+        flagged = 0
+        for label, qs in self.queries(survey_id, question_id, submission_id):
+            plan = qs.using(database).explain()
+            scans = sequential_scans(vendor, plan)
+            status = 'SEQUENTIAL SCAN' if len(scans) > 0 else 'ok'
+            print(f"[{status}] {label}")
+            for line in plan.splitlines():
+                print(f"    {line}")
+            flagged = flagged + (1 if len(scans) > 0 else 0)
+
+        print(f"{flagged} quer{'y' if flagged == 1 else 'ies'} using sequential scans on {vendor}")
+        if flagged > 0 and vendor == 'postgresql':
+            print("Note: the planner prefers sequential scans on small tables, run against production sized data.")
@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import OuterRef, Subquery
+from formsaurus.models import PhoneNumberAnswer, PhoneNumberParameters
+from formsaurus.phone_numbers import normalize_answer
+from formsaurus.sharding import shards, sharding_enabled
+
+class Command(BaseCommand):
+    help = 'Store the E.164 form and country code of phone number answers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', type=str,
+                            help='Database alias, every shard when sharding is enabled')
+        parser.add_argument('--missing', action='store_true',
+                            help='Only normalize answers which were never normalized')
+        parser.add_argument('--chunk_size', type=int, default=1000)
+
+    def normalize(self, database, missing, chunk_size):
+        default_country_code = PhoneNumberParameters.objects.using(database).filter(
+            question=OuterRef('question')).values('default_country_code')[:1]
+        qs = PhoneNumberAnswer.objects.using(database).exclude(phone_number=None).annotate(
+            default_country_code=Subquery(default_country_code)).order_by('pk')
+        if missing:
+            qs = qs.filter(e164=None)
+
+        updated = 0
+        last = None
+        while True:
+            chunk = qs if last is None else qs.filter(pk__gt=last)
+            answers = list(chunk[:chunk_size])
+            if len(answers) == 0:
+                break
+            changed = [answer for answer in answers if normalize_answer(answer, answer.default_country_code)]
+            PhoneNumberAnswer.objects.using(database).bulk_update(changed, ['e164', 'country_code'])
+            updated = updated + len(changed)
+            last = answers[-1].pk
+        return updated
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] <= 0:
+            raise CommandError('--chunk_size must be positive')
+        if options.get('database') is not None:
+            databases = [options['database']]
+        elif sharding_enabled():
+            databases = shards()
+        else:
+            databases = ['default']
+
+        total = 0
+        for database in databases:
+            count = self.normalize(database, options['missing'], options['chunk_size'])
+            if count > 0:
+                print(f"{database}: normalized {count} phone number(s)")
+            total = total + count
+        print(f"Normalized {total} phone number(s)")
@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from formsaurus.sharding import (move_survey, place, shard_for_survey_id, shards, sharding_enabled)
+from formsaurus.utils import get_survey_model
+
+Survey = get_survey_model()
+
+class Command(BaseCommand):
+    help = 'Report survey placement across shards and move surveys between shards'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--survey_id', type=str,
+                            help='Move a single survey')
+        parser.add_argument('--user_id', type=str,
+                            help='Move all the surveys of a user, new surveys follow')
+        parser.add_argument('--to', type=str,
+                            help='Target shard alias')
+
+    def report(self):
+        for alias in shards():
+            rows = Survey.objects.using(alias).values('user_id').annotate(count=Count('id'))
+            users = len(rows)
+            surveys = sum(row['count'] for row in rows)
+            print(f"{alias}: {surveys} survey(s), {users} user(s)")
+
+    def handle(self, *args, **options):
+        if not sharding_enabled():
+            raise CommandError('FORMSAURUS_SHARDS is not configured')
+
+        survey_id = options.get('survey_id')
+        user_id = options.get('user_id')
+        target = options.get('to')
+        if survey_id is None and user_id is None:
+            self.report()
+            return
+        if target not in shards():
+            raise CommandError(f"--to must be one of {', '.join(shards())}")
+
+        surveys = []
+        if survey_id is not None:
+            database = shard_for_survey_id(survey_id)
+            if database is None:
+                raise CommandError(f"Survey {survey_id} does not exist")
+            surveys.append(Survey.objects.using(database).get(pk=survey_id))
+        if user_id is not None:
+            # Following surveys of this user are created on the target shard
+            place(f'user:{user_id}', target)
+            for alias in shards():
+                surveys.extend(Survey.objects.using(alias).filter(user_id=user_id))
+
+        for survey in surveys:
+            source = survey._state.db
+            name = survey.name
+            count = move_survey(survey, target)
+            print(f"Moved {name} from {source} to {target} ({count} rows)")
+        self.report()
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from formsaurus.counters import fold, reconcile
+from formsaurus.sharding import shards, sharding_enabled
+
+class Command(BaseCommand):
+    help = 'Recount the submissions and completed submissions of surveys'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--survey', type=str, nargs='*',
+                            help='Survey ids, every survey by default')
+        parser.add_argument('--database', type=str,
+                            help='Database alias, every shard when sharding is enabled')
+        parser.add_argument('--fold', action='store_true',
+                            help='Only move counter slots to their surveys, without recounting')
+
+    def handle(self, *args, **options):
+        if options.get('database') is not None:
+            databases = [options['database']]
+        elif sharding_enabled():
+            databases = shards()
+        else:
+            databases = ['default']
+        survey_ids = options['survey'] or None
+
+        total = 0
+        for database in databases:
+            if options['fold']:
+                count = fold(database, survey_ids=survey_ids)
+                print(f"{database}: folded the counters of {count} survey(s)")
+            else:
+                count = reconcile(database, survey_ids=survey_ids)
+                print(f"{database}: recounted {count} survey(s)")
+            total = total + count
+        print(f"Updated {total} survey(s)")
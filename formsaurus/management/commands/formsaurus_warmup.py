@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+from formsaurus.fragments import fragment_cache
+from formsaurus.sharding import shards, sharding_enabled
+from formsaurus.utils import get_survey_model
+from formsaurus.warmup import default_host, warm_survey, warmup_workers
+
+Survey = get_survey_model()
+
+class Command(BaseCommand):
+    help = 'Render the questions of published surveys into the fragment cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--survey', type=str, nargs='*',
+                            help='Survey ids, every published survey by default')
+        parser.add_argument('--database', type=str,
+                            help='Database alias, every shard when sharding is enabled')
+        parser.add_argument('--host', type=str, default=None,
+                            help='Host respondents use, the first of ALLOWED_HOSTS by default')
+        parser.add_argument('--scheme', type=str, default='https', choices=['http', 'https'])
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Questions rendered at a time, FORMSAURUS_WARMUP_WORKERS by default')
+
+    def handle(self, *args, **options):
+        if fragment_cache() is None:
+            raise CommandError('The fragment cache is disabled, set FORMSAURUS_FRAGMENT_CACHE')
+        workers = options['workers'] if options['workers'] is not None else warmup_workers()
+        if workers <= 0:
+            raise CommandError('--workers must be positive')
+        host = options['host'] or default_host()
+        if options.get('database') is not None:
+            databases = [options['database']]
+        elif sharding_enabled():
+            databases = shards()
+        else:
+            databases = ['default']
+
+        total = 0
+        for database in databases:
+            qs = Survey.objects.using(database).filter(published=True, superseded_by=None)
+            if options['survey']:
+                qs = qs.filter(pk__in=options['survey'])
+            for survey in qs.order_by('-published_at'):
+                count = warm_survey(survey, scheme=options['scheme'], host=host, workers=workers)
+                print(f"{database}: {survey.name} ({survey.id}), {count} fragment(s)")
+                total = total + count
+        print(f"Warmed {total} fragment(s) for {host}")
@@ -0,0 +1,40 @@
+# Generated by Django 3.2.25 on 2026-10-19 16:07
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('formsaurus', '0004_survey_show_branding'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubmissionArchive',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('modified_at', models.DateTimeField(auto_now=True)),
+                ('count', models.PositiveIntegerField()),
+                ('summary', models.TextField()),
+                ('data', models.BinaryField()),
+                ('survey', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='formsaurus.survey')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedSubmission',
+            fields=[
+                ('id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField()),
+                ('completed_at', models.DateTimeField(blank=True, default=None, null=True)),
+                ('archive', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='formsaurus.submissionarchive')),
+                ('survey', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='formsaurus.survey')),
+            ],
+        ),
+    ]
@@ -0,0 +1,89 @@
+# Generated by Django 3.2.25 on 2026-10-19 16:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('formsaurus', '0005_submission_archives'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='dateanswer',
+            index=models.Index(fields=['question', 'submission'], name='dateanswer_qs_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dropdownanswer',
+            index=models.Index(fields=['question', 'submission'], name='dropdownanswer_qs_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='emailanswer',
+            index=models.Index(fields=['question', 'submission'], name='emailanswer_qs_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fileuploadanswer',
+            index=models.Index(fields=['question', 'submission'], name='fileuploadanswer_qs_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='legalanswer',
+            index=models.Index(fields=['question', 'submission'], name='legalanswer_qs_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='longtextanswer',
+            index=models.Index(fields=['question', 'submission'], name='longtextanswer_qs_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='multiplechoiceanswer',
+            index=models.Index(fields=['question', 'submission'], name='multiplechoiceanswer_qs_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='numberanswer',
+            index=models.Index(fields=['question', 'submission'], name='numberanswer_qs_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='opinionscaleanswer',
+            index=models.Index(fields=['question', 'submission'], name='opinionscaleanswer_qs_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='paymentanswer',
+            index=models.Index(fields=['question', 'submission'], name='paymentanswer_qs_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='phonenumberanswer',
+            index=models.Index(fields=['question', 'submission'], name='phonenumberanswer_qs_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='picturechoiceanswer',
+            index=models.Index(fields=['question', 'submission'], name='picturechoiceanswer_qs_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['survey', 'next_question'], name='question_survey_next_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ratinganswer',
+            index=models.Index(fields=['question', 'submission'], name='ratinganswer_qs_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='shorttextanswer',
+            index=models.Index(fields=['question', 'submission'], name='shorttextanswer_qs_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='submission',
+            index=models.Index(fields=['survey', 'is_preview', 'completed'], name='submission_survey_state_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='submission',
+            index=models.Index(condition=models.Q(('is_preview', False)), fields=['survey', 'completed', 'completed_at'], name='submission_live_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='websiteanswer',
+            index=models.Index(fields=['question', 'submission'], name='websiteanswer_qs_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='yesnoanswer',
+            index=models.Index(fields=['question', 'submission'], name='yesnoanswer_qs_idx'),
+        ),
+    ]
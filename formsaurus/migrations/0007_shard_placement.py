@@ -0,0 +1,21 @@
+# Generated by Django 3.2.25 on 2026-10-19 16:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('formsaurus', '0006_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ShardPlacement',
+            fields=[
+                ('key', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('database', models.CharField(max_length=64)),
+                ('modified_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
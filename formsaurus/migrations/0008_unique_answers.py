@@ -0,0 +1,165 @@
+# Generated by Django 3.2.25 on 2026-10-19 16:17
+
+from django.db import migrations, models
+from django.db.models import Count
+
+ANSWER_MODELS = [
+    'MultipleChoiceAnswer', 'PhoneNumberAnswer', 'ShortTextAnswer', 'LongTextAnswer',
+    'PictureChoiceAnswer', 'YesNoAnswer', 'EmailAnswer', 'OpinionScaleAnswer',
+    'RatingAnswer', 'DateAnswer', 'NumberAnswer', 'DropdownAnswer', 'LegalAnswer',
+    'FileUploadAnswer', 'PaymentAnswer', 'WebsiteAnswer',
+]
+
+
+def dedupe(apps, schema_editor):
+    # Keeps the most recently modified answer per (question, submission)
+    using = schema_editor.connection.alias
+    for name in ANSWER_MODELS:
+        model = apps.get_model('formsaurus', name)
+        duplicates = model.objects.using(using).values('question_id', 'submission_id').annotate(
+            count=Count('pk')).filter(count__gt=1)
+        for row in list(duplicates):
+            pks = list(model.objects.using(using).filter(
+                question_id=row['question_id'],
+                submission_id=row['submission_id'],
+            ).order_by('-modified_at', '-created_at').values_list('pk', flat=True))
+            model.objects.using(using).filter(pk__in=pks[1:]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('formsaurus', '0007_shard_placement'),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='dateanswer',
+            name='dateanswer_qs_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='dropdownanswer',
+            name='dropdownanswer_qs_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='emailanswer',
+            name='emailanswer_qs_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='fileuploadanswer',
+            name='fileuploadanswer_qs_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='legalanswer',
+            name='legalanswer_qs_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='longtextanswer',
+            name='longtextanswer_qs_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='multiplechoiceanswer',
+            name='multiplechoiceanswer_qs_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='numberanswer',
+            name='numberanswer_qs_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='opinionscaleanswer',
+            name='opinionscaleanswer_qs_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='paymentanswer',
+            name='paymentanswer_qs_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='phonenumberanswer',
+            name='phonenumberanswer_qs_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='picturechoiceanswer',
+            name='picturechoiceanswer_qs_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='ratinganswer',
+            name='ratinganswer_qs_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='shorttextanswer',
+            name='shorttextanswer_qs_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='websiteanswer',
+            name='websiteanswer_qs_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='yesnoanswer',
+            name='yesnoanswer_qs_idx',
+        ),
+        migrations.AddConstraint(
+            model_name='dateanswer',
+            constraint=models.UniqueConstraint(fields=('question', 'submission'), name='dateanswer_unique_answer'),
+        ),
+        migrations.AddConstraint(
+            model_name='dropdownanswer',
+            constraint=models.UniqueConstraint(fields=('question', 'submission'), name='dropdownanswer_unique_answer'),
+        ),
+        migrations.AddConstraint(
+            model_name='emailanswer',
+            constraint=models.UniqueConstraint(fields=('question', 'submission'), name='emailanswer_unique_answer'),
+        ),
+        migrations.AddConstraint(
+            model_name='fileuploadanswer',
+            constraint=models.UniqueConstraint(fields=('question', 'submission'), name='fileuploadanswer_unique_answer'),
+        ),
+        migrations.AddConstraint(
+            model_name='legalanswer',
+            constraint=models.UniqueConstraint(fields=('question', 'submission'), name='legalanswer_unique_answer'),
+        ),
+        migrations.AddConstraint(
+            model_name='longtextanswer',
+            constraint=models.UniqueConstraint(fields=('question', 'submission'), name='longtextanswer_unique_answer'),
+        ),
+        migrations.AddConstraint(
+            model_name='multiplechoiceanswer',
+            constraint=models.UniqueConstraint(fields=('question', 'submission'), name='multiplechoiceanswer_unique_answer'),
+        ),
+        migrations.AddConstraint(
+            model_name='numberanswer',
+            constraint=models.UniqueConstraint(fields=('question', 'submission'), name='numberanswer_unique_answer'),
+        ),
+        migrations.AddConstraint(
+            model_name='opinionscaleanswer',
+            constraint=models.UniqueConstraint(fields=('question', 'submission'), name='opinionscaleanswer_unique_answer'),
+        ),
+        migrations.AddConstraint(
+            model_name='paymentanswer',
+            constraint=models.UniqueConstraint(fields=('question', 'submission'), name='paymentanswer_unique_answer'),
+        ),
+        migrations.AddConstraint(
+            model_name='phonenumberanswer',
+            constraint=models.UniqueConstraint(fields=('question', 'submission'), name='phonenumberanswer_unique_answer'),
+        ),
+        migrations.AddConstraint(
+            model_name='picturechoiceanswer',
+            constraint=models.UniqueConstraint(fields=('question', 'submission'), name='picturechoiceanswer_unique_answer'),
+        ),
+        migrations.AddConstraint(
+            model_name='ratinganswer',
+            constraint=models.UniqueConstraint(fields=('question', 'submission'), name='ratinganswer_unique_answer'),
+        ),
+        migrations.AddConstraint(
+            model_name='shorttextanswer',
+            constraint=models.UniqueConstraint(fields=('question', 'submission'), name='shorttextanswer_unique_answer'),
+        ),
+        migrations.AddConstraint(
+            model_name='websiteanswer',
+            constraint=models.UniqueConstraint(fields=('question', 'submission'), name='websiteanswer_unique_answer'),
+        ),
+        migrations.AddConstraint(
+            model_name='yesnoanswer',
+            constraint=models.UniqueConstraint(fields=('question', 'submission'), name='yesnoanswer_unique_answer'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 3.2.25 on 2026-10-19 16:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('formsaurus', '0008_unique_answers'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='phonenumberanswer',
+            name='country_code',
+            field=models.PositiveSmallIntegerField(blank=True, default=None, null=True),
+        ),
+        migrations.AddField(
+            model_name='phonenumberanswer',
+            name='e164',
+            field=models.CharField(blank=True, db_index=True, default=None, max_length=16, null=True),
+        ),
+    ]
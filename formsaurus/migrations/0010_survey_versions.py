@@ -0,0 +1,29 @@
+# Generated by Django 3.2.25 on 2026-10-19 16:43
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('formsaurus', '0009_phone_number_normalization'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='survey',
+            name='previous_version',
+            field=models.ForeignKey(blank=True, default=None, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='formsaurus.survey'),
+        ),
+        migrations.AddField(
+            model_name='survey',
+            name='superseded_by',
+            field=models.ForeignKey(blank=True, default=None, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='formsaurus.survey'),
+        ),
+        migrations.AddField(
+            model_name='survey',
+            name='version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
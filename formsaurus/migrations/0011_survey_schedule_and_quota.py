@@ -0,0 +1,50 @@
+# Generated by Django 3.2.25 on 2026-10-19 16:55
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_completions(apps, schema_editor):
+    using = schema_editor.connection.alias
+    Survey = apps.get_model('formsaurus', 'Survey')
+    Submission = apps.get_model('formsaurus', 'Submission')
+    ArchivedSubmission = apps.get_model('formsaurus', 'ArchivedSubmission')
+
+    def counted(model, **filters):
+        qs = model.objects.using(using).filter(survey=OuterRef('pk'), **filters).order_by().values('survey')
+        return Coalesce(Subquery(qs.annotate(count=Count('pk')).values('count'), output_field=IntegerField()), Value(0))
+
+    Survey.objects.using(using).update(
+        completed_count=counted(Submission, is_preview=False, completed=True) + counted(ArchivedSubmission))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('formsaurus', '0010_survey_versions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='survey',
+            name='closes_at',
+            field=models.DateTimeField(blank=True, default=None, null=True),
+        ),
+        migrations.AddField(
+            model_name='survey',
+            name='completed_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='survey',
+            name='max_completions',
+            field=models.PositiveIntegerField(blank=True, default=None, null=True),
+        ),
+        migrations.AddField(
+            model_name='survey',
+            name='opens_at',
+            field=models.DateTimeField(blank=True, default=None, null=True),
+        ),
+        migrations.RunPython(count_completions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 3.2.25 on 2026-10-19 16:58
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+import django.db.models.deletion
+
+
+def count_submissions(apps, schema_editor):
+    using = schema_editor.connection.alias
+    Survey = apps.get_model('formsaurus', 'Survey')
+    Submission = apps.get_model('formsaurus', 'Submission')
+    ArchivedSubmission = apps.get_model('formsaurus', 'ArchivedSubmission')
+
+    def counted(model, **filters):
+        qs = model.objects.using(using).filter(survey=OuterRef('pk'), **filters).order_by().values('survey')
+        return Coalesce(Subquery(qs.annotate(count=Count('pk')).values('count'), output_field=IntegerField()), Value(0))
+
+    Survey.objects.using(using).update(
+        submission_count=counted(Submission, is_preview=False) + counted(ArchivedSubmission))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('formsaurus', '0011_survey_schedule_and_quota'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='survey',
+            name='submission_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.CreateModel(
+            name='SurveyCounter',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('slot', models.PositiveSmallIntegerField()),
+                ('submission_count', models.PositiveIntegerField(default=0)),
+                ('survey', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='formsaurus.survey')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='surveycounter',
+            constraint=models.UniqueConstraint(fields=('survey', 'slot'), name='surveycounter_slot_unique'),
+        ),
+        migrations.RunPython(count_submissions, migrations.RunPython.noop),
+    ]
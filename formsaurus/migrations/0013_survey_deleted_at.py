@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-19 17:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('formsaurus', '0012_submission_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='survey',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, default=None, editable=False, null=True),
+        ),
+    ]
@@ -1,17 +1,20 @@
 import logging
 import uuid
 
-from dateutil import parser
 from decimal import Decimal
 from django import forms
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db import models
-from django.utils.timezone import make_aware
+from django.db import models, transaction
+from django.utils.functional import cached_property
+from django.utils.module_loading import import_string
 from django.utils import timezone
 from phonenumber_field.modelfields import PhoneNumberField
 from urllib.parse import urlparse
 
+from formsaurus.phone_numbers import normalize_phone_number
+from formsaurus.utils import get_answer_storage
+
 User = get_user_model()
 
 logger = logging.getLogger('formsaurus')
@@ -52,6 +55,57 @@ class Shape:
         self.name = name
         self.disabled = disabled
 
+
+class QuestionTypeHandler:
+    """
+    Everything specific to a question type: its parameters model and form,
+    answer model, how answers are recorded and aggregated, its serializer
+    and template. Handlers are registered in QUESTION_TYPES by type code.
+    """
+
+    def __init__(self, question_type, slug, parameters_model, answer_model=None, recorder=None,
+                 stats=None, compiler=None, has_choices=False, template=True):
+        self.type = question_type
+        self.slug = slug
+        self.parameters_model = parameters_model
+        self.answer_model = answer_model
+        # Name of the Submission method recording answers, None when not answerable
+        self.recorder = recorder
+        # Name of the Stats method aggregating answers, None when not aggregated
+        self.stats = stats
+        # Name of the formsaurus.compiler function building the answer parser
+        self.compiler = compiler
+        self.has_choices = has_choices
+        self.template_name = f'formsaurus/templates/{slug}.html' if template else None
+        self.serializer = f'{question_type.lower()}_parameters'
+        self.parameters_set = f'{parameters_model._meta.model_name}_set'
+        self.parameters_form_path = f'formsaurus.manage.forms.{parameters_model.__name__}Form'
+
+    def __str__(self):
+        return f'{self.type} {self.slug}'
+
+    @property
+    def name(self):
+        return dict(Question.TYPES)[self.type]
+
+    @cached_property
+    def parameters_form(self):
+        # Forms import the models, resolve them on first use
+        return import_string(self.parameters_form_path)
+
+    def parameters(self, question):
+        return getattr(question, self.parameters_set).first()
+
+    def parser(self, question):
+        if self.compiler is None:
+            return None
+        return import_string(f'formsaurus.compiler.{self.compiler}')(question.parameters)
+
+    def record(self, submission, question, post_data, files_data):
+        if self.recorder is None:
+            return None, None
+        return getattr(submission, self.recorder)(question, post_data, files_data)
+
 class AbstractSurvey(BaseModel):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     name = models.CharField(max_length=1024)
@@ -62,15 +116,58 @@ class AbstractSurvey(BaseModel):
     last_question = models.ForeignKey('Question', on_delete=models.SET_NULL,
                                       blank=True, null=True, default=None, related_name='last_question')
     show_branding = models.BooleanField(default=True)
+    # Published surveys are immutable versions, see formsaurus.versions
+    version = models.PositiveIntegerField(default=1)
+    previous_version = models.ForeignKey(
+        'self', on_delete=models.SET_NULL, blank=True, null=True, default=None, related_name='+')
+    superseded_by = models.ForeignKey(
+        'self', on_delete=models.SET_NULL, blank=True, null=True, default=None, related_name='+')
+    # Schedule and quota, see `is_open`
+    opens_at = models.DateTimeField(default=None, null=True, blank=True)
+    closes_at = models.DateTimeField(default=None, null=True, blank=True)
+    max_completions = models.PositiveIntegerField(default=None, null=True, blank=True)
+    # Submissions and completed submissions (archived ones included), see formsaurus.counters
+    submission_count = models.PositiveIntegerField(default=0, editable=False)
+    completed_count = models.PositiveIntegerField(default=0, editable=False)
+    # Set when the survey is scheduled for deletion, see formsaurus.deletion
+    deleted_at = models.DateTimeField(default=None, null=True, blank=True, editable=False)
+
+    # Only ever written with F() updates, see formsaurus.counters
+    COUNTERS = ['submission_count', 'completed_count']
 
     class Meta:
         abstract = True
 
+    def save(self, *args, **kwargs):
+        # Saving a survey loaded before submissions came in must not roll its counters back
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTERS]
+        super().save(*args, **kwargs)
+
     def publish(self):
-        Submission.objects.filter(survey=self, is_preview=True).delete()
+        from formsaurus.deletion import delete_submissions
+        from formsaurus.versions import supersede
+        delete_submissions(self, is_preview=True)
         self.published = True
         self.published_at = timezone.now()
         self.save()
+        supersede(self)
+
+    def new_version(self):
+        """
+        Returns the draft to edit instead of this published survey, a copy
+        of its structure created on first use. Unpublished surveys are
+        their own draft.
+        """
+        from formsaurus.versions import draft_version
+        return draft_version(self)
+
+    @property
+    def version_key(self):
+        """Identifies the structure of a published survey, which never changes"""
+        return f'{self.id}:{self.version}'
 
     @property
     def question_types(self):
@@ -91,13 +188,35 @@ class AbstractSurvey(BaseModel):
             )
         return types
 
+    def can_view(self, user):
+        """
+        This can be overwritten to restrict who can view a survey.
+        Unpublished surveys are only visible to their owner (preview).
+        Respondent views cache the result, see formsaurus.gates.
+        """
+        return self.published or self.user_id == user.id
+
+    @property
+    def is_open(self):
+        """
+        Whether now is within the schedule and the quota of completed
+        submissions isn't reached, without querying the database.
+        """
+        now = timezone.now()
+        if self.opens_at is not None and now < self.opens_at:
+            return False
+        if self.closes_at is not None and now >= self.closes_at:
+            return False
+        return self.max_completions is None or self.completed_count < self.max_completions
+
     @property
     def answerable(self):
         """
         This can be overwitten to limit when a survey can be
-        answered (maybe based no number of answers)
+        answered (maybe based no number of answers, see
+        formsaurus.gates.completions). Respondent views cache the result.
         """
-        return True
+        return self.is_open
 
     @property
     def rating_shapes(self):
@@ -133,11 +252,13 @@ class AbstractSurvey(BaseModel):
         return None
 
     def to_dict(self):
+        from formsaurus.gates import answerable
         return {
             'id': str(self.id),
             'name': self.name,
             'published': self.published,
-            'answerable': self.answerable,
+            'version': self.version,
+            'answerable': answerable(self),
             'logic_enabled': self.logic_enabled,
             'has_unsplash': hasattr(settings, 'UNSPLASH_ACCESS_KEY'),
             'has_pexels': hasattr(settings, 'PEXELS_API_KEY'),
@@ -152,6 +273,10 @@ class AbstractSurvey(BaseModel):
     def submissions(self):
         return self.submission_set.filter(is_preview=False).all()
 
+    @property
+    def archived_submissions(self):
+        return self.archivedsubmission_set.order_by('completed_at').all()
+
     @property
     def questions(self):
         questions = self.question_set.all()
@@ -283,14 +408,10 @@ class AbstractSurvey(BaseModel):
             position_y=position_y,
             opacity=opacity,
         )
-        position = 0
-        for choice in choices:
-            Choice.objects.create(
-                question=question,
-                choice=choice,
-                position=position,
-            )
-            position = position + 1
+        Choice.objects.bulk_create([
+            Choice(question=question, choice=choice, position=position)
+            for position, choice in enumerate(choices)
+        ])
         self.append_question(question)
         return question
 
@@ -404,15 +525,10 @@ class AbstractSurvey(BaseModel):
             opacity=opacity,
         )
 
-        position = 0
-        for choice in choices:
-            Choice.objects.create(
-                question=question,
-                choice=choice['label'],
-                image_url=choice['image_url'],
-                position=position,
-            )
-            position=position+1
+        Choice.objects.bulk_create([
+            Choice(question=question, choice=choice['label'], image_url=choice['image_url'], position=position)
+            for position, choice in enumerate(choices)
+        ])
         self.append_question(question)
         return question
 
@@ -570,14 +686,10 @@ class AbstractSurvey(BaseModel):
             position_y=position_y,
             opacity=opacity,
         )
-        position = 0
-        for choice in choices:
-            Choice.objects.create(
-                question=question,
-                choice=choice,
-                position=position,
-            )
-            position = position + 1
+        Choice.objects.bulk_create([
+            Choice(question=question, choice=choice, position=position)
+            for position, choice in enumerate(choices)
+        ])
         self.append_question(question)
         return question
 
@@ -786,6 +898,12 @@ class Question(BaseModel):
     next_question = models.ForeignKey('Question', on_delete=models.SET_NULL,
                                       related_name='previous_question', blank=True, null=True, default=None)
 
+    class Meta:
+        indexes = [
+            # Looking up the previous question when reordering/deleting
+            models.Index(fields=['survey', 'next_question'], name='question_survey_next_idx'),
+        ]
+
     @classmethod
     def type_name(cls, question_type):
         for value in Question.TYPES:
@@ -832,48 +950,110 @@ class Question(BaseModel):
     def __str__(self):
         return f"{self.short_id} {self.question_type} {self.question}"
 
+    def resolve_choices(self, values):
+        """
+        Resolves submitted choice ids against the choices of this question
+        in a single query. Returns the matched choices in submitted order
+        and the values that are not one of them (other option, or ids of
+        another question's choices).
+        """
+        keys = []
+        for value in values:
+            try:
+                keys.append(uuid.UUID(str(value)))
+            except ValueError:
+                keys.append(None)
+        ids = [key for key in keys if key is not None]
+        found = self.choice_set.in_bulk(ids) if len(ids) > 0 else {}
+        picked = []
+        unmatched = []
+        for value, key in zip(values, keys):
+            if key in found:
+                picked.append(found[key])
+            else:
+                unmatched.append(value)
+        return picked, unmatched
+
+    def update_choices(self, choices):
+        """
+        Replaces the choices of this question with `choices`, a list of
+        {'choice': label, 'image_url': url, 'id': id} in display order,
+        `id` being the id of the edited choice, if any.
+
+        Existing choices are matched by id, then choices posted without an
+        id by label (and image), so recorded answers and logic conditions
+        pointing to a choice survive reordering and editing. Choices left
+        unmatched are deleted along with their conditions, never reused
+        for another choice. Only changed rows are written, in bulk.
+        """
+        existing = list(self.choice_set.order_by('position'))
+        by_id = {str(choice.id): choice for choice in existing}
+        matched = [None] * len(choices)
+        for index, choice in enumerate(choices):
+            if choice.get('id'):
+                matched[index] = by_id.pop(str(choice['id']), None)
+        by_content = {}
+        for choice in existing:
+            if str(choice.id) in by_id:
+                by_content.setdefault((choice.choice, choice.image_url), []).append(choice)
+        for index, choice in enumerate(choices):
+            if matched[index] is not None or choice.get('id'):
+                continue
+            candidates = by_content.get((choice['choice'], choice.get('image_url')), [])
+            if len(candidates) > 0:
+                matched[index] = candidates.pop(0)
+        used = set(choice.id for choice in matched if choice is not None)
+        remaining = [choice for choice in existing if choice.id not in used]
+
+        updated = []
+        created = []
+        for position, choice in enumerate(choices):
+            instance = matched[position]
+            if instance is None:
+                created.append(Choice(
+                    question=self,
+                    choice=choice['choice'],
+                    image_url=choice.get('image_url'),
+                    position=position,
+                ))
+                continue
+            if (instance.choice, instance.image_url, instance.position) != (choice['choice'], choice.get('image_url'), position):
+                instance.choice = choice['choice']
+                instance.image_url = choice.get('image_url')
+                instance.position = position
+                instance.modified_at = timezone.now()
+                updated.append(instance)
+
+        if len(remaining) > 0:
+            Choice.objects.filter(pk__in=[choice.id for choice in remaining]).delete()
+        if len(updated) > 0:
+            Choice.objects.bulk_update(updated, ['choice', 'image_url', 'position', 'modified_at'])
+        if len(created) > 0:
+            Choice.objects.bulk_create(created)
+
+    @staticmethod
+    def handler_for(question_type):
+        return QUESTION_TYPES.get(question_type)
+
     @property
+    def handler(self):
+        return QUESTION_TYPES.get(self.question_type)
+
+    @cached_property
     def parameters(self):
-        if self.question_type == Question.WELCOME_SCREEN:
-            return self.welcomeparameters_set.first()
-        elif self.question_type == Question.THANK_YOU_SCREEN:
-            return self.thankyouparameters_set.first()
-        elif self.question_type == Question.MULTIPLE_CHOICE:
-            return self.multiplechoiceparameters_set.first()
-        elif self.question_type == Question.PHONE_NUMBER:
-            return self.phonenumberparameters_set.first()
-        elif self.question_type == Question.SHORT_TEXT:
-            return self.shorttextparameters_set.first()
-        elif self.question_type == Question.LONG_TEXT:
-            return self.longtextparameters_set.first()
-        elif self.question_type == Question.STATEMENT:
-            return self.statementparameters_set.first()
-        elif self.question_type == Question.PICTURE_CHOICE:
-            return self.picturechoiceparameters_set.first()
-        elif self.question_type == Question.YES_NO:
-            return self.yesnoparameters_set.first()
-        elif self.question_type == Question.EMAIL:
-            return self.emailparameters_set.first()
-        elif self.question_type == Question.OPINION_SCALE:
-            return self.opinionscaleparameters_set.first()
-        elif self.question_type == Question.RATING:
-            return self.ratingparameters_set.first()
-        elif self.question_type == Question.DATE:
-            return self.dateparameters_set.first()
-        elif self.question_type == Question.NUMBER:
-            return self.numberparameters_set.first()
-        elif self.question_type == Question.DROPDOWN:
-            return self.dropdownparameters_set.first()
-        elif self.question_type == Question.LEGAL:
-            return self.legalparameters_set.first()
-        elif self.question_type == Question.FILE_UPLOAD:
-            return self.fileuploadparameters_set.first()
-        elif self.question_type == Question.PAYMENT:
-            return self.paymentparameters_set.first()
-        elif self.question_type == Question.WEBSITE:
-            return self.websiteparameters_set.first()
+        # Loaded once per instance, the respondent views read it repeatedly
+        handler = self.handler
+        if handler is None:
+            return None
+        return handler.parameters(self)
 
-        return None
+    @cached_property
+    def parser(self):
+        """Answer parser compiled from the parameters, see formsaurus.compiler"""
+        handler = self.handler
+        if handler is None:
+            return None
+        return handler.parser(self)
 
 # PARAMETERS FOR THE DIFFERENT QUESTION TYPES
 
@@ -1115,553 +1295,358 @@ def is_empty(text):
     return text is None or text.strip() == ""
 
 
-def is_number(s):
-    try:
-        float(s)
-        return True
-    except ValueError:
-        pass
-
-    try:
-        import unicodedata
-        unicodedata.numeric(s)
-        return True
-    except (TypeError, ValueError):
-        pass
-
-    return False
-
-
 class Submission(BaseModel):
     survey = models.ForeignKey(Survey, on_delete=models.CASCADE)
     is_preview = models.BooleanField(default=False)
     completed = models.BooleanField(default=False)
     completed_at = models.DateTimeField(blank=True, null=True, default=None)
 
+    class Meta:
+        indexes = [
+            # Also serves (survey, is_preview) lookups as a prefix
+            models.Index(fields=['survey', 'is_preview', 'completed'], name='submission_survey_state_idx'),
+            # Published submissions only, on backends supporting partial indexes
+            models.Index(fields=['survey', 'completed', 'completed_at'], name='submission_live_idx',
+                         condition=models.Q(is_preview=False)),
+        ]
+
+    def save(self, *args, **kwargs):
+        from formsaurus.counters import submission_started
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        if adding and not self.is_preview:
+            submission_started(self)
+
+    @property
+    def counted_survey_id(self):
+        """The survey counting this submission, the latest version of its survey, see formsaurus.versions"""
+        return self.survey.superseded_by_id or self.survey_id
+
     def complete(self):
-        self.completed = True
-        self.completed_at = timezone.now()
-        self.save()
+        """
+        Marks the submission completed and counts it in its survey's
+        completed_count. Returns False, leaving the submission incomplete,
+        when the survey's quota was reached in the meantime.
+        """
+        from formsaurus.gates import submission_completed
+        using = self._state.db
+        completed_at = timezone.now()
+        with transaction.atomic(using=using):
+            # Surveys with a thank you screen complete twice, count once
+            newly_completed = Submission.objects.using(using).filter(pk=self.pk, completed=False).update(
+                completed=True, completed_at=completed_at) == 1
+            if newly_completed and not self.is_preview:
+                # Conditional increment: concurrent completions can't overshoot the quota
+                counted = Survey.objects.using(using).filter(pk=self.counted_survey_id).filter(
+                    models.Q(max_completions=None) | models.Q(completed_count__lt=models.F('max_completions'))
+                ).update(completed_count=models.F('completed_count') + 1)
+                if counted == 0:
+                    transaction.set_rollback(True)
+                    return False
+        if newly_completed:
+            self.completed = True
+            self.completed_at = completed_at
+            submission_completed(self)
+        return True
 
     def answers(self):
-        answers = []
-        for answer in self.multiplechoiceanswer_set.all():
-            answers.append(answer)
-        for answer in self.phonenumberanswer_set.all():
-            answers.append(answer)
-        for answer in self.shorttextanswer_set.all():
-            answers.append(answer)
-        for answer in self.longtextanswer_set.all():
-            answers.append(answer)
-        for answer in self.picturechoiceanswer_set.all():
-            answers.append(answer)
-        for answer in self.yesnoanswer_set.all():
-            answers.append(answer)
-        for answer in self.emailanswer_set.all():
-            answers.append(answer)
-        for answer in self.opinionscaleanswer_set.all():
-            answers.append(answer)
-        for answer in self.ratinganswer_set.all():
-            answers.append(answer)
-        for answer in self.dateanswer_set.all():
-            answers.append(answer)
-        for answer in self.numberanswer_set.all():
-            answers.append(answer)
-        for answer in self.dropdownanswer_set.all():
-            answers.append(answer)
-        for answer in self.legalanswer_set.all():
-            answers.append(answer)
-        for answer in self.fileuploadanswer_set.all():
-            answers.append(answer)
-        for answer in self.paymentanswer_set.all():
-            answers.append(answer)
-        for answer in self.websiteanswer_set.all():
-            answers.append(answer)
-        return answers
+        return get_answer_storage().answers(self)
+
+    def filled_fields(self):
+        return self.filledfield_set.all()
 
     def previous_answer(self, question):
-        if question.question_type == Question.WELCOME_SCREEN:
-            return None
-        elif question.question_type == Question.THANK_YOU_SCREEN:
-            return None
-        elif question.question_type == Question.MULTIPLE_CHOICE:
-            try:
-                return MultipleChoiceAnswer.objects.get(
-                    question=question,
-                    submission=self,
-                )
-            except:
-                return None
-        elif question.question_type == Question.PHONE_NUMBER:
-            try:
-                return PhoneNumberAnswer.objects.get(
-                    question=question,
-                    submission=self,
-                )
-            except:
-                return None
-        elif question.question_type == Question.SHORT_TEXT:
-            try:
-                return ShortTextAnswer.objects.get(
-                    question=question,
-                    submission=self,
-                )
-            except:
-                return None
-        elif question.question_type == Question.LONG_TEXT:
-            try:
-                return LongTextAnswer.objects.get(
-                    question=question,
-                    submission=self,
-                )
-            except:
-                return None
-        elif question.question_type == Question.STATEMENT:
-            return None
-        elif question.question_type == Question.PICTURE_CHOICE:
-            try:
-                return PictureChoiceAnswer.objects.get(
-                    question=question,
-                    submission=self,
-                )
-            except:
-                return None
-        elif question.question_type == Question.YES_NO:
-            try:
-                return YesNoAnswer.objects.get(
-                    question=question,
-                    submission=self,
-                )
-            except:
-                return None
-        elif question.question_type == Question.EMAIL:
-            try:
-                return EmailAnswer.objects.get(
-                    question=question,
-                    submission=self,
-                )
-            except:
-                return None
-        elif question.question_type == Question.OPINION_SCALE:
-            try:
-                return OpinionScaleAnswer.objects.get(
-                    question=question,
-                    submission=self,
-                )
-            except:
-                return None
-        elif question.question_type == Question.RATING:
-            try:
-                return RatingAnswer.objects.get(
-                    question=question,
-                    submission=self,
-                )
-            except:
-                return None
-        elif question.question_type == Question.DATE:
-            try:
-                return DateAnswer.objects.get(
-                    question=question,
-                    submission=self,
-                )
-            except:
-                return None
-        elif question.question_type == Question.NUMBER:
-            try:
-                return NumberAnswer.objects.get(
-                    question=question,
-                    submission=self,
-                )
-            except:
-                return None
-        elif question.question_type == Question.DROPDOWN:
-            try:
-                return DropdownAnswer.objects.get(
-                    question=question,
-                    submission=self,
-                )
-            except:
-                return None
-        elif question.question_type == Question.LEGAL:
-            try:
-                return LegalAnswer.objects.get(
-                    question=question,
-                    submission=self,
-                )
-            except:
-                return None
-        elif question.question_type == Question.FILE_UPLOAD:
-            try:
-                return FileUploadAnswer.objects.get(
-                    question=question,
-                    submission=self,
-                )
-            except:
-                return None
-        elif question.question_type == Question.PAYMENT:
-            return None
-        elif question.question_type == Question.WEBSITE:
-            try:
-                return WebsiteAnswer.objects.get(
-                    question=question,
-                    submission=self,
-                )
-            except:
-                return None
-        return None
+        return get_answer_storage().previous_answer(self, question)
 
     def record_answer(self, question, post_data, files_data):
-        answer = self.previous_answer(question)
-        if question.question_type == Question.WELCOME_SCREEN:
+        # Answers are upserted on (question, submission), a new instance
+        # replaces any previous answer
+        handler = question.handler
+        if handler is None:
             return None, None
-        elif question.question_type == Question.THANK_YOU_SCREEN:
-            return None, None
-        elif question.question_type == Question.MULTIPLE_CHOICE:
-            choices = []
-            for choice_id in post_data.getlist('answer'):
-                if not is_empty(choice_id):
-                    choices.append(choice_id)
-            logger.debug(f'<Question:{question}> {choices}')
-
-            if question.required and len(choices) == 0:
-                logger.info(f'<Question:{question}> MissingRequiredAnswer()')
-                return None, MissingRequiredAnswer()
-
-            parameters = question.parameters
-            if choices is not None and not parameters.multiple_selection and len(choices) > 1:
-                logger.info(f'<Question:{question}> OutOfRangeAnswer()')
+        return handler.record(self, question, post_data, files_data)
+
+    def record_choices(self, question, post_data, files_data):
+        choices = []
+        for choice_id in post_data.getlist('answer'):
+            if not is_empty(choice_id):
+                choices.append(choice_id)
+        logger.debug(f'<Question:{question}> {choices}')
+
+        if question.required and len(choices) == 0:
+            logger.info(f'<Question:{question}> MissingRequiredAnswer()')
+            return None, MissingRequiredAnswer()
+
+        parameters = question.parameters
+        if choices is not None and not parameters.multiple_selection and len(choices) > 1:
+            logger.info(f'<Question:{question}> OutOfRangeAnswer()')
+            return None, OutOfRangeAnswer()
+
+        picked, unmatched = question.resolve_choices(choices)
+        logger.debug(f"<Question:{question}> Matched Choices {picked}")
+        other = None
+        for choice_id in unmatched:
+            if not parameters.other_option:
+                logger.info(f'<Question:{question}> OutOfRangeAnswer() Other detected when not allowed')
                 return None, OutOfRangeAnswer()
+            logger.debug(f"<Question:{question}> Other '{choice_id}'")
+            other = choice_id
+
+        answer = question.handler.answer_model(
+            question=question,
+            submission=self,
+        )
+        if other is not None:
+            answer.other = other
+        get_answer_storage().save(answer, choices=picked)
+        return answer, None
+
+    def record_phone_number(self, question, post_data, files_data):
+        phone_number = post_data.get('answer', None)
+        logger.debug(f'<Question:{question}> {phone_number}')
+        if question.required and is_empty(phone_number):
+            logger.info(f'<Question:{question}> MissingRequiredAnswer()')
+            return None, MissingRequiredAnswer()
+
+        answer = PhoneNumberAnswer(
+            question=question,
+            submission=self,
+        )
+        answer.phone_number = phone_number
+        answer.e164, answer.country_code = normalize_phone_number(
+            phone_number, question.parameters.default_country_code)
+        get_answer_storage().save(answer)
+        return answer, None
+
+    def record_short_text(self, question, post_data, files_data):
+        short_text = post_data.get('answer', None)
+        if question.required and is_empty(short_text):
+            logger.info(f'<Question:{question}> MissingRequiredAnswer()')
+            return None, MissingRequiredAnswer()
+
+        # Is it within parameters
+        parameters = question.parameters
+        if parameters.limit_character and len(short_text) > parameters.limit:
+            return None, OutOfRangeAnswer()
+
+        answer = ShortTextAnswer(
+            question=question,
+            submission=self,
+        )
+        answer.short_text = short_text
+        get_answer_storage().save(answer)
+        return answer, None
 
-            if answer is None:
-                answer = MultipleChoiceAnswer(
-                    question=question,
-                    submission=self,
-                )
-                answer.save()
-
-            # Clear choices first
-            answer.choices.clear()
-            # Add each choice
-            for choice_id in choices:
-                logger.debug(f"<Question:{question}> Recording Choice '{choice_id}'")
-                if choice_id is not None:
-                    try:
-                        choice = Choice.objects.get(pk=choice_id)
-                        logger.debug(f"<Question:{question}> Matched Choice <Choice:{choice}>")
-                        answer.choices.add(choice)
-                    except:
-                        if not parameters.other_option:
-                            logger.info(f'<Question:{question}> OutOfRangeAnswer() Other detected when not allowed')
-                            return OutOfRangeAnswer()
-                        logger.debug(f"<Question:{question}> Other '{choice_id}'")
-                        answer.other = choice_id
-                        answer.save()
+    def record_long_text(self, question, post_data, files_data):
+        long_text = post_data.get('answer', None)
+        if question.required and is_empty(long_text):
+            return None, MissingRequiredAnswer()
 
-            return answer, None
-        elif question.question_type == Question.PHONE_NUMBER:
-            phone_number = post_data.get('answer', None)
-            logger.debug(f'<Question:{question}> {phone_number}')
-            if question.required and is_empty(phone_number):
-                logger.info(f'<Question:{question}> MissingRequiredAnswer()')
-                return None, MissingRequiredAnswer()
-
-            if answer is None:
-                answer = PhoneNumberAnswer(
-                    question=question,
-                    submission=self,
-                )
-            answer.phone_number = phone_number
-            answer.save()
-            return answer, None
-        elif question.question_type == Question.SHORT_TEXT:
-            short_text = post_data.get('answer', None)
-            if question.required and is_empty(short_text):
-                logger.info(f'<Question:{question}> MissingRequiredAnswer()')
-                return None, MissingRequiredAnswer()
-
-            # Is it within parameters
-            parameters = question.parameters
-            if parameters.limit_character and len(short_text) > parameters.limit:
-                return None, OutOfRangeAnswer()
+        # Is it within parameters
+        parameters = question.parameters
+        if parameters.limit_character and len(long_text) > parameters.limit:
+            return None, OutOfRangeAnswer()
 
-            if answer is None:
-                answer = ShortTextAnswer(
-                    question=question,
-                    submission=self,
-                )
-            answer.short_text = short_text
-            answer.save()
-            return answer, None
-        elif question.question_type == Question.LONG_TEXT:
-            long_text = post_data.get('answer', None)
-            if question.required and is_empty(long_text):
-                return None, MissingRequiredAnswer()
-
-            # Is it within parameters
-            parameters = question.parameters
-            if parameters.limit_character and len(long_text) > parameters.limit:
-                return None, OutOfRangeAnswer()
+        answer = LongTextAnswer(
+            question=question,
+            submission=self,
+        )
+        answer.long_text = long_text
+        get_answer_storage().save(answer)
+        return answer, None
 
-            if answer is None:
-                answer = LongTextAnswer(
-                    question=question,
-                    submission=self,
-                )
-            answer.long_text = long_text
-            answer.save()
-            return answer, None
-        elif question.question_type == Question.STATEMENT:
-            return None, None
-        elif question.question_type == Question.PICTURE_CHOICE:
-            choices = []
-            for choice_id in post_data.getlist('answer'):
-                if not is_empty(choice_id):
-                    choices.append(choice_id)
-            logger.debug(f'<Question:{question}> {choices}')
-            if question.required and len(choices) == 0:
-                logger.info(f'<Question:{question}> MissingRequiredAnswer()')
-                return None, MissingRequiredAnswer()
-
-            parameters = question.parameters
-            if choices is not None and not parameters.multiple_selection and len(choices) > 1:
-                logger.info(f'<Question:{question}> OutOfRangeAnswer()')
-                return None, OutOfRangeAnswer()
+    def record_yes_no(self, question, post_data, files_data):
+        y = post_data.get('answer', None)
+        if y not in ['Yes', 'No', None]:
+            return None, OutOfRangeAnswer()
 
-            if answer is None:
-                answer = PictureChoiceAnswer(
-                    question=question,
-                    submission=self
-                )
-                answer.save()
-
-            answer.choices.clear()
-            for choice_id in choices:
-                logger.debug(f"<Question:{question}> Recording Choice '{choice_id}'")
-                if choice_id is not None:
-                    try:
-                        choice = Choice.objects.get(pk=choice_id)
-                        logger.debug(f"<Question:{question}> Matched Choice <Choice:{choice}>")
-                        answer.choices.add(choice)
-                    except:
-                        if not parameters.other_option:
-                            logger.info(f'<Question:{question}> OutOfRangeAnswer() Other detected when not allowed')
-                            return OutOfRangeAnswer()
-                        logger.debug(f"<Question:{question}> Other '{choice_id}'")
-                        answer.other = choice_id
-                        answer.save()
+        if y is None and question.required:
+            return None, MissingRequiredAnswer()
 
-            return answer, None
-        elif question.question_type == Question.YES_NO:
-            y = post_data.get('answer', None)
-            if y not in ['Yes', 'No', None]:
-                return None, OutOfRangeAnswer()
+        if y == 'Yes':
+            y = True
+        elif y == 'No':
+            y = False
 
-            if y is None and question.required:
-                return None, MissingRequiredAnswer()
-
-            if y == 'Yes':
-                y = True
-            elif y == 'No':
-                y = False
-
-            if answer is None:
-                answer = YesNoAnswer(
-                    question=question,
-                    submission=self,
-                )
-            answer.yes = y
-            answer.save()
-            return answer, None
-        elif question.question_type == Question.EMAIL:
-            email = post_data.get('answer', None)
-            if question.required and is_empty(email):
-                return None, MissingRequiredAnswer()
-
-            if answer is None:
-                answer = EmailAnswer(
-                    question=question,
-                    submission=self,
-                )
-            answer.email = email
-            answer.save()
-            return answer, None
-        elif question.question_type == Question.OPINION_SCALE:
-            level = post_data.get('answer', None)
-            if level is not None:
-                level = Decimal(level)
-            if question.required and level is None:
-                return None, MissingRequiredAnswer()
-
-            parameters = question.parameters
-            if parameters.start_at_one and level < 1:
-                return None, OutOfRangeAnswer()
-            elif not parameters.start_at_one and level < 0:
-                return None, OutOfRangeAnswer()
-            max_value = parameters.number_of_steps
-            if parameters.start_at_one:
-                max_value = max_value + 1
-            if level >= max_value:
-                return None, OutOfRangeAnswer()
+        answer = YesNoAnswer(
+            question=question,
+            submission=self,
+        )
+        answer.yes = y
+        get_answer_storage().save(answer)
+        return answer, None
 
-            if answer is None:
-                answer = OpinionScaleAnswer(
-                    question=question,
-                    submission=self,
-                )
-            answer.opinion = level
-            answer.save()
-            return answer, None
-        elif question.question_type == Question.RATING:
-            level = post_data.get('answer', None)
-            if level is not None:
-                level = Decimal(level)
-            if question.required and level is None:
-                return None, MissingRequiredAnswer()
-
-            parameters = question.parameters
-            if level > parameters.number_of_steps:
-                return None, OutOfRangeAnswer()
-            elif level < 0:
-                return None, OutOfRangeAnswer()
+    def record_email(self, question, post_data, files_data):
+        email = post_data.get('answer', None)
+        if question.required and is_empty(email):
+            return None, MissingRequiredAnswer()
 
-            if answer is None:
-                answer = RatingAnswer(
-                    question=question,
-                    submission=self,
-                )
-            answer.rating = level
-            answer.save()
-            return answer, None
-        elif question.question_type == Question.DATE:
-            raw = post_data.get('answer', None)
-            if question.required and raw is None:
-                return None, MissingRequiredAnswer()
-
-            date = None
-            if raw is not None:
-                try:
-                    date = make_aware(parser.parse(raw))
-                except:
-                    return None, OutOfRangeAnswer()
-
-            if answer is None:
-                answer = DateAnswer(
-                    question=question,
-                    submission=self,
-                )
-            answer.date = date
-            answer.save()
-            return answer, None
-        elif question.question_type == Question.NUMBER:
-            number = post_data.get('answer', None)
-            if question.required and number is None:
-                return None, MissingRequiredAnswer()
+        answer = EmailAnswer(
+            question=question,
+            submission=self,
+        )
+        answer.email = email
+        get_answer_storage().save(answer)
+        return answer, None
+
+    def record_opinion_scale(self, question, post_data, files_data):
+        level = post_data.get('answer', None)
+        if level is not None:
+            level = Decimal(level)
+        if question.required and level is None:
+            return None, MissingRequiredAnswer()
+
+        parameters = question.parameters
+        if parameters.start_at_one and level < 1:
+            return None, OutOfRangeAnswer()
+        elif not parameters.start_at_one and level < 0:
+            return None, OutOfRangeAnswer()
+        max_value = parameters.number_of_steps
+        if parameters.start_at_one:
+            max_value = max_value + 1
+        if level >= max_value:
+            return None, OutOfRangeAnswer()
+
+        answer = OpinionScaleAnswer(
+            question=question,
+            submission=self,
+        )
+        answer.opinion = level
+        get_answer_storage().save(answer)
+        return answer, None
+
+    def record_rating(self, question, post_data, files_data):
+        level = post_data.get('answer', None)
+        if level is not None:
+            level = Decimal(level)
+        if question.required and level is None:
+            return None, MissingRequiredAnswer()
+
+        parameters = question.parameters
+        if level > parameters.number_of_steps:
+            return None, OutOfRangeAnswer()
+        elif level < 0:
+            return None, OutOfRangeAnswer()
+
+        answer = RatingAnswer(
+            question=question,
+            submission=self,
+        )
+        answer.rating = level
+        get_answer_storage().save(answer)
+        return answer, None
 
-            if number is not None and not is_number(number):
-                return None, OutOfRangeAnswer()
-            if number is not None:
-                try:
-                    number = Decimal(number)
-                except:
-                    try:
-                        import unicodedata
-                        number = unicodedata.numeric(number)
-                    except (TypeError, ValueError):
-                        return None, OutOfRangeAnswer()
-
-            parameters = question.parameters
-            if number is not None and parameters.enable_min and number < parameters.min_value:
-                return None, OutOfRangeAnswer()
-            if number is not None and parameters.enable_max and number > parameters.max_value:
-                return None, OutOfRangeAnswer()
+    def record_date(self, question, post_data, files_data):
+        raw = post_data.get('answer', None)
+        if question.required and raw is None:
+            return None, MissingRequiredAnswer()
 
-            if answer is None:
-                answer = NumberAnswer(
-                    question=question,
-                    submission=self,
-                )
-            answer.number = number
-            answer.save()
-            return answer, None
-        elif question.question_type == Question.DROPDOWN:
-            choices = post_data.getlist('answer')
-            if question.required and len(choices) == 0:
-                return None, MissingRequiredAnswer()
-            if len(choices) > 1:
+        date = None
+        if raw is not None:
+            try:
+                date = question.parser(raw)
+            except ValueError:
                 return None, OutOfRangeAnswer()
 
-            if answer is None:
-                answer = DropdownAnswer(
-                    question=question,
-                    submission=self
-                )
-                answer.save()
-            answer.choices.clear()
-            for choice_id in choices:
-                if choice_id is not None:
-                    try:
-                        choice = Choice.objects.get(pk=choice_id)
-                        answer.choices.add(choice)
-                    except:
-                        return None, OutOfRangeAnswer()
+        answer = DateAnswer(
+            question=question,
+            submission=self,
+        )
+        answer.date = date
+        get_answer_storage().save(answer)
+        return answer, None
+
+    def record_number(self, question, post_data, files_data):
+        number = post_data.get('answer', None)
+        if question.required and number is None:
+            return None, MissingRequiredAnswer()
 
-            return answer, None
-        elif question.question_type == Question.LEGAL:
-            y = post_data.get('answer', None)
-            if y not in ['accept', 'no_accept', None]:
+        if number is not None:
+            # Validates the bounds of the parameters as well
+            try:
+                number = question.parser(number)
+            except ValueError:
                 return None, OutOfRangeAnswer()
 
-            if y == 'accept':
-                y = True
-            elif y == 'no_accept':
-                y = False
-            if y is None and question.required:
-                return None, MissingRequiredAnswer()
-
-            if answer is None:
-                answer = LegalAnswer(
-                    question=question,
-                    submission=self,
-                )
-            answer.accept = y
-            answer.save()
+        answer = NumberAnswer(
+            question=question,
+            submission=self,
+        )
+        answer.number = number
+        get_answer_storage().save(answer)
+        return answer, None
+
+    def record_dropdown(self, question, post_data, files_data):
+        choices = post_data.getlist('answer')
+        if question.required and len(choices) == 0:
+            return None, MissingRequiredAnswer()
+        if len(choices) > 1:
+            return None, OutOfRangeAnswer()
+
+        picked, unmatched = question.resolve_choices(choices)
+        if len(unmatched) > 0:
+            return None, OutOfRangeAnswer()
+
+        answer = DropdownAnswer(
+            question=question,
+            submission=self
+        )
+        get_answer_storage().save(answer, choices=picked)
+        return answer, None
+
+    def record_legal(self, question, post_data, files_data):
+        y = post_data.get('answer', None)
+        if y not in ['accept', 'no_accept', None]:
+            return None, OutOfRangeAnswer()
+
+        if y == 'accept':
+            y = True
+        elif y == 'no_accept':
+            y = False
+        if y is None and question.required:
+            return None, MissingRequiredAnswer()
+
+        answer = LegalAnswer(
+            question=question,
+            submission=self,
+        )
+        answer.accept = y
+        get_answer_storage().save(answer)
+        return answer, None
+
+    def record_file_upload(self, question, post_data, files_data):
+        logger.debug(f'File Upload {post_data} {files_data}')
+        if question.required and len(files_data) == 0:
+            return None, MissingRequiredAnswer()
+        form = FileUploadAnswerForm(post_data, files_data)
+        if form.is_valid():
+            answer = form.save(commit=False)
+            answer.question = question
+            answer.submission = self
+            get_answer_storage().save(answer)
+            logger.debug(f'<FileUploadAnswer:{answer}>')
             return answer, None
-        elif question.question_type == Question.FILE_UPLOAD:
-            logger.debug(f'File Upload {post_data} {files_data}')
-            if question.required and len(files_data) == 0:
-                return None, MissingRequiredAnswer()
-            form = FileUploadAnswerForm(post_data, files_data)
-            if form.is_valid():
-                answer = form.save(commit=False)
-                answer.question = question
-                answer.submission = self
-                answer.save()
-                logger.debug(f'<FileUploadAnswer:{answer}>')
-                return answer, None
-            else:
-                logger.warn(f'Failed to validate form {form.errors}')
+        else:
+            logger.warn(f'Failed to validate form {form.errors}')
+            return None, OutOfRangeAnswer()
+
+    def record_website(self, question, post_data, files_data):
+        url = post_data.get('answer', None)
+        if question.required and is_empty(url):
+            return None, MissingRequiredAnswer()
+
+        if url is not None:
+            parsed = urlparse(url)
+            if is_empty(parsed.netloc):
                 return None, OutOfRangeAnswer()
-        elif question.question_type == Question.PAYMENT:
-            return None, None
-        elif question.question_type == Question.WEBSITE:
-            url = post_data.get('answer', None)
-            if question.required and is_empty(url):
-                return None, MissingRequiredAnswer()
-
-            if url is not None:
-                parsed = urlparse(url)
-                if is_empty(parsed.netloc):
-                    return None, OutOfRangeAnswer()
-
-            if answer is None:
-                answer = WebsiteAnswer(
-                    question=question,
-                    submission=self,
-                )
-            answer.url = url
-            answer.save()
-            return answer, None
-        return None, None
+
+        answer = WebsiteAnswer(
+            question=question,
+            submission=self,
+        )
+        answer.url = url
+        get_answer_storage().save(answer)
+        return answer, None
 
 
 class FilledField(BaseModel):
@@ -1676,6 +1661,10 @@ class Answer(BaseModel):
 
     class Meta:
         abstract = True
+        constraints = [
+            # One answer per question and submission, also serves the lookups
+            models.UniqueConstraint(fields=['question', 'submission'], name='%(class)s_unique_answer'),
+        ]
 
 
 class MultipleChoiceAnswer(Answer):
@@ -1698,9 +1687,14 @@ class MultipleChoiceAnswer(Answer):
 
 class PhoneNumberAnswer(Answer):
     phone_number = PhoneNumberField(blank=True, null=True, default=None)
+    # Normalized when the answer is written, see formsaurus.phone_numbers
+    e164 = models.CharField(max_length=16, blank=True, null=True, default=None, db_index=True)
+    country_code = models.PositiveSmallIntegerField(blank=True, null=True, default=None)
 
     @property
     def text(self):
+        if self.e164 is not None:
+            return self.e164
         return str(self.phone_number)
 
     @property
@@ -1904,6 +1898,112 @@ class WebsiteAnswer(Answer):
         return f'{self.short_id} {self.url}'
 
 
+#
+# QUESTION TYPES
+#
+
+def register_question_types(*handlers):
+    return {handler.type: handler for handler in handlers}
+
+
+# Handler of every question type, in Question.TYPES order
+QUESTION_TYPES = register_question_types(
+    QuestionTypeHandler(Question.WELCOME_SCREEN, 'welcome_screen', WelcomeParameters),
+    QuestionTypeHandler(Question.MULTIPLE_CHOICE, 'multiple_choice', MultipleChoiceParameters,
+                        answer_model=MultipleChoiceAnswer, recorder='record_choices', stats='choices',
+                        has_choices=True),
+    QuestionTypeHandler(Question.PHONE_NUMBER, 'phone_number', PhoneNumberParameters,
+                        answer_model=PhoneNumberAnswer, recorder='record_phone_number'),
+    QuestionTypeHandler(Question.SHORT_TEXT, 'short_text', ShortTextParameters,
+                        answer_model=ShortTextAnswer, recorder='record_short_text'),
+    QuestionTypeHandler(Question.LONG_TEXT, 'long_text', LongTextParameters,
+                        answer_model=LongTextAnswer, recorder='record_long_text'),
+    QuestionTypeHandler(Question.STATEMENT, 'statement', StatementParameters),
+    QuestionTypeHandler(Question.PICTURE_CHOICE, 'picture_choice', PictureChoiceParameters,
+                        answer_model=PictureChoiceAnswer, recorder='record_choices', stats='choices',
+                        has_choices=True),
+    QuestionTypeHandler(Question.YES_NO, 'yes_no', YesNoParameters,
+                        answer_model=YesNoAnswer, recorder='record_yes_no', stats='yes_no'),
+    QuestionTypeHandler(Question.EMAIL, 'email', EmailParameters,
+                        answer_model=EmailAnswer, recorder='record_email'),
+    QuestionTypeHandler(Question.OPINION_SCALE, 'opinion_scale', OpinionScaleParameters,
+                        answer_model=OpinionScaleAnswer, recorder='record_opinion_scale', stats='opinion_scale'),
+    QuestionTypeHandler(Question.RATING, 'rating', RatingParameters,
+                        answer_model=RatingAnswer, recorder='record_rating', stats='rating'),
+    QuestionTypeHandler(Question.DATE, 'date', DateParameters,
+                        answer_model=DateAnswer, recorder='record_date', compiler='compile_date'),
+    QuestionTypeHandler(Question.NUMBER, 'number', NumberParameters,
+                        answer_model=NumberAnswer, recorder='record_number', compiler='compile_number'),
+    QuestionTypeHandler(Question.DROPDOWN, 'dropdown', DropdownParameters,
+                        answer_model=DropdownAnswer, recorder='record_dropdown', stats='choices',
+                        has_choices=True),
+    QuestionTypeHandler(Question.LEGAL, 'legal', LegalParameters,
+                        answer_model=LegalAnswer, recorder='record_legal', stats='legal'),
+    QuestionTypeHandler(Question.FILE_UPLOAD, 'file_upload', FileUploadParameters,
+                        answer_model=FileUploadAnswer, recorder='record_file_upload'),
+    # Payments are not collected yet
+    QuestionTypeHandler(Question.PAYMENT, 'payment', PaymentParameters,
+                        answer_model=PaymentAnswer, template=False),
+    QuestionTypeHandler(Question.WEBSITE, 'website', WebsiteParameters,
+                        answer_model=WebsiteAnswer, recorder='record_website'),
+    QuestionTypeHandler(Question.THANK_YOU_SCREEN, 'thank_you_screen', ThankYouParameters),
+)
+
+# Answer model used to store each answerable question type, in the order
+# answers are listed for a submission.
+ANSWER_MODELS = {
+    code: handler.answer_model for code, handler in QUESTION_TYPES.items() if handler.answer_model is not None
+}
+
+
+#
+# ARCHIVES
+#
+
+class SubmissionArchive(BaseModel):
+    """
+    Completed submissions moved out of the hot tables by the
+    `formsaurus_archive` command. `data` holds a zlib-compressed JSON
+    document laid out by column and `summary` the per question value
+    counts used by stats, see formsaurus.archive.
+    """
+    survey = models.ForeignKey(Survey, on_delete=models.CASCADE)
+    count = models.PositiveIntegerField()
+    summary = models.TextField()
+    data = models.BinaryField()
+
+    @property
+    def document(self):
+        from formsaurus.archive import decode
+        if not hasattr(self, '_document'):
+            self._document = decode(self.data)
+        return self._document
+
+
+class ArchivedSubmission(models.Model):
+    """Index of archived submissions, keeping their original id."""
+    id = models.UUIDField(primary_key=True, editable=False)
+    survey = models.ForeignKey(Survey, on_delete=models.CASCADE)
+    archive = models.ForeignKey(SubmissionArchive, on_delete=models.CASCADE)
+    created_at = models.DateTimeField()
+    completed_at = models.DateTimeField(blank=True, null=True, default=None)
+
+    is_preview = False
+    completed = True
+
+    @property
+    def short_id(self):
+        return str(self.id)[:8]
+
+    def answers(self):
+        from formsaurus.archive import archived_answers
+        return archived_answers(self)
+
+    def filled_fields(self):
+        from formsaurus.archive import archived_filled_fields
+        return archived_filled_fields(self)
+
+
 #
 # LOGIC JUMPS
 #
@@ -2141,6 +2241,41 @@ class DateCondition(Condition):
     def __str__(self):
         return f'{self.short_id} {self.match} {self.date} {self.operand}'
 
+#
+# COUNTERS
+#
+
+class SurveyCounter(models.Model):
+    """
+    One of FORMSAURUS_COUNTER_SLOTS rows new submissions of a survey are
+    counted in, to spread writes. See formsaurus.counters.
+    """
+    id = models.BigAutoField(primary_key=True)
+    survey = models.ForeignKey(Survey, on_delete=models.CASCADE)
+    slot = models.PositiveSmallIntegerField()
+    submission_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['survey', 'slot'], name='surveycounter_slot_unique'),
+        ]
+
+#
+# SHARDING
+#
+
+class ShardPlacement(models.Model):
+    """
+    Shard directory, always kept on the default database.
+    `key` is either 'user:<id>' or 'survey:<id>'.
+    """
+    key = models.CharField(max_length=64, primary_key=True)
+    database = models.CharField(max_length=64)
+    modified_at = models.DateTimeField(auto_now=True, editable=False)
+
+    def __str__(self):
+        return f'{self.key} -> {self.database}'
+
 
 class FileUploadAnswerForm(forms.ModelForm):
     class Meta:
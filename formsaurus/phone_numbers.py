@@ -0,0 +1,57 @@
+from collections import namedtuple
+from functools import lru_cache
+
+import phonenumbers
+
+#
+# Phone numbers are normalized once, when the answer is written: the E.164
+# form and the country calling code are stored next to the raw input so
+# listings, exports and filters never parse them again. Parsing is cached
+# per (raw input, default country code), respondents retrying an answer or
+# sharing an office switchboard do not pay for it twice.
+#
+
+NormalizedPhoneNumber = namedtuple('NormalizedPhoneNumber', ['e164', 'country_code'])
+
+UNKNOWN = NormalizedPhoneNumber(None, None)
+
+
+def default_region(default_country_code):
+    """
+    Region used for numbers written without their international prefix.
+    PhoneNumberParameters.default_country_code holds either a region ('FR')
+    or a calling code ('33').
+    """
+    if default_country_code is None:
+        return None
+    code = str(default_country_code).strip().lstrip('+')
+    if code.isdigit():
+        region = phonenumbers.region_code_for_country_code(int(code))
+        return None if region == phonenumbers.UNKNOWN_REGION else region
+    return code.upper() or None
+
+
+@lru_cache(maxsize=4096)
+def normalize_phone_number(raw, default_country_code=None):
+    """E.164 form and calling code of `raw`, UNKNOWN when it is not a possible phone number"""
+    if raw is None or raw.strip() == '':
+        return UNKNOWN
+    try:
+        number = phonenumbers.parse(raw, default_region(default_country_code))
+    except phonenumbers.NumberParseException:
+        return UNKNOWN
+    if not phonenumbers.is_possible_number(number):
+        return UNKNOWN
+    return NormalizedPhoneNumber(
+        phonenumbers.format_number(number, phonenumbers.PhoneNumberFormat.E164),
+        number.country_code,
+    )
+
+
+def normalize_answer(answer, default_country_code):
+    """Stores the normalized form of the phone number of `answer`, returns True when it changed"""
+    raw = str(answer.phone_number) if answer.phone_number else None
+    normalized = normalize_phone_number(raw, default_country_code)
+    changed = (answer.e164, answer.country_code) != tuple(normalized)
+    answer.e164, answer.country_code = normalized
+    return changed
@@ -0,0 +1,77 @@
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+from formsaurus.utils import get_survey_model
+
+_local = threading.local()
+
+
+def replica_database():
+    """Returns the alias configured by FORMSAURUS_REPLICA_DATABASE, if any"""
+    return getattr(settings, 'FORMSAURUS_REPLICA_DATABASE', None)
+
+
+@contextmanager
+def read_from_replica():
+    """
+    Routes the reads made inside the block to the replica database.
+    Only meant for pages that can tolerate replication lag, the respondent
+    flow has to keep reading its own writes from the primary.
+    """
+    _local.depth = getattr(_local, 'depth', 0) + 1
+    try:
+        yield
+    finally:
+        _local.depth = _local.depth - 1
+
+
+def reading_from_replica():
+    return getattr(_local, 'depth', 0) > 0
+
+
+def is_formsaurus_model(model):
+    return model._meta.app_label == 'formsaurus' or model is get_survey_model()
+
+
+class ReplicaRouter:
+    """
+    Sends formsaurus reads made within `read_from_replica()` to the replica
+    alias, everything else (sessions, users, writes) goes to the primary.
+
+    DATABASE_ROUTERS = ['formsaurus.routers.ReplicaRouter']
+    FORMSAURUS_REPLICA_DATABASE = 'replica'
+    """
+
+    def db_for_read(self, model, **hints):
+        replica = replica_database()
+        if replica is not None and reading_from_replica() and is_formsaurus_model(model):
+            return replica
+        return None
+
+    def db_for_write(self, model, **hints):
+        # Instances read from the replica are saved on the primary
+        instance = hints.get('instance')
+        replica = replica_database()
+        if replica is not None and instance is not None and instance._state.db == replica:
+            return DEFAULT_DB_ALIAS
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        replica = replica_database()
+        if replica is None:
+            return None
+        databases = [DEFAULT_DB_ALIAS, replica]
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+class ReplicaReadMixin:
+    """View mixin routing every read made by the view to the replica database."""
+
+    def dispatch(self, request, *args, **kwargs):
+        with read_from_replica():
+            return super(ReplicaReadMixin, self).dispatch(request, *args, **kwargs)
@@ -1,4 +1,6 @@
 import random
+import zlib
+from functools import lru_cache
 
 from django.conf import settings
 from urllib.parse import urlparse
@@ -6,6 +8,34 @@ from formsaurus.models import (
     Question, Condition, TextCondition, NumberCondition, ChoiceCondition, BooleanCondition, DateCondition)
 
 
+#
+# Randomized choices.
+#
+# A randomized question is shown in one of FORMSAURUS_CHOICE_VARIANTS
+# orders of its choices, each derived from a seed of the question, and a
+# submission always gets the same one, derived from its id. Respondents
+# keep their order when coming back to a question, and a question renders
+# in a bounded number of ways that can be served from the fragment cache.
+#
+
+
+def choice_variants():
+    return max(1, getattr(settings, 'FORMSAURUS_CHOICE_VARIANTS', 8))
+
+
+def choice_variant(submission_id):
+    """Choice order variant shown to submission `submission_id`"""
+    return zlib.crc32(str(submission_id).encode('utf-8')) % choice_variants()
+
+
+@lru_cache(maxsize=4096)
+def choice_permutation(question_id, count, variant):
+    """Order, as indices, of the `count` choices of a question in `variant`"""
+    order = list(range(count))
+    random.Random(f'{question_id}:{variant}').shuffle(order)
+    return tuple(order)
+
+
 class ObjectDict(object):
     def __init__(self, d):
         self.__dict__ = d
@@ -186,67 +216,36 @@ class Serializer:
 
     @classmethod
     def parameters(cls, question):
-        if question.question_type == Question.WELCOME_SCREEN:
-            return Serializer.ws_parameters(question.parameters)
-        elif question.question_type == Question.THANK_YOU_SCREEN:
-            return Serializer.ts_parameters(question.parameters)
-        elif question.question_type == Question.MULTIPLE_CHOICE:
-            return Serializer.mc_parameters(question.parameters)
-        elif question.question_type == Question.PHONE_NUMBER:
-            return Serializer.pn_parameters(question.parameters)
-        elif question.question_type == Question.SHORT_TEXT:
-            return Serializer.st_parameters(question.parameters)
-        elif question.question_type == Question.LONG_TEXT:
-            return Serializer.lt_parameters(question.parameters)
-        elif question.question_type == Question.STATEMENT:
-            return Serializer.s__parameters(question.parameters)
-        elif question.question_type == Question.PICTURE_CHOICE:
-            return Serializer.pc_parameters(question.parameters)
-        elif question.question_type == Question.YES_NO:
-            return Serializer.yn_parameters(question.parameters)
-        elif question.question_type == Question.EMAIL:
-            return Serializer.e__parameters(question.parameters)
-        elif question.question_type == Question.OPINION_SCALE:
-            return Serializer.os_parameters(question.parameters)
-        elif question.question_type == Question.RATING:
-            return Serializer.r__parameters(question.parameters)
-        elif question.question_type == Question.DATE:
-            return Serializer.d__parameters(question.parameters)
-        elif question.question_type == Question.NUMBER:
-            return Serializer.n__parameters(question.parameters)
-        elif question.question_type == Question.DROPDOWN:
-            return Serializer.dd_parameters(question.parameters)
-        elif question.question_type == Question.LEGAL:
-            return Serializer.l__parameters(question.parameters)
-        elif question.question_type == Question.FILE_UPLOAD:
-            return Serializer.fu_parameters(question.parameters)
-        elif question.question_type == Question.PAYMENT:
-            return Serializer.p__parameters(question.parameters)
-        elif question.question_type == Question.WEBSITE:
-            return Serializer.w__parameters(question.parameters)
-        return {}
-
-    @classmethod
-    def question(cls, question):
+        handler = question.handler
+        if handler is None:
+            return {}
+        return getattr(cls, handler.serializer)(question.parameters)
+
+    @classmethod
+    def question(cls, question, submission=None):
         result = {
             'id': str(question.id),
             'question': question.question,
             'type': question.question_type,
             'required': question.required,
             'parameters': Serializer.parameters(question),
+            'template_name': question.handler.template_name if question.handler is not None else None,
         }
         # if question.next_question_id is not None:
         result['next_question'] = str(question.next_question_id)
         if question.description is not None and question.description != "":
             result['description'] = question.description
-        if question.question_type in [Question.MULTIPLE_CHOICE, Question.PICTURE_CHOICE, Question.DROPDOWN]:
+        if question.handler is not None and question.handler.has_choices:
             result['choices'] = []
             index = 0
             choices = []
             for choice in question.choice_set.order_by('position').all():
                 choices.append(choice)
-            if 'randomize' in result['parameters'] and result['parameters']['randomize']:
-                random.shuffle(choices)
+            randomize = 'randomize' in result['parameters'] and result['parameters']['randomize']
+            if randomize and submission is not None:
+                # Editors see choices in position order
+                order = choice_permutation(question.id, len(choices), choice_variant(submission.id))
+                choices = [choices[i] for i in order]
             if 'other_option' in result['parameters'] and result['parameters']['other_option']:
                 choices.append(ObjectDict({
                     'id': '',
@@ -0,0 +1,249 @@
+import logging
+import threading
+import zlib
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Model
+from django.db.models.deletion import Collector
+
+from formsaurus.models import ShardPlacement
+from formsaurus.utils import get_survey_model
+
+logger = logging.getLogger('formsaurus')
+
+Survey = get_survey_model()
+
+#
+# A survey and everything hanging off it (questions, parameters, choices,
+# submissions, answers, rulesets, archives) live on a single shard.
+#
+# FORMSAURUS_SHARDS = ['shard0', 'shard1']  # database aliases
+# FORMSAURUS_SHARD_KEY = 'user'             # or 'survey'
+#
+# Placement is a hash of the key, unless the ShardPlacement directory says
+# otherwise (see the formsaurus_rebalance command). Users, sessions and
+# the directory itself stay on the default database, the user table has to
+# be replicated to every shard for the foreign keys to hold.
+#
+
+_local = threading.local()
+
+
+def shards():
+    return getattr(settings, 'FORMSAURUS_SHARDS', [])
+
+
+def sharding_enabled():
+    return len(shards()) > 0
+
+
+def shard_key():
+    return getattr(settings, 'FORMSAURUS_SHARD_KEY', 'user')
+
+
+def hashed_shard(key):
+    aliases = shards()
+    return aliases[zlib.crc32(str(key).encode('utf-8')) % len(aliases)]
+
+
+def placement(key):
+    row = ShardPlacement.objects.using(DEFAULT_DB_ALIAS).filter(key=key).first()
+    return row.database if row is not None else None
+
+
+def place(key, database):
+    ShardPlacement.objects.using(DEFAULT_DB_ALIAS).update_or_create(
+        key=key, defaults={'database': database})
+
+
+def shard_for_user(user_id):
+    """Returns the shard new surveys of a user are created on"""
+    if not sharding_enabled():
+        return None
+    return placement(f'user:{user_id}') or hashed_shard(user_id)
+
+
+def shard_for_survey(survey):
+    """Returns the shard a survey, saved or not, belongs to"""
+    if not sharding_enabled():
+        return None
+    if not survey._state.adding and survey._state.db in shards():
+        return survey._state.db
+    database = placement(f'survey:{survey.id}')
+    if database is not None:
+        return database
+    if shard_key() == 'user':
+        return shard_for_user(survey.user_id)
+    return hashed_shard(survey.id)
+
+
+def shard_for_survey_id(survey_id):
+    """Returns the shard holding a survey, None if it doesn't exist"""
+    if not sharding_enabled():
+        return None
+    database = placement(f'survey:{survey_id}')
+    if database is not None:
+        return database
+    if shard_key() == 'survey':
+        return hashed_shard(survey_id)
+    # Owner isn't known, look the survey up and remember where it is
+    for alias in shards():
+        if Survey.objects.using(alias).filter(pk=survey_id).exists():
+            place(f'survey:{survey_id}', alias)
+            return alias
+    return None
+
+
+@contextmanager
+def using_shard(database):
+    """Routes formsaurus queries made inside the block to `database`"""
+    previous = getattr(_local, 'database', None)
+    _local.database = database
+    try:
+        yield
+    finally:
+        _local.database = previous
+
+
+def current_shard():
+    return getattr(_local, 'database', None)
+
+
+def all_shards(queryset):
+    """
+    Runs a queryset on every shard and returns the concatenated results.
+    Ordering is only guaranteed within a shard, see `surveys_for_user`.
+    """
+    if not sharding_enabled():
+        return list(queryset)
+    results = []
+    for alias in shards():
+        results.extend(queryset.using(alias))
+    return results
+
+
+def surveys_for_user(user):
+    """
+    Lists the surveys of a user across shards, newest first, leaving out
+    the ones being deleted and all but the latest version of each survey.
+    """
+    # formsaurus.versions places copies with this module
+    from formsaurus.versions import latest_versions
+    surveys = all_shards(latest_versions(Survey.objects.filter(user_id=user.id, deleted_at=None)).order_by('-created_at'))
+    return sorted(surveys, key=lambda survey: survey.created_at, reverse=True)
+
+
+def move_survey(survey, database):
+    """
+    Copies a survey and all its related rows to another shard, then
+    deletes them from the shard it was on.
+    """
+    source = survey._state.db
+    survey_id = survey.id
+    if source == database:
+        return 0
+
+    collector = Collector(using=source)
+    collector.collect([survey])
+    # Rows reachable through several relations (answers hang off both
+    # their question and their submission) are collected more than once
+    collected = {}
+    for model, objects in collector.data.items():
+        for instance in objects:
+            collected[(model, instance.pk)] = instance
+    for qs in collector.fast_deletes:
+        for instance in qs:
+            collected[(type(instance), instance.pk)] = instance
+    instances = list(collected.values())
+
+    with transaction.atomic(using=database), transaction.atomic(using=source):
+        # Rows reference each other (first question, next question, ...)
+        with connections[database].constraint_checks_disabled():
+            for instance in instances:
+                Model.save_base(instance, using=database, raw=True, force_insert=True)
+        connections[database].check_constraints(
+            table_names=[model._meta.db_table for model in set(type(instance) for instance in instances)])
+        collector.delete()
+    place(f'survey:{survey_id}', database)
+    logger.info(f'Moved survey {survey_id} ({len(instances)} rows) from {source} to {database}')
+    return len(instances)
+
+
+def is_sharded_model(model):
+    return (model._meta.app_label == 'formsaurus' and model is not ShardPlacement) or model is Survey
+
+
+class ShardRouter:
+    """
+    Routes formsaurus models to their survey's shard.
+
+    DATABASE_ROUTERS = ['formsaurus.sharding.ShardRouter']
+
+    The shard comes from the instance the query is made through, a new
+    survey's owner or id, or the surrounding `using_shard()` block.
+    """
+
+    def shard(self, model, hints):
+        instance = hints.get('instance')
+        if instance is not None and isinstance(instance, Survey):
+            return shard_for_survey(instance)
+        # Hints can be the owner of a survey, only follow formsaurus rows
+        if instance is not None and is_sharded_model(type(instance)):
+            if not instance._state.adding and instance._state.db in shards():
+                return instance._state.db
+        return current_shard()
+
+    def route(self, model, hints):
+        if not sharding_enabled():
+            return None
+        if model is ShardPlacement:
+            return DEFAULT_DB_ALIAS
+        if is_sharded_model(model):
+            return self.shard(model, hints)
+        # Owners are read from the default database, not the survey's shard
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db in shards():
+            return DEFAULT_DB_ALIAS
+        return None
+
+    def db_for_read(self, model, **hints):
+        return self.route(model, hints)
+
+    def db_for_write(self, model, **hints):
+        return self.route(model, hints)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if not sharding_enabled():
+            return None
+        databases = [DEFAULT_DB_ALIAS] + shards()
+        if obj1._state.db in databases and obj2._state.db in databases:
+            # Surveys reference their owner on the default database
+            if is_sharded_model(type(obj1)) and is_sharded_model(type(obj2)):
+                return obj1._state.db == obj2._state.db
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if model_name == 'shardplacement':
+            return db == DEFAULT_DB_ALIAS
+        return None
+
+
+class ShardMixin:
+    """
+    View mixin running the view on the shard of the `survey_id` it is
+    called with, or the shard of the logged in user.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if not sharding_enabled():
+            return super(ShardMixin, self).dispatch(request, *args, **kwargs)
+        database = None
+        if 'survey_id' in kwargs:
+            database = shard_for_survey_id(kwargs['survey_id'])
+        elif request.user.is_authenticated:
+            database = shard_for_user(request.user.id)
+        with using_shard(database):
+            return super(ShardMixin, self).dispatch(request, *args, **kwargs)
@@ -0,0 +1,353 @@
+import json
+import logging
+import os
+import sqlite3
+
+from django.conf import settings
+from django.core import serializers
+from django.core.exceptions import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, connections, router, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from formsaurus.models import (ANSWER_MODELS, Choice, FileUploadAnswer, Submission)
+from formsaurus.sharding import shard_for_survey_id, using_shard
+
+logger = logging.getLogger('formsaurus')
+
+
+def updated_fields(model):
+    """Fields overwritten when an answer replaces a previous one"""
+    return [field for field in model._meta.concrete_fields
+            if not field.primary_key and field.name not in ['created_at', 'question', 'submission']]
+
+
+def upsert(answer, raw=False):
+    """
+    Inserts an answer, or updates the answer already recorded for its
+    (question, submission) in the same statement. The instance ends up
+    with the primary key and created_at of the stored row.
+    `raw` keeps the timestamps set on the instance, as loaddata does.
+
+    This is a raw INSERT: the answer's save() is not called and no
+    pre_save/post_save signals are sent.
+    """
+    model = type(answer)
+    using = router.db_for_write(model, instance=answer)
+    connection = connections[using]
+    if connection.vendor not in ('postgresql', 'sqlite', 'mysql'):
+        return upsert_fallback(answer, using)
+
+    quote = connection.ops.quote_name
+    fields = model._meta.concrete_fields
+    values = []
+    for field in fields:
+        value = getattr(answer, field.attname) if raw else field.pre_save(answer, True)
+        values.append(field.get_db_prep_save(value, connection))
+    columns = ', '.join(quote(field.column) for field in fields)
+    placeholders = ', '.join(['%s'] * len(fields))
+    updated = updated_fields(model)
+    table = quote(model._meta.db_table)
+    unique = ', '.join(quote(model._meta.get_field(name).column) for name in ['question', 'submission'])
+    if connection.vendor == 'mysql':
+        sql = (f'INSERT INTO {table} ({columns}) VALUES ({placeholders}) ON DUPLICATE KEY UPDATE ' +
+               ', '.join(f'{quote(field.column)} = VALUES({quote(field.column)})' for field in updated))
+    else:
+        sql = (f'INSERT INTO {table} ({columns}) VALUES ({placeholders}) '
+               f'ON CONFLICT ({unique}) DO UPDATE SET ' +
+               ', '.join(f'{quote(field.column)} = excluded.{quote(field.column)}' for field in updated))
+    returning = connection.vendor == 'postgresql' or (
+        connection.vendor == 'sqlite' and connection.Database.sqlite_version_info >= (3, 35, 0))
+    created_at = model._meta.get_field('created_at')
+    if returning:
+        sql = sql + f' RETURNING {quote(model._meta.pk.column)}, {quote(created_at.column)}'
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, values)
+        if returning:
+            pk, stored_at = cursor.fetchone()
+            column = created_at.get_col(model._meta.db_table)
+            for converter in connection.ops.get_db_converters(column):
+                stored_at = converter(stored_at, column, connection)
+        else:
+            pk, stored_at = model.objects.using(using).filter(
+                question_id=answer.question_id,
+                submission_id=answer.submission_id,
+            ).values_list('pk', 'created_at').get()
+    answer.pk = model._meta.pk.to_python(pk)
+    # An update keeps the created_at of the answer it replaced
+    answer.created_at = stored_at
+    answer._state.adding = False
+    answer._state.db = using
+    return answer
+
+
+def upsert_fallback(answer, using):
+    model = type(answer)
+    existing = model.objects.using(using).filter(
+        question_id=answer.question_id,
+        submission_id=answer.submission_id,
+    ).values_list('pk', flat=True)
+    update_fields = [field.name for field in updated_fields(model)]
+    pk = existing.first()
+    if pk is None:
+        try:
+            with transaction.atomic(using=using):
+                answer.save(using=using, force_insert=True)
+            return answer
+        except IntegrityError:
+            # Lost the race against a concurrent insert
+            pk = existing.get()
+    answer.pk = pk
+    answer._state.adding = False
+    answer.save(using=using, update_fields=update_fields)
+    return answer
+
+
+def dedupe_answers(model, using='default'):
+    """
+    Keeps the most recently modified answer per (question, submission),
+    deleting the others. Returns the number of deleted answers.
+    """
+    duplicates = model.objects.using(using).values('question_id', 'submission_id').annotate(
+        count=Count('pk')).filter(count__gt=1)
+    deleted = 0
+    for row in list(duplicates):
+        pks = list(model.objects.using(using).filter(
+            question_id=row['question_id'],
+            submission_id=row['submission_id'],
+        ).order_by('-modified_at', '-created_at').values_list('pk', flat=True))
+        model.objects.using(using).filter(pk__in=pks[1:]).delete()
+        deleted = deleted + len(pks) - 1
+    return deleted
+
+
+class AnswerStorage:
+    """
+    Base class for answer storage backends.
+
+    `Submission.record_answer` validates what the respondent posted and
+    hands the resulting answer over to the backend configured with the
+    FORMSAURUS_ANSWER_STORAGE setting.
+    """
+
+    def previous_answer(self, submission, question):
+        """Returns the answer already recorded for this question, if any"""
+        raise NotImplementedError
+
+    def answers(self, submission):
+        """Returns all the answers recorded for a submission"""
+        raise NotImplementedError
+
+    def save(self, answer, choices=None):
+        """
+        Persists an answer. For choice based answers, `choices` is the
+        list of selected `Choice` and replaces any previous selection.
+        """
+        raise NotImplementedError
+
+    def compact(self, survey=None):
+        """
+        Moves pending answers into the ORM tables.
+        Returns the number of answers written.
+        """
+        return 0
+
+
+class ORMAnswerStorage(AnswerStorage):
+    """Default backend, answers are stored in the per-type answer tables."""
+
+    def previous_answer(self, submission, question):
+        model = ANSWER_MODELS.get(question.question_type)
+        if model is None:
+            return None
+        # Unique on (question, submission)
+        return model.objects.filter(
+            question=question,
+            submission=submission,
+        ).first()
+
+    def answers(self, submission):
+        answers = []
+        for model in ANSWER_MODELS.values():
+            for answer in model.objects.filter(submission=submission):
+                answers.append(answer)
+        return answers
+
+    def save(self, answer, choices=None):
+        upsert(answer)
+        if choices is not None:
+            answer.choices.set(choices)
+        return answer
+
+
+class LogAnswerStorage(AnswerStorage):
+    """
+    Append-only answer log, kept in one SQLite file per survey under
+    FORMSAURUS_ANSWER_LOG_DIR.
+
+    Writing an answer appends a record to the survey's log and never
+    touches the primary database. Reads replay the log on top of the
+    answers already compacted into the ORM tables, the latest record for
+    a question winning. `compact()` (or the `formsaurus_compact` command)
+    moves the log into the ORM tables and truncates it.
+
+    File uploads are always written to the ORM tables since the file
+    itself has to go through the configured file storage.
+    """
+    orm = ORMAnswerStorage()
+
+    def __init__(self):
+        self._initialized = set()
+
+    @property
+    def directory(self):
+        directory = getattr(settings, 'FORMSAURUS_ANSWER_LOG_DIR', None)
+        if directory is None:
+            raise ImproperlyConfigured(
+                "FORMSAURUS_ANSWER_LOG_DIR must be set to use LogAnswerStorage")
+        return directory
+
+    def path(self, survey_id):
+        return os.path.join(self.directory, f'{survey_id}.sqlite3')
+
+    def connect(self, survey_id):
+        path = self.path(survey_id)
+        if path not in self._initialized:
+            os.makedirs(self.directory, exist_ok=True)
+        connection = sqlite3.connect(path, timeout=30)
+        if path not in self._initialized:
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS answers ('
+                'seq INTEGER PRIMARY KEY AUTOINCREMENT, '
+                'submission TEXT NOT NULL, '
+                'question TEXT NOT NULL, '
+                'record TEXT NOT NULL)')
+            connection.execute(
+                'CREATE INDEX IF NOT EXISTS answers_submission ON answers (submission, seq)')
+            connection.commit()
+            self._initialized.add(path)
+        return connection
+
+    def append(self, survey_id, answer, choices=None):
+        fields = [field.name for field in answer._meta.concrete_fields if not field.primary_key]
+        record = serializers.serialize('python', [answer], fields=fields)[0]
+        if choices is not None:
+            record['choices'] = [str(choice.pk) for choice in choices]
+        connection = self.connect(survey_id)
+        try:
+            with connection:
+                connection.execute(
+                    'INSERT INTO answers (submission, question, record) VALUES (?, ?, ?)',
+                    (str(answer.submission_id), str(answer.question_id),
+                     json.dumps(record, cls=DjangoJSONEncoder)))
+        finally:
+            connection.close()
+
+    def records(self, survey_id, submission=None):
+        """Returns the latest (seq, record) for each answer in the log"""
+        if not os.path.exists(self.path(survey_id)):
+            return {}
+        connection = self.connect(survey_id)
+        try:
+            if submission is None:
+                rows = connection.execute(
+                    'SELECT seq, record FROM answers ORDER BY seq')
+            else:
+                rows = connection.execute(
+                    'SELECT seq, record FROM answers WHERE submission = ? ORDER BY seq',
+                    (str(submission.id),))
+            latest = {}
+            for seq, record in rows:
+                record = json.loads(record)
+                key = (record['fields']['submission'], record['fields']['question'])
+                latest[key] = (seq, record)
+            return latest
+        finally:
+            connection.close()
+
+    def materialize(self, record):
+        """Builds an (unsaved) answer instance from a log record"""
+        answer = next(serializers.deserialize('python', [record])).object
+        answer._state.adding = False
+        if 'choices' in record:
+            answer._prefetched_objects_cache = {
+                'choices': Choice.objects.filter(pk__in=record['choices']).order_by('position'),
+            }
+        return answer
+
+    def previous_answer(self, submission, question):
+        if question.question_type not in ANSWER_MODELS:
+            return None
+        key = (str(submission.id), str(question.id))
+        latest = self.records(submission.survey_id, submission=submission)
+        if key in latest:
+            return self.materialize(latest[key][1])
+        return self.orm.previous_answer(submission, question)
+
+    def answers(self, submission):
+        latest = self.records(submission.survey_id, submission=submission)
+        logged = {}
+        for (_, question_id), (_, record) in latest.items():
+            logged[question_id] = self.materialize(record)
+        answers = []
+        for answer in self.orm.answers(submission):
+            answers.append(logged.pop(str(answer.question_id), answer))
+        answers.extend(logged.values())
+        return answers
+
+    def save(self, answer, choices=None):
+        if isinstance(answer, FileUploadAnswer):
+            return self.orm.save(answer, choices=choices)
+        now = timezone.now()
+        if answer.created_at is None:
+            answer.created_at = now
+        answer.modified_at = now
+        self.append(answer.submission.survey_id, answer, choices=choices)
+        return answer
+
+    def compact(self, survey=None):
+        if survey is not None:
+            survey_ids = [str(survey.id)]
+        elif os.path.isdir(self.directory):
+            survey_ids = [name[:-len('.sqlite3')] for name in os.listdir(self.directory)
+                          if name.endswith('.sqlite3')]
+        else:
+            survey_ids = []
+
+        count = 0
+        for survey_id in survey_ids:
+            with using_shard(shard_for_survey_id(survey_id)):
+                count = count + self.compact_survey(survey_id)
+        return count
+
+    def compact_survey(self, survey_id):
+        latest = self.records(survey_id)
+        if len(latest) == 0:
+            return 0
+        last_seq = max(seq for seq, _ in latest.values())
+        submission_ids = set(str(pk) for pk in Submission.objects.filter(
+            pk__in=[submission_id for submission_id, _ in latest.keys()]).values_list('id', flat=True))
+
+        count = 0
+        with transaction.atomic():
+            for (submission_id, _), (_, record) in latest.items():
+                if submission_id not in submission_ids:
+                    # Submission was deleted since the answer was logged
+                    continue
+                answer = next(serializers.deserialize('python', [record])).object
+                upsert(answer, raw=True)
+                if 'choices' in record:
+                    answer.choices.set(record['choices'])
+                count = count + 1
+
+        connection = self.connect(survey_id)
+        try:
+            with connection:
+                connection.execute('DELETE FROM answers WHERE seq <= ?', (last_seq,))
+        finally:
+            connection.close()
+        logger.info(f'Compacted {count} answer(s) for survey {survey_id}')
+        return count
@@ -14,4 +14,21 @@ from formsaurus.tests.number import *
 from formsaurus.tests.dropdown import *
 from formsaurus.tests.legal import *
 from formsaurus.tests.file_upload import *
-from formsaurus.tests.website import *
\ No newline at end of file
+from formsaurus.tests.website import *
+from formsaurus.tests.storage import *
+from formsaurus.tests.archive import *
+from formsaurus.tests.routers import *
+from formsaurus.tests.sharding import *
+from formsaurus.tests.upsert import *
+from formsaurus.tests.deletion import *
+from formsaurus.tests.question_types import *
+from formsaurus.tests.identity import *
+from formsaurus.tests.stateless import *
+from formsaurus.tests.fragments import *
+from formsaurus.tests.conditional import *
+from formsaurus.tests.versions import *
+from formsaurus.tests.warmup import *
+from formsaurus.tests.gates import *
+from formsaurus.tests.quota import *
+from formsaurus.tests.counters import *
+from formsaurus.tests.dashboard import *
@@ -0,0 +1,83 @@
+import datetime
+from django.test import Client, TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+
+from formsaurus.archive import archive_survey
+from formsaurus.manage.stats import Stats
+from formsaurus.models import (
+    ArchivedSubmission, Choice, Survey, Submission, FilledField, MultipleChoiceAnswer, YesNoAnswer)
+
+User = get_user_model()
+
+
+class ArchiveTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            'john',
+            'lennon@thebeatles.com',
+            'johnpassword')
+        self.client = Client()
+
+    def test_archive_submissions(self):
+        survey = Survey.objects.create(
+            name='Test Survey',
+            user=self.user,
+            published=True,
+        )
+        survey.add_hidden_field('email')
+        yes_no = survey.add_yes_no('Do you like ice cream?', required=True)
+        flavor = survey.add_multiple_choice(
+            "What's your favorite flavor?",
+            required=True,
+            choices=['Vanilla', 'Chocolate', 'Strawberry'],
+        )
+        choices = Choice.objects.filter(question=flavor).order_by('position')
+
+        for answer, choice in [('Yes', choices[0]), ('No', choices[1]), ('Yes', choices[1])]:
+            response = self.client.get(reverse('formsaurus:survey', args=[survey.id]) + '?email=john@beatles.com')
+            self.assertEqual(response.status_code, 302)
+            submission = Submission.objects.filter(survey=survey).order_by('-created_at').first()
+            response = self.client.post(reverse('formsaurus:question', args=[
+                                        survey.id, yes_no.id, submission.id]), {'answer': answer})
+            self.assertEqual(response.status_code, 302)
+            response = self.client.post(reverse('formsaurus:question', args=[
+                                        survey.id, flavor.id, submission.id]), {'answer': choice.id})
+            self.assertEqual(response.status_code, 302)
+        self.assertEqual(3, Submission.objects.filter(survey=survey, completed=True).count())
+        before = Stats.answers(survey)
+
+        # Nothing is old enough yet
+        self.assertEqual(0, archive_survey(survey, timezone.now() - datetime.timedelta(days=1)))
+        # Archive everything in two batches
+        self.assertEqual(3, archive_survey(survey, timezone.now() + datetime.timedelta(seconds=1), batch_size=2))
+        self.assertEqual(0, Submission.objects.filter(survey=survey).count())
+        self.assertEqual(0, YesNoAnswer.objects.count())
+        self.assertEqual(0, MultipleChoiceAnswer.objects.count())
+        self.assertEqual(0, FilledField.objects.count())
+        self.assertEqual(3, ArchivedSubmission.objects.filter(survey=survey).count())
+        self.assertEqual(2, survey.submissionarchive_set.count())
+
+        # Stats are unchanged
+        self.assertEqual(before, Stats.answers(survey))
+        self.assertEqual(2, before[str(yes_no.id)]['stats']['Yes'])
+        self.assertEqual(2, before[str(flavor.id)]['stats']['Chocolate'])
+
+        # Archived answers can still be read back
+        archived = ArchivedSubmission.objects.get(pk=submission.id)
+        answers = archived.answers()
+        self.assertEqual(2, len(answers))
+        answers = {answer.question_id: answer for answer in answers}
+        self.assertTrue(isinstance(answers[flavor.id], MultipleChoiceAnswer))
+        self.assertEqual(['Chocolate'], answers[flavor.id].answer)
+        self.assertEqual(True, answers[yes_no.id].answer)
+        fields = archived.filled_fields()
+        self.assertEqual('email', fields[0].field.name)
+        self.assertEqual('john@beatles.com', fields[0].value)
+
+        self.client.login(username='john', password='johnpassword')
+        response = self.client.get(reverse('formsaurus_manage:submission', args=[survey.id, submission.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'john@beatles.com')
+        self.assertContains(response, 'Chocolate')
@@ -0,0 +1,75 @@
+from django.test import Client, TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from formsaurus.models import Survey, Submission
+
+User = get_user_model()
+
+
+class ConditionalGetTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            'john',
+            'lennon@thebeatles.com',
+            'johnpassword')
+        self.client = Client()
+        self.survey = Survey.objects.create(
+            name='Test Survey',
+            user=self.user,
+            published=True,
+        )
+        self.survey.add_welcome_screen('Welcome!')
+        self.survey.add_short_text('Name?', required=True)
+
+    def test_question_page(self):
+        response = self.client.get(reverse('formsaurus:survey', args=[self.survey.id]))
+        self.assertIn('no-cache', response['Cache-Control'])
+        submission = Submission.objects.get(survey=self.survey)
+        question = self.survey.first_question
+        url = reverse('formsaurus:question', args=[self.survey.id, question.id, submission.id])
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('private', response['Cache-Control'])
+        etag = response['ETag']
+        # The page embeds a CSRF token, only its ETag validates it
+        self.assertFalse(response.has_header('Last-Modified'))
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+        # A new CSRF secret means a new page, and the cookie to go with it
+        del self.client.cookies['csrftoken']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('csrftoken', response.cookies)
+        self.assertNotEqual(response['ETag'], etag)
+        etag = response['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        # Another submission has its own page
+        self.client.get(reverse('formsaurus:survey', args=[self.survey.id]))
+        other = Submission.objects.exclude(pk=submission.pk).get(survey=self.survey)
+        response = self.client.get(reverse('formsaurus:question', args=[
+                                   self.survey.id, question.id, other.id]), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+        # Editing the survey changes the version
+        self.survey.name = 'Welcome back!'
+        self.survey.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertContains(response, 'Welcome back!')
+
+    def test_public_pages(self):
+        url = reverse('formsaurus:closed', args=[self.survey.id])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('max-age=60', response['Cache-Control'])
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
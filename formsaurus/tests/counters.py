@@ -0,0 +1,93 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from formsaurus.counters import counts, fold
+from formsaurus.models import Survey, Submission, SurveyCounter
+
+User = get_user_model()
+
+
+class CounterTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            'john',
+            'lennon@thebeatles.com',
+            'johnpassword')
+        self.client = Client()
+        self.survey = Survey.objects.create(
+            name='Test Survey',
+            user=self.user,
+            published=True,
+        )
+        self.survey.add_short_text('Name?', required=True)
+
+    def answer(self, name):
+        self.client.get(reverse('formsaurus:survey', args=[self.survey.id]))
+        submission = Submission.objects.filter(survey=self.survey).order_by('-created_at').first()
+        self.client.post(reverse('formsaurus:question', args=[
+                         self.survey.id, self.survey.first_question_id, submission.id]), {'answer': name})
+
+    def test_counters(self):
+        self.answer('John')
+        self.answer('Paul')
+        self.client.get(reverse('formsaurus:survey', args=[self.survey.id]))
+        Submission.objects.create(survey=self.survey, is_preview=True)
+        self.survey.refresh_from_db()
+        self.assertEqual((self.survey.submission_count, self.survey.completed_count), (3, 2))
+
+        self.client.login(username='john', password='johnpassword')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('formsaurus_manage:survey_wizard', args=[self.survey.id]))
+        self.assertEqual(response.context['submissions']['count'], 3)
+        self.assertEqual(response.context['submissions']['completed'], 2)
+        self.assertFalse(any('formsaurus_submission' in query['sql'] for query in queries.captured_queries))
+        response = self.client.get(reverse('formsaurus_manage:surveys'))
+        self.assertEqual(response.context['surveys'][0]['submissions'], 3)
+
+        # Saving a survey loaded earlier keeps the counters
+        stale = Survey.objects.get(pk=self.survey.pk)
+        self.answer('George')
+        stale.name = 'Renamed'
+        stale.save()
+        self.survey.refresh_from_db()
+        self.assertEqual((self.survey.name, self.survey.submission_count, self.survey.completed_count), ('Renamed', 4, 3))
+
+        # Drifted counters are recounted
+        Survey.objects.filter(pk=self.survey.pk).update(submission_count=0, completed_count=0)
+        call_command('formsaurus_reconcile_counters', stdout=StringIO())
+        self.survey.refresh_from_db()
+        self.assertEqual((self.survey.submission_count, self.survey.completed_count), (4, 3))
+
+    @override_settings(FORMSAURUS_COUNTER_SLOTS=4)
+    def test_counter_slots(self):
+        for _ in range(10):
+            Submission.objects.create(survey=self.survey)
+        self.survey.refresh_from_db()
+        self.assertEqual(self.survey.submission_count, 0)
+        self.assertLessEqual(SurveyCounter.objects.filter(survey=self.survey).count(), 4)
+        self.assertEqual(counts([self.survey])[self.survey.id], (10, 0))
+
+        self.assertEqual(fold('default'), 1)
+        self.assertEqual(SurveyCounter.objects.count(), 0)
+        self.survey.refresh_from_db()
+        self.assertEqual(self.survey.submission_count, 10)
+        self.assertEqual(counts([self.survey])[self.survey.id], (10, 0))
+
+    def test_deleted_submissions(self):
+        self.survey.max_completions = 2
+        self.survey.save()
+        self.answer('John')
+        self.answer('Paul')
+        self.survey.refresh_from_db()
+        self.assertFalse(self.survey.is_open)
+
+        call_command('formsaurus_delete', survey_id=str(self.survey.id), submissions=True, stdout=StringIO())
+        self.survey.refresh_from_db()
+        self.assertEqual((self.survey.submission_count, self.survey.completed_count), (0, 0))
+        self.assertTrue(self.survey.is_open)
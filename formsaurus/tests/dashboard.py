@@ -0,0 +1,120 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from formsaurus.manage.dashboard import dashboard
+from formsaurus.models import Survey, Submission
+from formsaurus.sharding import place
+
+User = get_user_model()
+
+
+class DashboardTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            'john',
+            'lennon@thebeatles.com',
+            'johnpassword')
+        self.client = Client()
+        self.surveys = []
+        for index in range(5):
+            survey = Survey.objects.create(name=f'Survey {index}', user=self.user, published=True)
+            survey.add_short_text('Name?', required=True)
+            self.surveys.append(survey)
+
+    def answer(self, survey, name):
+        self.client.get(reverse('formsaurus:survey', args=[survey.id]))
+        submission = Submission.objects.filter(survey=survey).order_by('-created_at').first()
+        self.client.post(reverse('formsaurus:question', args=[
+                         survey.id, survey.first_question_id, submission.id]), {'answer': name})
+
+    @override_settings(FORMSAURUS_DASHBOARD_CACHE=None)
+    def test_dashboard(self):
+        self.answer(self.surveys[0], 'John')
+        self.answer(self.surveys[0], 'Paul')
+        self.client.get(reverse('formsaurus:survey', args=[self.surveys[0].id]))
+        self.answer(self.surveys[4], 'George')
+
+        result = dashboard(self.user, page=1, per_page=3)
+        self.assertEqual((result['page'], result['pages'], result['count']), (1, 2, 5))
+        # Newest first
+        self.assertEqual([row['name'] for row in result['surveys']], ['Survey 4', 'Survey 3', 'Survey 2'])
+        row = result['surveys'][0]
+        self.assertEqual((row['submissions'], row['completed'], row['ratio']), (1, 1, 100))
+        self.assertIsNotNone(row['last_response_at'])
+        self.assertIsNone(result['surveys'][1]['last_response_at'])
+
+        result = dashboard(self.user, page=2, per_page=3)
+        row = result['surveys'][-1]
+        self.assertEqual(row['name'], 'Survey 0')
+        self.assertEqual((row['submissions'], row['completed']), (3, 2))
+        self.assertAlmostEqual(row['ratio'], 200 / 3)
+
+        # As many queries for a page of 100 surveys as for a page of 5
+        with CaptureQueriesContext(connection) as queries:
+            dashboard(self.user, page=1, per_page=5)
+        expected = len(queries.captured_queries)
+        for index in range(20):
+            Survey.objects.create(name=f'More {index}', user=self.user)
+        with CaptureQueriesContext(connection) as queries:
+            dashboard(self.user, page=1, per_page=25)
+        self.assertEqual(len(queries.captured_queries), expected)
+
+    @override_settings(FORMSAURUS_DASHBOARD_CACHE=None)
+    def test_versions(self):
+        survey = self.surveys[0]
+        self.answer(survey, 'John')
+        draft = survey.new_version()
+        draft.publish()
+        self.client.get(reverse('formsaurus:survey', args=[draft.id]))
+
+        result = dashboard(self.user, per_page=10)
+        self.assertEqual(result['count'], 5)
+        rows = [row for row in result['surveys'] if row['name'] == survey.name]
+        self.assertEqual(len(rows), 1)
+        row = rows[0]
+        self.assertEqual((row['id'], row['version']), (str(draft.id), 2))
+        self.assertEqual((row['submissions'], row['completed'], row['ratio']), (2, 1, 50))
+        # Answered on the first version
+        completed_at = Submission.objects.get(survey=survey).completed_at
+        self.assertEqual(row['last_response_at'], completed_at.isoformat())
+
+    def test_cache(self):
+        self.client.login(username='john', password='johnpassword')
+        response = self.client.get(reverse('formsaurus_manage:dashboard'), {'per_page': 2})
+        self.assertEqual(response.json()['pages'], 3)
+        Survey.objects.create(name='New', user=self.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('formsaurus_manage:dashboard'), {'per_page': 2})
+        self.assertFalse(any('formsaurus_survey' in query['sql'] for query in queries.captured_queries))
+        self.assertEqual(response.json()['count'], 5)
+
+        response = self.client.get(reverse('formsaurus_manage:dashboard'), {'page': 'first'})
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(
+    DATABASE_ROUTERS=['formsaurus.sharding.ShardRouter'],
+    FORMSAURUS_SHARDS=['default', 'shard1'],
+    FORMSAURUS_DASHBOARD_CACHE=None,
+)
+class ShardedDashboardTestCase(TestCase):
+    databases = {'default', 'shard1'}
+
+    def test_dashboard(self):
+        user = User.objects.create_user('john', 'lennon@thebeatles.com', 'johnpassword')
+        # The user table is replicated to every shard
+        User.objects.using('shard1').create(pk=user.pk, username='john')
+        names = []
+        for index, database in enumerate(['default', 'shard1', 'default', 'shard1']):
+            place(f'user:{user.id}', database)
+            Survey.objects.create(name=f'Survey {index}', user=user)
+            names.insert(0, f'Survey {index}')
+        result = dashboard(user, page=1, per_page=3)
+        self.assertEqual((result['pages'], result['count']), (2, 4))
+        self.assertEqual([row['name'] for row in result['surveys']], names[:3])
+        self.assertEqual([row['name'] for row in dashboard(user, page=2, per_page=3)['surveys']], names[3:])
@@ -8,7 +8,8 @@ from django.urls import reverse
 
 from decimal import Decimal
 
-from formsaurus.models import (Survey, Submission, DateAnswer)
+from formsaurus.compiler import date_parser
+from formsaurus.models import (Survey, Submission, DateAnswer, DateParameters)
 
 User = get_user_model()
 
@@ -76,3 +77,33 @@ class DateTestCase(TestCase):
         self.assertTrue(isinstance(answer, DateAnswer))
         self.assertEqual(answer.date, parser.parse(updated_date).date())
 
+    def test_date_format(self):
+        parse = date_parser(DateParameters.DDMMYYYY, DateParameters.DOT)
+        self.assertIs(parse, date_parser(DateParameters.DDMMYYYY, DateParameters.DOT))
+        self.assertEqual(parse('25.12.2020'), datetime.date(2020, 12, 25))
+        for invalid in ['2020.12.25', '25/12/2020', '31.02.2020', '25.12.2020 10:00']:
+            with self.assertRaises(ValueError):
+                parse(invalid)
+
+        survey = Survey.objects.create(
+            name='Test Survey',
+            user=self.user,
+            published=True,
+        )
+        survey.add_date(
+            'Birthday?',
+            required=True,
+            date_format=DateParameters.MMDDYYYY,
+            date_separator=DateParameters.DASH,
+        )
+        response = self.client.get(reverse('formsaurus:survey', args=[survey.id]))
+        submission = Submission.objects.get(survey=survey)
+        question = survey.first_question
+        response = self.client.post(reverse('formsaurus:question', args=[
+                                    survey.id, question.id, submission.id]), {'answer': '2020-12-25'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(0, len(submission.answers()))
+        response = self.client.post(reverse('formsaurus:question', args=[
+                                    survey.id, question.id, submission.id]), {'answer': '12-25-2020'})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(submission.answers()[0].date, datetime.date(2020, 12, 25))
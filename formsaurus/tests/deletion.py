@@ -0,0 +1,101 @@
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from formsaurus.deletion import delete_survey
+from formsaurus.models import (
+    Choice, FilledField, HiddenField, MultipleChoiceAnswer, Question, ShortTextAnswer, Submission, Survey)
+
+User = get_user_model()
+
+
+class DeletionTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            'john',
+            'lennon@thebeatles.com',
+            'johnpassword')
+        self.client = Client()
+        # Unpublished surveys can only be previewed by their owner
+        self.client.login(username='john', password='johnpassword')
+
+    def make_survey(self, published=True):
+        survey = Survey.objects.create(
+            name='Test Survey',
+            user=self.user,
+            published=published,
+        )
+        survey.add_hidden_field('source')
+        survey.add_short_text('Name?', required=True)
+        survey.add_multiple_choice(
+            "What's your favorite flavor?",
+            required=True,
+            choices=['Vanilla', 'Chocolate', 'Strawberry'],
+        )
+        first = survey.first_question
+        second = first.next_question
+        choices = Choice.objects.filter(question=second).order_by('position')
+        for name in ['John', 'Paul', 'George']:
+            self.client.get(reverse('formsaurus:survey', args=[survey.id]) + '?source=test')
+            submission = Submission.objects.filter(survey=survey).order_by('-created_at').first()
+            self.client.post(reverse('formsaurus:question', args=[
+                             survey.id, first.id, submission.id]), {'answer': name})
+            self.client.post(reverse('formsaurus:question', args=[
+                             survey.id, second.id, submission.id]), {'answer': choices[0].id})
+        return survey
+
+    def test_delete_survey(self):
+        survey = self.make_survey()
+        kept = self.make_survey()
+        self.assertEqual(MultipleChoiceAnswer.objects.filter(question__survey=survey).count(), 3)
+
+        counts = delete_survey(survey, chunk_size=2)
+        self.assertEqual(counts['formsaurus.Submission'], 3)
+        self.assertEqual(counts['formsaurus.ShortTextAnswer'], 3)
+        self.assertEqual(counts['formsaurus.MultipleChoiceAnswer_choices'], 3)
+        self.assertFalse(Survey.objects.filter(pk=survey.pk).exists())
+        self.assertEqual(Question.objects.filter(survey_id=survey.pk).count(), 0)
+        self.assertEqual(HiddenField.objects.filter(survey_id=survey.pk).count(), 0)
+        self.assertEqual(Submission.objects.filter(survey_id=survey.pk).count(), 0)
+        self.assertEqual(MultipleChoiceAnswer.choices.through.objects.filter(
+            multiplechoiceanswer__question__survey=kept).count(), 3)
+        self.assertEqual(ShortTextAnswer.objects.count(), 3)
+        self.assertEqual(FilledField.objects.count(), 3)
+        self.assertEqual(Choice.objects.count(), 3)
+
+    def test_publish_and_command(self):
+        survey = self.make_survey(published=False)
+        self.assertEqual(Submission.objects.filter(survey=survey, is_preview=True).count(), 3)
+        survey.publish()
+        self.assertEqual(Submission.objects.filter(survey=survey).count(), 0)
+        self.assertEqual(ShortTextAnswer.objects.count(), 0)
+
+        call_command('formsaurus_delete', survey_id=str(survey.id), chunk_size=10)
+        self.assertFalse(Survey.objects.filter(pk=survey.pk).exists())
+
+    def test_delete_view(self):
+        survey = self.make_survey(published=False)
+        response = self.client.get(reverse('formsaurus_manage:survey_delete', args=[survey.id]))
+        self.assertEqual(response.status_code, 302)
+        # Hidden at once, deleted by the command
+        self.assertIsNotNone(Survey.objects.get(pk=survey.pk).deleted_at)
+        response = self.client.get(reverse('formsaurus_manage:surveys'))
+        self.assertEqual(response.context['surveys'], [])
+        call_command('formsaurus_delete', pending=True)
+        self.assertFalse(Survey.objects.filter(pk=survey.pk).exists())
+        self.assertEqual(Submission.objects.count(), 0)
+
+    @override_settings(FORMSAURUS_DELETION_TASK='formsaurus.tests.deletion.deletion_task')
+    def test_deletion_task(self):
+        survey = self.make_survey(published=False)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.get(reverse('formsaurus_manage:survey_delete', args=[survey.id]))
+        self.assertEqual(scheduled, [(survey.pk, 'default')])
+
+
+scheduled = []
+
+
+def deletion_task(survey_id, using):
+    scheduled.append((survey_id, using))
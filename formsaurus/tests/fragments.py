@@ -0,0 +1,105 @@
+import re
+
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from formsaurus.fragments import PLACEHOLDER_CSRF_TOKEN
+from formsaurus.models import Survey, Submission, ShortTextAnswer
+
+User = get_user_model()
+
+
+class FragmentTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            'john',
+            'lennon@thebeatles.com',
+            'johnpassword')
+        self.client = Client()
+        self.survey = Survey.objects.create(
+            name='Test Survey',
+            user=self.user,
+            published=True,
+        )
+        self.survey.add_short_text('Name?', required=True)
+        self.survey.add_email('Email?', required=True)
+
+    @override_settings(FORMSAURUS_FRAGMENT_MODE=True)
+    def test_fragment_mode(self):
+        self.client.get(reverse('formsaurus:survey', args=[self.survey.id]))
+        submission = Submission.objects.get(survey=self.survey)
+        first = self.survey.first_question
+        second = first.next_question
+
+        response = self.client.get(reverse('formsaurus:question', args=[self.survey.id, first.id, submission.id]))
+        self.assertContains(response, 'data-fragment="true"')
+
+        url = reverse('formsaurus:question', args=[self.survey.id, first.id, submission.id])
+        response = self.client.post(url, {}, HTTP_X_FORMSAURUS_FRAGMENT='true')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertTrue(data['error'])
+        self.assertEqual(data['question'], str(first.id))
+
+        response = self.client.post(url, {'answer': 'John'}, HTTP_X_FORMSAURUS_FRAGMENT='true')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertFalse(data['error'])
+        self.assertEqual(data['question'], str(second.id))
+        self.assertEqual(data['url'], reverse('formsaurus:question', args=[self.survey.id, second.id, submission.id]))
+        self.assertIn('Email?', data['html'])
+        self.assertNotIn('<html', data['html'])
+        self.assertEqual(ShortTextAnswer.objects.get(submission=submission).short_text, 'John')
+
+        response = self.client.post(data['url'], {'answer': 'john@example.com'}, HTTP_X_FORMSAURUS_FRAGMENT='true')
+        self.assertEqual(response.json(), {
+            'redirect': reverse('formsaurus:completed', args=[self.survey.id, submission.id])})
+        submission.refresh_from_db()
+        self.assertTrue(submission.completed)
+
+    def test_redirect_fallback(self):
+        self.client.get(reverse('formsaurus:survey', args=[self.survey.id]))
+        submission = Submission.objects.get(survey=self.survey)
+        first = self.survey.first_question
+        response = self.client.get(reverse('formsaurus:question', args=[self.survey.id, first.id, submission.id]))
+        self.assertNotContains(response, 'data-fragment="true"')
+        response = self.client.post(reverse('formsaurus:question', args=[
+                                    self.survey.id, first.id, submission.id]), {'answer': 'John'})
+        self.assertRedirects(response, reverse('formsaurus:question', args=[
+                             self.survey.id, first.next_question.id, submission.id]))
+
+    @override_settings(FORMSAURUS_FRAGMENT_CACHE='default')
+    def test_fragment_cache(self):
+        cache.clear()
+        first = self.survey.first_question
+        pages = []
+        for name in ['John', 'Paul']:
+            client = Client(enforce_csrf_checks=True)
+            client.get(reverse('formsaurus:survey', args=[self.survey.id]))
+            submission = Submission.objects.filter(survey=self.survey).order_by('-created_at').first()
+            url = reverse('formsaurus:question', args=[self.survey.id, first.id, submission.id])
+            with self.assertTemplateUsed('formsaurus/question.html'):
+                response = client.get(url)
+            pages.append(response)
+            self.assertContains(response, f'action="{url}"')
+
+            # The cached form posts with this respondent's CSRF token
+            token = re.search(r'name="csrfmiddlewaretoken" value="([^"]+)"', response.content.decode()).group(1)
+            self.assertNotEqual(token, PLACEHOLDER_CSRF_TOKEN)
+            response = client.post(url, {'answer': name, 'csrfmiddlewaretoken': token})
+            self.assertEqual(response.status_code, 302)
+            self.assertEqual(ShortTextAnswer.objects.get(submission=submission).short_text, name)
+
+        self.assertIn('formsaurus/templates/short_text.html', [t.name for t in pages[0].templates])
+        self.assertNotIn('formsaurus/templates/short_text.html', [t.name for t in pages[1].templates])
+
+        # Edited questions render again
+        first.question = 'Full name?'
+        first.save()
+        client = Client()
+        client.get(reverse('formsaurus:survey', args=[self.survey.id]))
+        submission = Submission.objects.filter(survey=self.survey).order_by('-created_at').first()
+        response = client.get(reverse('formsaurus:question', args=[self.survey.id, first.id, submission.id]))
+        self.assertContains(response, 'Full name?')
@@ -0,0 +1,66 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from formsaurus.gates import completions
+from formsaurus.models import Survey, Submission
+
+User = get_user_model()
+
+
+class GateTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            'john',
+            'lennon@thebeatles.com',
+            'johnpassword')
+        self.client = Client()
+        self.survey = Survey.objects.create(
+            name='Test Survey',
+            user=self.user,
+            published=True,
+        )
+        self.survey.add_short_text('Name?', required=True)
+
+    def test_quota_hook(self):
+        evaluated = []
+
+        def answerable(survey):
+            evaluated.append(survey.id)
+            return completions(survey) < 1
+
+        with mock.patch.object(Survey, 'answerable', property(answerable)):
+            self.client.get(reverse('formsaurus:survey', args=[self.survey.id]))
+            submission = Submission.objects.get(survey=self.survey)
+            url = reverse('formsaurus:question', args=[self.survey.id, self.survey.first_question_id, submission.id])
+            self.client.get(url)
+            self.client.get(url)
+            self.assertEqual(len(evaluated), 1)
+
+            # The counter is incremented, not counted again
+            response = self.client.post(url, {'answer': 'John'})
+            self.assertEqual(response.status_code, 302)
+            self.survey.refresh_from_db()
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(completions(self.survey), 1)
+            self.assertEqual(len(queries.captured_queries), 0)
+
+            # Completion re-evaluates the hook
+            response = self.client.get(reverse('formsaurus:survey', args=[self.survey.id]))
+            self.assertRedirects(response, reverse('formsaurus:closed', args=[self.survey.id]))
+            self.assertEqual(len(evaluated), 2)
+
+    def test_can_view_follows_survey_changes(self):
+        self.survey.published = False
+        self.survey.save()
+        url = reverse('formsaurus:survey', args=[self.survey.id])
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.survey.publish()
+        self.assertEqual(self.client.get(url).status_code, 302)
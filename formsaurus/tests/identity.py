@@ -0,0 +1,73 @@
+from django.db import connection
+from django.http import Http404
+from django.test import Client, RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from formsaurus.identity import identity_map, resolve_route
+from formsaurus.models import Survey, Submission
+
+User = get_user_model()
+
+
+class IdentityMapTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            'john',
+            'lennon@thebeatles.com',
+            'johnpassword')
+        self.client = Client()
+        self.survey = Survey.objects.create(
+            name='Test Survey',
+            user=self.user,
+            published=True,
+        )
+        self.survey.add_short_text('Name?', required=True)
+        self.survey.add_rating('How much?', required=True)
+
+    def test_resolve_route(self):
+        response = self.client.get(reverse('formsaurus:survey', args=[self.survey.id]))
+        submission = Submission.objects.get(survey=self.survey)
+        question = self.survey.first_question
+        request = RequestFactory().get('/')
+
+        with CaptureQueriesContext(connection) as queries:
+            survey, resolved, loaded = resolve_route(request, self.survey.id, question.id, submission.id)
+            self.assertEqual(resolved.survey, survey)
+            self.assertEqual(loaded.survey, survey)
+            self.assertEqual(resolved.next_question, question.next_question)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(survey, self.survey)
+        self.assertEqual(resolved, question)
+        self.assertEqual(loaded, submission)
+        self.assertFalse(loaded._state.adding)
+
+        # Same instances for the rest of the request
+        with CaptureQueriesContext(connection) as queries:
+            self.assertIs(resolve_route(request, self.survey.id, question.id, submission.id)[1], resolved)
+        self.assertEqual(len(queries), 0)
+        self.assertIs(identity_map(request).get(Submission, submission.id), loaded)
+
+        other = Survey.objects.create(name='Other Survey', user=self.user, published=True)
+        other.add_short_text('Name?', required=True)
+        self.client.get(reverse('formsaurus:survey', args=[other.id]))
+        foreign = Submission.objects.get(survey=other)
+        with self.assertRaises(Http404):
+            resolve_route(RequestFactory().get('/'), self.survey.id, question.id, foreign.id)
+        with self.assertRaises(Http404):
+            resolve_route(RequestFactory().get('/'), other.id, question.id, foreign.id)
+
+    def test_question_view(self):
+        response = self.client.get(reverse('formsaurus:survey', args=[self.survey.id]))
+        submission = Submission.objects.get(survey=self.survey)
+        question = self.survey.first_question
+        response = self.client.post(reverse('formsaurus:question', args=[
+                                    self.survey.id, question.id, submission.id]), {'answer': 'John'})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(submission.answers()[0].short_text, 'John')
+
+        rating = question.next_question
+        response = self.client.get(reverse('formsaurus:question', args=[self.survey.id, rating.id, submission.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['question_shape'].shape, rating.parameters.shape)
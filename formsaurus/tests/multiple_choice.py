@@ -1,6 +1,7 @@
 import datetime
-from django.test import Client, TestCase
-from django.db import transaction
+from django.test import Client, TestCase, override_settings
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
 from django.db.utils import IntegrityError
 from django.contrib.auth import get_user_model
 from django.urls import reverse
@@ -8,7 +9,8 @@ from django.urls import reverse
 from decimal import Decimal
 
 from formsaurus.models import (
-    Choice, Survey, Submission, MultipleChoiceAnswer)
+    Choice, ChoiceCondition, RuleSet, Survey, Submission, MultipleChoiceAnswer)
+from formsaurus.serializer import Serializer
 
 User = get_user_model()
 
@@ -216,3 +218,126 @@ class MultipleChoiceTestCase(TestCase):
         self.assertEqual(answer.other, another)
         picked = answer.choices.first()
         self.assertEqual(picked.id, choices[0].id)
+
+    def test_update_choices(self):
+        survey = Survey.objects.create(
+            name='Test Survey',
+            user=self.user,
+            published=True,
+        )
+        question = survey.add_multiple_choice(
+            "What's your favorite flavor?",
+            required=True,
+            choices=['Vanilla', 'Chocolate', 'Strawberry'],
+        )
+        choices = list(Choice.objects.filter(question=question).order_by('position'))
+        self.assertEqual([choice.choice for choice in choices], ['Vanilla', 'Chocolate', 'Strawberry'])
+
+        response = self.client.get(reverse('formsaurus:survey', args=[survey.id]))
+        submission = Submission.objects.get(survey=survey)
+        response = self.client.post(reverse('formsaurus:question', args=[
+                                    survey.id, question.id, submission.id]), {'answer': choices[1].id})
+        self.assertEqual(response.status_code, 302)
+
+        strawberry = RuleSet.objects.create(question=question, jump_to=question, index=0)
+        ChoiceCondition.objects.create(
+            ruleset=strawberry, index=0, tested=question, match=ChoiceCondition.IS, choice=choices[2])
+
+        # The editor posts the id of each choice: reorder, rename one, drop one and add two
+        self.client.login(username='john', password='johnpassword')
+        survey.published = False
+        survey.save()
+        response = self.client.post(reverse('formsaurus_manage:survey_edit_question', args=[survey.id, question.id]), {
+            'question': "What's your favorite flavor?",
+            'question_type': question.question_type,
+            'required': True,
+            'choice': ['Chocolate', 'Vanilla bean', 'Pistachio', 'Mint'],
+            'choice_id': [str(choices[1].id), str(choices[0].id), '', ''],
+        })
+        self.assertEqual(response.status_code, 302)
+        updated = list(Choice.objects.filter(question=question).order_by('position'))
+        self.assertEqual([choice.choice for choice in updated], ['Chocolate', 'Vanilla bean', 'Pistachio', 'Mint'])
+        self.assertEqual(updated[0].id, choices[1].id)
+        self.assertEqual(updated[1].id, choices[0].id)
+        # Strawberry is gone with its condition, not turned into Pistachio
+        self.assertNotIn(choices[2].id, [choice.id for choice in updated])
+        self.assertFalse(ChoiceCondition.objects.filter(ruleset=strawberry).exists())
+        answer = MultipleChoiceAnswer.objects.get(submission=submission)
+        self.assertEqual(list(answer.choices.all()), [updated[0]])
+
+        # Without ids, choices are matched by content only
+        question.update_choices([{'choice': 'Mint'}, {'choice': 'Chocolate'}, {'choice': 'Lemon'}])
+        self.assertEqual(list(Choice.objects.filter(question=question).order_by('position').values_list('id', flat=True))[:2],
+                         [updated[3].id, updated[0].id])
+        question.update_choices([{'choice': 'Chocolate'}])
+        self.assertEqual(Choice.objects.filter(question=question).count(), 1)
+        self.assertEqual(list(answer.choices.all()), [updated[0]])
+
+    def test_choices_resolved_in_bulk(self):
+        survey = Survey.objects.create(
+            name='Test Survey',
+            user=self.user,
+            published=True,
+        )
+        question = survey.add_multiple_choice(
+            "Pick some numbers",
+            required=True,
+            multiple_selection=True,
+            choices=[str(i) for i in range(20)],
+        )
+        other_question = survey.add_multiple_choice(
+            "Pick a flavor",
+            required=True,
+            choices=['Vanilla', 'Chocolate'],
+        )
+        choices = list(Choice.objects.filter(question=question).order_by('position'))
+        foreign = Choice.objects.filter(question=other_question).first()
+
+        response = self.client.get(reverse('formsaurus:survey', args=[survey.id]))
+        submission = Submission.objects.get(survey=survey)
+        url = reverse('formsaurus:question', args=[survey.id, question.id, submission.id])
+
+        # Choices of another question are out of range
+        response = self.client.post(url, {'answer': [choices[0].id, foreign.id]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(MultipleChoiceAnswer.objects.filter(submission=submission).count(), 0)
+
+        with CaptureQueriesContext(connection) as few:
+            response = self.client.post(url, {'answer': [choice.id for choice in choices[:2]]})
+        self.assertEqual(response.status_code, 302)
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.post(url, {'answer': [choice.id for choice in choices]})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(len(few.captured_queries), len(many.captured_queries))
+        answer = MultipleChoiceAnswer.objects.get(submission=submission)
+        self.assertEqual(answer.choices.count(), 20)
+
+    @override_settings(FORMSAURUS_CHOICE_VARIANTS=4)
+    def test_randomized_choices_per_submission(self):
+        survey = Survey.objects.create(
+            name='Test Survey',
+            user=self.user,
+            published=True,
+        )
+        question = survey.add_multiple_choice(
+            "Pick a number",
+            required=True,
+            randomize=True,
+            choices=[str(i) for i in range(10)],
+        )
+        positions = [str(i) for i in range(10)]
+
+        def order(submission):
+            return [choice['choice'] for choice in Serializer.question(question, submission)['choices']]
+
+        # Editors see position order
+        self.assertEqual([choice['choice'] for choice in Serializer.question(question)['choices']], positions)
+
+        submissions = [Submission.objects.create(survey=survey) for _ in range(12)]
+        orders = set()
+        for submission in submissions:
+            self.assertEqual(order(submission), order(submission))
+            self.assertEqual(sorted(order(submission)), positions)
+            orders.add(tuple(order(submission)))
+        self.assertLessEqual(len(orders), 4)
+        self.assertGreater(len(orders), 1)
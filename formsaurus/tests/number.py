@@ -7,6 +7,7 @@ from django.urls import reverse
 
 from decimal import Decimal
 
+from formsaurus.compiler import number_parser
 from formsaurus.models import (
     Survey, Submission, NumberAnswer)
 
@@ -110,3 +111,11 @@ class NumberTestCase(TestCase):
         answer = answers[0]
         self.assertTrue(isinstance(answer, NumberAnswer))
         self.assertEqual(answer.number, 4)
+
+    def test_number_parser(self):
+        parse = number_parser(Decimal(4), None)
+        self.assertEqual(parse(' 12.5 '), Decimal('12.5'))
+        self.assertEqual(parse('四'), 4)
+        for invalid in ['3', 'NaN', 'Infinity', '1e12', 'ABC', '四五']:
+            with self.assertRaises(ValueError):
+                parse(invalid)
@@ -1,4 +1,5 @@
 import datetime
+from django.core.management import call_command
 from django.test import Client, TestCase
 from django.db import transaction
 from django.db.utils import IntegrityError
@@ -8,6 +9,7 @@ from django.urls import reverse
 from decimal import Decimal
 
 from formsaurus.models import (Survey, Submission, PhoneNumberAnswer)
+from formsaurus.phone_numbers import normalize_phone_number
 
 User = get_user_model()
 
@@ -104,3 +106,36 @@ class PhoneNumberTestCase(TestCase):
         answer = answers[0]
         self.assertTrue(isinstance(answer, PhoneNumberAnswer))
         self.assertEqual(answer.phone_number, first_number)
+
+    def test_normalized_phone_number(self):
+        self.assertEqual(normalize_phone_number('06 12 34 56 78', '33'), ('+33612345678', 33))
+        self.assertEqual(normalize_phone_number('06 12 34 56 78', 'FR'), ('+33612345678', 33))
+        self.assertEqual(normalize_phone_number('(202) 555-0143', 1), ('+12025550143', 1))
+        self.assertEqual(normalize_phone_number('not a number', 1), (None, None))
+
+        survey = Survey.objects.create(
+            name='Test Survey',
+            user=self.user,
+            published=True,
+        )
+        survey.add_phone_number(
+            'Phone Number?',
+            required=True,
+            default_country_code=33,
+        )
+        response = self.client.get(reverse('formsaurus:survey', args=[survey.id]))
+        submission = Submission.objects.get(survey=survey)
+        question = survey.first_question
+        response = self.client.post(reverse('formsaurus:question', args=[
+                                    survey.id, question.id, submission.id]), {'answer': '06 12 34 56 78'})
+        self.assertEqual(response.status_code, 302)
+        answer = PhoneNumberAnswer.objects.get(submission=submission)
+        self.assertEqual(answer.e164, '+33612345678')
+        self.assertEqual(answer.country_code, 33)
+        self.assertEqual(answer.text, '+33612345678')
+
+        PhoneNumberAnswer.objects.update(e164=None, country_code=None)
+        call_command('formsaurus_normalize_phone_numbers', missing=True, chunk_size=1)
+        answer.refresh_from_db()
+        self.assertEqual(answer.e164, '+33612345678')
+        self.assertEqual(answer.country_code, 33)
@@ -0,0 +1,77 @@
+from django.test import Client, TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from formsaurus.models import (
+    ANSWER_MODELS, QUESTION_TYPES, Choice, DateParameters, PictureChoiceParameters, Question, Survey, Submission)
+
+User = get_user_model()
+
+
+class QuestionTypesTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            'john',
+            'lennon@thebeatles.com',
+            'johnpassword')
+        self.client = Client()
+        self.client.login(username='john', password='johnpassword')
+
+    def test_registry(self):
+        self.assertEqual(list(QUESTION_TYPES.keys()), [key for key, _ in Question.TYPES])
+        self.assertNotIn(Question.WELCOME_SCREEN, ANSWER_MODELS)
+        self.assertNotIn(Question.THANK_YOU_SCREEN, ANSWER_MODELS)
+        for code, handler in QUESTION_TYPES.items():
+            self.assertIs(Question.handler_for(code), handler)
+            self.assertEqual(handler.parameters_form._meta.model, handler.parameters_model)
+            if handler.recorder is not None:
+                self.assertTrue(hasattr(Submission, handler.recorder))
+
+    def test_add_question_views(self):
+        survey = Survey.objects.create(name='Test Survey', user=self.user)
+        response = self.client.post(reverse('formsaurus_manage:survey_add_question',
+                                            args=[survey.id, Question.DATE]), {
+            'question': 'When?',
+            'question_type': Question.DATE,
+            'required': True,
+            'date_format': DateParameters.DDMMYYYY,
+            'date_separator': DateParameters.SLASH,
+        })
+        self.assertEqual(response.status_code, 302)
+        question = Question.objects.get(survey=survey, question_type=Question.DATE)
+        self.assertTrue(question.required)
+        self.assertEqual(question.parameters.date_format, DateParameters.DDMMYYYY)
+
+        response = self.client.post(reverse('formsaurus_manage:survey_add_question',
+                                            args=[survey.id, Question.PICTURE_CHOICE]), {
+            'question': 'Which one?',
+            'question_type': Question.PICTURE_CHOICE,
+            'required': True,
+            'choice': ['https://example.com/a.png', 'https://example.com/b.png'],
+            'label': ['A', 'B'],
+        })
+        self.assertEqual(response.status_code, 302)
+        question = Question.objects.get(survey=survey, question_type=Question.PICTURE_CHOICE)
+        self.assertIsInstance(question.parameters, PictureChoiceParameters)
+        self.assertEqual(list(Choice.objects.filter(question=question).order_by(
+            'position').values_list('choice', flat=True)), ['A', 'B'])
+
+        response = self.client.post(reverse('formsaurus_manage:survey_edit_question',
+                                            args=[survey.id, question.id]), {
+            'question': 'Which one?',
+            'question_type': Question.PICTURE_CHOICE,
+            'required': True,
+            'choice': ['https://example.com/b.png'],
+            'label': ['B'],
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(list(Choice.objects.filter(question=question).values_list('choice', flat=True)), ['B'])
+
+        # Rendered with the template of its type
+        survey.first_question = question
+        survey.save()
+        response = self.client.get(reverse('formsaurus:survey', args=[survey.id]))
+        submission = Submission.objects.get(survey=survey)
+        response = self.client.get(reverse('formsaurus:question', args=[survey.id, question.id, submission.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'formsaurus/templates/picture_choice.html')
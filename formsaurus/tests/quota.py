@@ -0,0 +1,106 @@
+import datetime
+
+from django.test import Client, TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+
+from formsaurus.counters import reconcile
+from formsaurus.models import Survey, Submission
+
+User = get_user_model()
+
+
+class QuotaTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            'john',
+            'lennon@thebeatles.com',
+            'johnpassword')
+        self.client = Client()
+        self.survey = Survey.objects.create(
+            name='Test Survey',
+            user=self.user,
+            published=True,
+            max_completions=1,
+        )
+        self.survey.add_short_text('Name?', required=True)
+
+    def test_quota(self):
+        first = Submission.objects.create(survey=self.survey)
+        second = Submission.objects.create(survey=self.survey)
+        preview = Submission.objects.create(survey=self.survey, is_preview=True)
+        url = reverse('formsaurus:question', args=[self.survey.id, self.survey.first_question_id, first.id])
+        response = self.client.post(url, {'answer': 'John'})
+        self.assertRedirects(response, reverse('formsaurus:completed', args=[self.survey.id, first.id]))
+        # Completing again doesn't count twice
+        self.assertTrue(first.complete())
+        self.survey.refresh_from_db()
+        self.assertEqual(self.survey.completed_count, 1)
+
+        # The quota filled up while the second respondent was answering
+        url = reverse('formsaurus:question', args=[self.survey.id, self.survey.first_question_id, second.id])
+        response = self.client.post(url, {'answer': 'Paul'})
+        self.assertRedirects(response, reverse('formsaurus:closed', args=[self.survey.id]))
+        second.refresh_from_db()
+        self.assertFalse(second.completed)
+        self.assertTrue(preview.complete())
+
+        self.survey.refresh_from_db()
+        self.assertEqual(self.survey.completed_count, 1)
+        self.assertFalse(self.survey.is_open)
+        response = self.client.get(reverse('formsaurus:survey', args=[self.survey.id]))
+        self.assertRedirects(response, reverse('formsaurus:closed', args=[self.survey.id]))
+
+    def test_schedule(self):
+        now = timezone.now()
+        self.survey.max_completions = None
+        self.survey.opens_at = now + datetime.timedelta(days=1)
+        self.survey.save()
+        response = self.client.get(reverse('formsaurus:survey', args=[self.survey.id]))
+        self.assertRedirects(response, reverse('formsaurus:closed', args=[self.survey.id]))
+
+        self.survey.opens_at = now - datetime.timedelta(days=1)
+        self.survey.closes_at = now + datetime.timedelta(days=1)
+        self.survey.save()
+        response = self.client.get(reverse('formsaurus:survey', args=[self.survey.id]))
+        self.assertEqual(response.status_code, 302)
+        self.assertNotEqual(response.url, reverse('formsaurus:closed', args=[self.survey.id]))
+
+        self.survey.closes_at = now - datetime.timedelta(minutes=1)
+        self.survey.save()
+        self.assertFalse(self.survey.is_open)
+        response = self.client.get(reverse('formsaurus:survey', args=[self.survey.id]))
+        self.assertRedirects(response, reverse('formsaurus:closed', args=[self.survey.id]))
+
+    def test_quota_across_versions(self):
+        self.survey.max_completions = 2
+        self.survey.save()
+        first = Submission.objects.create(survey=self.survey)
+        late = Submission.objects.create(survey=self.survey)
+        self.assertTrue(first.complete())
+
+        draft = self.survey.new_version()
+        draft.publish()
+        draft.refresh_from_db()
+        self.assertEqual((draft.submission_count, draft.completed_count, draft.max_completions), (2, 1, 2))
+        self.assertTrue(draft.is_open)
+
+        # Finishing on the superseded version fills the quota of the survey
+        late.refresh_from_db()
+        self.assertTrue(late.complete())
+        draft.refresh_from_db()
+        self.assertEqual(draft.completed_count, 2)
+        self.assertFalse(draft.is_open)
+        response = self.client.get(reverse('formsaurus:survey', args=[self.survey.id]), follow=True)
+        self.assertRedirects(response, reverse('formsaurus:closed', args=[draft.id]))
+
+        # A new version of a full survey stays closed, and recounting keeps it so
+        latest = draft.new_version()
+        latest.publish()
+        latest.refresh_from_db()
+        self.assertFalse(latest.is_open)
+        reconcile('default', [self.survey.id])
+        latest.refresh_from_db()
+        self.assertEqual((latest.submission_count, latest.completed_count), (2, 2))
+        self.assertFalse(latest.is_open)
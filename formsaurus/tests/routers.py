@@ -0,0 +1,68 @@
+from django.test import Client, TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from formsaurus.models import Survey, Submission
+from formsaurus.routers import read_from_replica
+
+User = get_user_model()
+
+
+@override_settings(
+    DATABASE_ROUTERS=['formsaurus.routers.ReplicaRouter'],
+    FORMSAURUS_REPLICA_DATABASE='replica',
+)
+class ReplicaRouterTestCase(TestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            'john',
+            'lennon@thebeatles.com',
+            'johnpassword')
+        self.survey = Survey.objects.create(
+            name='Test Survey',
+            user=self.user,
+        )
+        self.survey.add_yes_no('Do you like it?', required=True)
+        self.survey.published = True
+        self.survey.save()
+        # Replica lagging behind, no submission yet
+        User.objects.using('replica').create(pk=self.user.pk, username='john')
+        Survey.objects.using('replica').create(
+            pk=self.survey.pk,
+            name='Test Survey',
+            user_id=self.user.pk,
+            published=True,
+        )
+
+    def test_reads(self):
+        self.assertEqual(Survey.objects.get(pk=self.survey.pk)._state.db, 'default')
+        with read_from_replica():
+            survey = Survey.objects.get(pk=self.survey.pk)
+            self.assertEqual(survey._state.db, 'replica')
+            # Users and sessions always come from the primary
+            self.assertEqual(User.objects.get(pk=self.user.pk)._state.db, 'default')
+        # Writes go to the primary
+        survey.name = 'Renamed'
+        survey.save()
+        self.assertEqual(Survey.objects.get(pk=self.survey.pk).name, 'Renamed')
+        self.assertEqual(Survey.objects.using('replica').get(pk=self.survey.pk).name, 'Test Survey')
+
+    def test_views(self):
+        client = Client()
+        # Respondent flow stays on the primary
+        response = client.get(reverse('formsaurus:survey', args=[self.survey.id]))
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Submission.objects.filter(survey=self.survey).count(), 1)
+        self.assertEqual(Submission.objects.using('replica').count(), 0)
+
+        client.login(username='john', password='johnpassword')
+        response = client.get(reverse('formsaurus_manage:survey_wizard', args=[self.survey.id]))
+        self.assertEqual(response.status_code, 200)
+        # Stats come from the counters of the survey, read on the primary
+        self.assertEqual(response.context['submissions']['count'], 1)
+
+        response = client.get(reverse('formsaurus_manage:submissions', args=[self.survey.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['survey']['submissions']), 0)
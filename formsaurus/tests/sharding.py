@@ -0,0 +1,73 @@
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from formsaurus.models import Survey, Submission, YesNoAnswer, ShardPlacement
+from formsaurus.sharding import place, shard_for_survey_id, using_shard
+
+User = get_user_model()
+
+
+@override_settings(
+    DATABASE_ROUTERS=['formsaurus.sharding.ShardRouter'],
+    FORMSAURUS_SHARDS=['default', 'shard1'],
+    FORMSAURUS_SHARD_KEY='user',
+)
+class ShardRouterTestCase(TestCase):
+    databases = {'default', 'shard1'}
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            'john',
+            'lennon@thebeatles.com',
+            'johnpassword')
+        # The user table is replicated to every shard
+        User.objects.using('shard1').create(pk=self.user.pk, username='john')
+        place(f'user:{self.user.id}', 'shard1')
+
+        self.survey = Survey(
+            name='Test Survey',
+            user=self.user,
+        )
+        self.survey.save()
+        with using_shard('shard1'):
+            self.survey.add_yes_no('Do you like it?', required=True)
+        self.survey.published = True
+        self.survey.save()
+
+    def test_placement(self):
+        self.assertEqual(self.survey._state.db, 'shard1')
+        self.assertFalse(Survey.objects.using('default').filter(pk=self.survey.pk).exists())
+        self.assertEqual(shard_for_survey_id(self.survey.id), 'shard1')
+        self.assertEqual(ShardPlacement.objects.get(key=f'survey:{self.survey.id}').database, 'shard1')
+
+    def test_views_and_rebalance(self):
+        client = Client()
+        response = client.get(reverse('formsaurus:survey', args=[self.survey.id]))
+        self.assertEqual(response.status_code, 302)
+        submission = Submission.objects.using('shard1').get(survey_id=self.survey.id)
+        question = Survey.objects.using('shard1').get(pk=self.survey.pk).first_question
+        response = client.post(reverse('formsaurus:question', args=[
+            self.survey.id, question.id, submission.id]), {'answer': 'Yes'})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(YesNoAnswer.objects.using('shard1').count(), 1)
+        self.assertEqual(YesNoAnswer.objects.using('default').count(), 0)
+
+        client.login(username='john', password='johnpassword')
+        response = client.get(reverse('formsaurus_manage:surveys'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['surveys']), 1)
+        response = client.get(reverse('formsaurus_manage:survey_wizard', args=[self.survey.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['submissions']['count'], 1)
+
+        call_command('formsaurus_rebalance', user_id=str(self.user.id), to='default')
+        self.assertEqual(Survey.objects.using('shard1').count(), 0)
+        self.assertEqual(Submission.objects.using('default').filter(survey_id=self.survey.id).count(), 1)
+        self.assertEqual(YesNoAnswer.objects.using('default').count(), 1)
+        self.assertEqual(shard_for_survey_id(self.survey.id), 'default')
+
+        response = client.get(reverse('formsaurus_manage:survey_wizard', args=[self.survey.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['submissions']['count'], 1)
@@ -0,0 +1,60 @@
+from django.conf import settings
+from django.test import Client, TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from formsaurus.models import Survey, Submission, ShortTextAnswer
+from formsaurus.tokens import cookie_name
+
+User = get_user_model()
+
+
+@override_settings(FORMSAURUS_STATELESS_RESPONDENTS=True)
+class StatelessTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            'john',
+            'lennon@thebeatles.com',
+            'johnpassword')
+        self.client = Client()
+        self.survey = Survey.objects.create(
+            name='Test Survey',
+            user=self.user,
+            published=True,
+        )
+        self.survey.add_short_text('Name?', required=True)
+        self.survey.add_short_text('City?', required=True)
+
+    def test_signed_submission(self):
+        response = self.client.get(reverse('formsaurus:survey', args=[self.survey.id]))
+        self.assertEqual(response.status_code, 302)
+        submission = Submission.objects.get(survey=self.survey)
+        name = cookie_name(self.survey.id)
+        self.assertIn(name, response.cookies)
+        first = self.survey.first_question
+        second = first.next_question
+
+        # Another browser cannot answer this submission
+        stranger = Client()
+        response = stranger.get(reverse('formsaurus:question', args=[self.survey.id, first.id, submission.id]))
+        self.assertEqual(response.status_code, 404)
+        stranger.cookies[name] = str(submission.id)
+        response = stranger.post(reverse('formsaurus:question', args=[
+                                 self.survey.id, first.id, submission.id]), {'answer': 'Paul'})
+        self.assertEqual(response.status_code, 404)
+
+        response = self.client.get(reverse('formsaurus:question', args=[self.survey.id, first.id, submission.id]))
+        self.assertEqual(response.status_code, 200)
+        response = self.client.post(reverse('formsaurus:question', args=[
+                                    self.survey.id, first.id, submission.id]), {'answer': 'John'})
+        self.assertEqual(response.status_code, 302)
+        response = self.client.post(reverse('formsaurus:question', args=[
+                                    self.survey.id, second.id, submission.id]), {'answer': 'Liverpool'})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response.cookies[name].value, '')
+        self.assertEqual(ShortTextAnswer.objects.filter(submission=submission).count(), 2)
+        submission.refresh_from_db()
+        self.assertTrue(submission.completed)
+
+        # No session was ever created
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, self.client.cookies)
@@ -0,0 +1,85 @@
+import shutil
+import tempfile
+from django.test import Client, TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from formsaurus.models import (
+    Choice, Survey, Submission, MultipleChoiceAnswer, ShortTextAnswer)
+from formsaurus.utils import get_answer_storage
+
+User = get_user_model()
+
+
+class LogAnswerStorageTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            'john',
+            'lennon@thebeatles.com',
+            'johnpassword')
+        self.client = Client()
+        self.directory = tempfile.mkdtemp()
+        self.settings = override_settings(
+            FORMSAURUS_ANSWER_STORAGE='formsaurus.storage.LogAnswerStorage',
+            FORMSAURUS_ANSWER_LOG_DIR=self.directory,
+        )
+        self.settings.enable()
+
+    def tearDown(self):
+        self.settings.disable()
+        shutil.rmtree(self.directory)
+
+    def test_log_and_compact(self):
+        survey = Survey.objects.create(
+            name='Test Survey',
+            user=self.user,
+            published=True,
+        )
+        survey.add_short_text('Name?', required=True)
+        survey.add_multiple_choice(
+            "What's your favorite flavor?",
+            required=True,
+            choices=['Vanilla', 'Chocolate', 'Strawberry'],
+        )
+        response = self.client.get(reverse('formsaurus:survey', args=[survey.id]))
+        self.assertEqual(response.status_code, 302)
+        submission = Submission.objects.get(survey=survey)
+        first = survey.first_question
+        second = first.next_question
+        choices = Choice.objects.filter(question=second).order_by('position')
+
+        response = self.client.post(reverse('formsaurus:question', args=[
+                                    survey.id, first.id, submission.id]), {'answer': 'John'})
+        self.assertEqual(response.status_code, 302)
+        response = self.client.post(reverse('formsaurus:question', args=[
+                                    survey.id, first.id, submission.id]), {'answer': 'Paul'})
+        self.assertEqual(response.status_code, 302)
+        response = self.client.post(reverse('formsaurus:question', args=[
+                                    survey.id, second.id, submission.id]), {'answer': choices[1].id})
+        self.assertEqual(response.status_code, 302)
+
+        # Nothing written to the answer tables yet
+        self.assertEqual(0, ShortTextAnswer.objects.count())
+        self.assertEqual(0, MultipleChoiceAnswer.objects.count())
+        # But answers are readable from the log
+        answers = submission.answers()
+        self.assertEqual(2, len(answers))
+        self.assertEqual('Paul', submission.previous_answer(first).short_text)
+        self.assertEqual([choices[1].id], [c.id for c in submission.previous_answer(second).choices.all()])
+
+        self.assertEqual(2, get_answer_storage().compact(survey=survey))
+        self.assertEqual(1, ShortTextAnswer.objects.count())
+        self.assertEqual('Paul', ShortTextAnswer.objects.get().short_text)
+        answer = MultipleChoiceAnswer.objects.get()
+        self.assertEqual([choices[1].id], [c.id for c in answer.choices.all()])
+        # Log has been truncated
+        self.assertEqual(0, get_answer_storage().compact(survey=survey))
+        self.assertEqual(2, len(submission.answers()))
+
+        # Updating a compacted answer keeps the same row
+        response = self.client.post(reverse('formsaurus:question', args=[
+                                    survey.id, first.id, submission.id]), {'answer': 'George'})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(1, get_answer_storage().compact())
+        self.assertEqual(1, ShortTextAnswer.objects.count())
+        self.assertEqual('George', ShortTextAnswer.objects.get().short_text)
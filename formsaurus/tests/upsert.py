@@ -0,0 +1,64 @@
+from django.test import Client, TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from formsaurus.models import (
+    Choice, Survey, Submission, MultipleChoiceAnswer, ShortTextAnswer)
+from formsaurus.storage import upsert
+
+User = get_user_model()
+
+
+class AnswerUpsertTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            'john',
+            'lennon@thebeatles.com',
+            'johnpassword')
+        self.client = Client()
+
+    def test_retried_posts(self):
+        survey = Survey.objects.create(
+            name='Test Survey',
+            user=self.user,
+            published=True,
+        )
+        survey.add_short_text('Name?', required=True)
+        survey.add_multiple_choice(
+            "What's your favorite flavor?",
+            required=True,
+            choices=['Vanilla', 'Chocolate', 'Strawberry'],
+        )
+        response = self.client.get(reverse('formsaurus:survey', args=[survey.id]))
+        self.assertEqual(response.status_code, 302)
+        submission = Submission.objects.get(survey=survey)
+        first = survey.first_question
+        second = first.next_question
+        choices = Choice.objects.filter(question=second).order_by('position')
+
+        for name in ['John', 'John', 'Paul']:
+            response = self.client.post(reverse('formsaurus:question', args=[
+                                        survey.id, first.id, submission.id]), {'answer': name})
+            self.assertEqual(response.status_code, 302)
+        self.assertEqual(ShortTextAnswer.objects.filter(submission=submission).count(), 1)
+        answer = ShortTextAnswer.objects.get(submission=submission)
+        self.assertEqual(answer.short_text, 'Paul')
+
+        for choice in [choices[0], choices[1]]:
+            response = self.client.post(reverse('formsaurus:question', args=[
+                                        survey.id, second.id, submission.id]), {'answer': choice.id})
+            self.assertEqual(response.status_code, 302)
+        self.assertEqual(MultipleChoiceAnswer.objects.filter(submission=submission).count(), 1)
+        answer = MultipleChoiceAnswer.objects.get(submission=submission)
+        self.assertEqual(list(answer.choices.all()), [choices[1]])
+        self.assertEqual(submission.previous_answer(first).short_text, 'Paul')
+
+    def test_upsert_refreshes_instance(self):
+        survey = Survey.objects.create(name='Test Survey', user=self.user, published=True)
+        question = survey.add_short_text('Name?', required=True)
+        submission = Submission.objects.create(survey=survey)
+        first = upsert(ShortTextAnswer(question=question, submission=submission, short_text='John'))
+        second = upsert(ShortTextAnswer(question=question, submission=submission, short_text='Paul'))
+        self.assertEqual(second.pk, first.pk)
+        self.assertEqual(second.created_at, first.created_at)
+        self.assertEqual(ShortTextAnswer.objects.get(pk=first.pk).created_at, first.created_at)
@@ -0,0 +1,116 @@
+from django.test import Client, TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from formsaurus.models import Survey, Submission, Question, Choice, RuleSet, ChoiceCondition
+
+User = get_user_model()
+
+
+class SurveyVersionTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            'john',
+            'lennon@thebeatles.com',
+            'johnpassword')
+        self.client = Client()
+        self.survey = Survey.objects.create(
+            name='Test Survey',
+            user=self.user,
+        )
+        self.survey.add_hidden_field('source')
+        self.flavor = self.survey.add_multiple_choice(
+            "What's your favorite flavor?",
+            required=True,
+            randomize=True,
+            choices=['Vanilla', 'Chocolate'],
+        )
+        self.name = self.survey.add_short_text('Name?', required=True)
+        self.email = self.survey.add_email('Email?', required=True)
+        ruleset = RuleSet.objects.create(question=self.flavor, jump_to=self.email, index=0)
+        ChoiceCondition.objects.create(
+            ruleset=ruleset,
+            index=0,
+            tested=self.flavor,
+            match=ChoiceCondition.IS,
+            choice=Choice.objects.get(question=self.flavor, choice='Chocolate'),
+        )
+        self.survey.publish()
+
+    def test_new_version(self):
+        draft = self.survey.new_version()
+        self.assertFalse(draft.published)
+        self.assertEqual(draft.version, 2)
+        self.assertEqual(draft.previous_version_id, self.survey.id)
+        # Asking again edits the same draft
+        self.assertEqual(self.survey.new_version().id, draft.id)
+
+        # Same structure, new rows
+        questions = draft.questions
+        self.assertEqual([q.question for q in questions], [q.question for q in self.survey.questions])
+        self.assertEqual(Question.objects.filter(survey=draft).count(), 3)
+        self.assertTrue(questions[0].parameters.randomize)
+        self.assertEqual([c.choice for c in questions[0].choice_set.order_by('position')], ['Vanilla', 'Chocolate'])
+        self.assertEqual([f.name for f in draft.hiddenfield_set.all()], ['source'])
+        ruleset = questions[0].ruleset_set.get()
+        self.assertEqual(ruleset.jump_to_id, questions[2].id)
+        condition = ruleset.choicecondition_set.get()
+        self.assertEqual(condition.tested_id, questions[0].id)
+        self.assertEqual(condition.choice.question_id, questions[0].id)
+
+        # Editing the draft leaves the published version alone
+        draft.delete_question(questions[1])
+        draft.save()
+        self.assertEqual(len(self.survey.questions), 3)
+
+        # An answer in progress on the first version
+        self.client.get(reverse('formsaurus:survey', args=[self.survey.id]))
+        submission = Submission.objects.get(survey=self.survey)
+
+        draft.publish()
+        self.survey.refresh_from_db()
+        self.assertEqual(self.survey.superseded_by_id, draft.id)
+
+        # New respondents are sent to the latest version
+        response = self.client.get(reverse('formsaurus:survey', args=[self.survey.id]) + '?source=mail')
+        self.assertRedirects(response, reverse('formsaurus:survey', args=[draft.id]) + '?source=mail',
+                             target_status_code=302)
+
+        # The submission in progress finishes on its version
+        response = self.client.post(reverse('formsaurus:question', args=[
+                                    self.survey.id, self.flavor.id, submission.id]), {'answer': Choice.objects.get(question=self.flavor, choice='Vanilla').id})
+        self.assertEqual(response.status_code, 302)
+
+        # The next draft is copied from the latest version
+        third = self.survey.new_version()
+        self.assertEqual(third.version, 3)
+        self.assertEqual(third.previous_version_id, draft.id)
+        third.publish()
+        self.survey.refresh_from_db()
+        self.assertEqual(self.survey.superseded_by_id, third.id)
+
+    def test_new_version_view(self):
+        self.client.login(username='john', password='johnpassword')
+        response = self.client.get(reverse('formsaurus_manage:survey_new_version', args=[self.survey.id]))
+        draft = Survey.objects.get(previous_version=self.survey)
+        self.assertRedirects(response, reverse('formsaurus_manage:survey_wizard', args=[draft.id]))
+
+    def test_listed_once(self):
+        self.client.get(reverse('formsaurus:survey', args=[self.survey.id]))
+        draft = self.survey.new_version()
+        self.client.login(username='john', password='johnpassword')
+        # The draft is reached from the published version
+        response = self.client.get(reverse('formsaurus_manage:surveys'))
+        self.assertEqual([survey['id'] for survey in response.context['surveys']], [str(self.survey.id)])
+
+        draft.publish()
+        # Counted on the latest version once published
+        self.client.get(reverse('formsaurus:survey', args=[draft.id]))
+        response = self.client.get(reverse('formsaurus_manage:surveys'))
+        self.assertEqual([survey['id'] for survey in response.context['surveys']], [str(draft.id)])
+        self.assertEqual(response.context['surveys'][0]['submissions'], 2)
+
+        response = self.client.get(reverse('formsaurus_manage:survey_wizard', args=[self.survey.id]))
+        self.assertRedirects(response, reverse('formsaurus_manage:survey_wizard', args=[draft.id]))
+        response = self.client.get(reverse('formsaurus_manage:survey_wizard', args=[draft.id]))
+        self.assertEqual(response.context['submissions']['count'], 2)
@@ -0,0 +1,73 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from formsaurus.models import Survey, Submission
+from formsaurus.warmup import warm_survey
+
+User = get_user_model()
+
+
+@override_settings(FORMSAURUS_FRAGMENT_CACHE='default', FORMSAURUS_CHOICE_VARIANTS=3)
+class WarmupTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            'john',
+            'lennon@thebeatles.com',
+            'johnpassword')
+        self.client = Client()
+        self.survey = Survey.objects.create(
+            name='Test Survey',
+            user=self.user,
+        )
+        self.survey.add_short_text('Name?', required=True)
+        self.survey.add_multiple_choice(
+            "What's your favorite flavor?",
+            required=True,
+            randomize=True,
+            choices=['Vanilla', 'Chocolate', 'Strawberry'],
+        )
+        self.survey.publish()
+
+    def test_warm_survey(self):
+        # One fragment for the short text, one per choice order
+        self.assertEqual(warm_survey(self.survey, host='testserver', workers=1), 4)
+
+        self.client.get(reverse('formsaurus:survey', args=[self.survey.id]))
+        submission = Submission.objects.get(survey=self.survey)
+        for question in self.survey.questions:
+            response = self.client.get(reverse('formsaurus:question', args=[
+                                       self.survey.id, question.id, submission.id]))
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn(question.handler.template_name, [t.name for t in response.templates])
+
+    def test_command(self):
+        out = StringIO()
+        with self.settings(ALLOWED_HOSTS=['testserver']):
+            call_command('formsaurus_warmup', '--scheme', 'http', '--workers', '1', stdout=out)
+        self.client.get(reverse('formsaurus:survey', args=[self.survey.id]))
+        submission = Submission.objects.get(survey=self.survey)
+        question = self.survey.first_question
+        response = self.client.get(reverse('formsaurus:question', args=[self.survey.id, question.id, submission.id]))
+        self.assertNotIn(question.handler.template_name, [t.name for t in response.templates])
+
+    @override_settings(FORMSAURUS_WARMUP_TASK='formsaurus.tests.warmup.warmup_task')
+    def test_publish_schedules_warmup(self):
+        draft = self.survey.new_version()
+        self.client.login(username='john', password='johnpassword')
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.get(reverse('formsaurus_manage:survey_publish', args=[draft.id]))
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(scheduled, [(draft.id, 'default', 'http', 'testserver')])
+
+
+scheduled = []
+
+
+def warmup_task(survey_id, using, scheme, host):
+    scheduled.append((survey_id, using, scheme, host))
@@ -0,0 +1,49 @@
+from django.conf import settings
+
+#
+# Stateless respondents.
+#
+# With FORMSAURUS_STATELESS_RESPONDENTS enabled the respondent views never
+# read or write request.session: the submission a browser is answering is
+# remembered in a cookie signed with SECRET_KEY, one per survey, and
+# checked against the submission of every question URL. Any node sharing
+# the SECRET_KEY can serve any respondent, no session storage is needed.
+#
+
+SALT = 'formsaurus.submission'
+
+
+def stateless():
+    return getattr(settings, 'FORMSAURUS_STATELESS_RESPONDENTS', False)
+
+
+def max_age():
+    """Seconds a respondent has to complete a survey, 7 days by default"""
+    return getattr(settings, 'FORMSAURUS_SUBMISSION_TOKEN_MAX_AGE', 7 * 24 * 3600)
+
+
+def cookie_name(survey_id):
+    return f'formsaurus_{survey_id}'
+
+
+def remember_submission(response, submission):
+    response.set_signed_cookie(
+        cookie_name(submission.survey_id),
+        str(submission.id),
+        salt=SALT,
+        max_age=max_age(),
+        secure=settings.SESSION_COOKIE_SECURE,
+        httponly=True,
+        samesite='Lax',
+    )
+    return response
+
+
+def remembered_submission(request, survey_id):
+    """Id of the submission remembered for `survey_id`, None when missing, tampered or expired"""
+    return request.get_signed_cookie(cookie_name(survey_id), default=None, salt=SALT, max_age=max_age())
+
+
+def forget_submission(response, survey_id):
+    response.delete_cookie(cookie_name(survey_id), samesite='Lax')
+    return response
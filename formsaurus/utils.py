@@ -1,6 +1,7 @@
 from django.apps import apps
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
 
 def get_survey_model():
     try:
@@ -11,4 +12,16 @@ def get_survey_model():
     except ValueError:
         raise ImproperlyConfigured("FOMSAURUS_SURVEY_MODEL must be of the form 'app_label.model_name'")
     except LookupError:
-        raise ImproperlyConfigured("FOMSAURUS_SURVEY_MODEL refers to model '%s' that has not been installed" % settings.FOMSAURUS_SURVEY_MODEL)
\ No newline at end of file
+        raise ImproperlyConfigured("FOMSAURUS_SURVEY_MODEL refers to model '%s' that has not been installed" % settings.FOMSAURUS_SURVEY_MODEL)
+
+_answer_storages = {}
+
+def get_answer_storage():
+    """Returns the answer storage backend configured by FORMSAURUS_ANSWER_STORAGE"""
+    path = getattr(settings, 'FORMSAURUS_ANSWER_STORAGE', 'formsaurus.storage.ORMAnswerStorage')
+    if path not in _answer_storages:
+        try:
+            _answer_storages[path] = import_string(path)()
+        except ImportError:
+            raise ImproperlyConfigured("FORMSAURUS_ANSWER_STORAGE refers to '%s' that cannot be imported" % path)
+    return _answer_storages[path]
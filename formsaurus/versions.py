@@ -0,0 +1,165 @@
+import uuid
+
+from django.db import transaction
+from django.db.models import F, Q
+
+from formsaurus.counters import fold
+from formsaurus.models import (
+    QUESTION_TYPES, Question, HiddenField, Choice, RuleSet,
+    TextCondition, NumberCondition, ChoiceCondition, BooleanCondition, DateCondition)
+from formsaurus.sharding import place, sharding_enabled
+
+#
+# Survey versions.
+#
+# A published survey is an immutable version: its questions, parameters,
+# choices and logic jumps are never edited, so anything derived from them
+# can be cached under the survey id and version for as long as it lives.
+# Editing a published survey is copy-on-write: the whole structure is
+# copied, in bulk, to a draft of the next version which is edited and
+# previewed like any unpublished survey. Publishing the draft supersedes
+# the previous versions, new respondents are sent to the latest one while
+# submissions in progress finish on the version they started.
+#
+# The latest version counts the responses of the whole survey: publishing
+# a version adds the counters of the previous one to its own, and
+# submissions of superseded versions are counted on the latest version,
+# so the quota (max_completions) holds across versions.
+#
+
+CONDITION_MODELS = [TextCondition, NumberCondition, ChoiceCondition, BooleanCondition, DateCondition]
+
+
+def clone(instance, **changes):
+    """Unsaved copy of `instance` with a new id"""
+    values = {field.attname: getattr(instance, field.attname) for field in instance._meta.concrete_fields}
+    values.update(changes)
+    values['id'] = uuid.uuid4()
+    return type(instance)(**values)
+
+
+def copy_survey(survey):
+    """Copies the structure of `survey` to a new unpublished survey, the draft of its next version"""
+    using = survey._state.db
+    with transaction.atomic(using=using):
+        draft = clone(
+            survey,
+            published=False,
+            published_at=None,
+            first_question_id=None,
+            last_question_id=None,
+            version=survey.version + 1,
+            previous_version_id=survey.id,
+            superseded_by_id=None,
+            submission_count=0,
+            completed_count=0,
+        )
+        draft.save(using=using, force_insert=True)
+        if sharding_enabled():
+            # Versions of a survey stay on the same shard
+            place(f'survey:{draft.id}', using)
+
+        HiddenField.objects.using(using).bulk_create([
+            clone(field, survey_id=draft.id) for field in HiddenField.objects.using(using).filter(survey=survey)])
+
+        questions = list(Question.objects.using(using).filter(survey=survey))
+        question_ids = {question.id: uuid.uuid4() for question in questions}
+        copies = []
+        for question in questions:
+            copied = clone(question, survey_id=draft.id, next_question_id=question_ids.get(question.next_question_id))
+            copied.id = question_ids[question.id]
+            copies.append(copied)
+        Question.objects.using(using).bulk_create(copies)
+
+        types = set(question.question_type for question in questions)
+        for question_type in types:
+            handler = QUESTION_TYPES.get(question_type)
+            if handler is None:
+                continue
+            model = handler.parameters_model
+            model.objects.using(using).bulk_create([
+                clone(parameters, question_id=question_ids[parameters.question_id])
+                for parameters in model.objects.using(using).filter(question__survey=survey)])
+
+        choices = list(Choice.objects.using(using).filter(question__survey=survey))
+        choice_ids = {choice.id: uuid.uuid4() for choice in choices}
+        copies = []
+        for choice in choices:
+            copied = clone(choice, question_id=question_ids[choice.question_id])
+            copied.id = choice_ids[choice.id]
+            copies.append(copied)
+        Choice.objects.using(using).bulk_create(copies)
+
+        rulesets = list(RuleSet.objects.using(using).filter(question__survey=survey))
+        ruleset_ids = {ruleset.id: uuid.uuid4() for ruleset in rulesets}
+        copies = []
+        for ruleset in rulesets:
+            copied = clone(
+                ruleset, question_id=question_ids[ruleset.question_id], jump_to_id=question_ids[ruleset.jump_to_id])
+            copied.id = ruleset_ids[ruleset.id]
+            copies.append(copied)
+        RuleSet.objects.using(using).bulk_create(copies)
+
+        for model in CONDITION_MODELS:
+            copies = []
+            for condition in model.objects.using(using).filter(ruleset__question__survey=survey):
+                changes = {
+                    'ruleset_id': ruleset_ids[condition.ruleset_id],
+                    'tested_id': question_ids[condition.tested_id],
+                }
+                if model is ChoiceCondition:
+                    changes['choice_id'] = choice_ids[condition.choice_id]
+                copies.append(clone(condition, **changes))
+            model.objects.using(using).bulk_create(copies)
+
+        draft.first_question_id = question_ids.get(survey.first_question_id)
+        draft.last_question_id = question_ids.get(survey.last_question_id)
+        draft.save(using=using, update_fields=['first_question', 'last_question'])
+    return draft
+
+
+def latest_versions(queryset):
+    """
+    Filters a queryset of surveys down to one row per survey: the latest
+    published version, or the survey itself while it was never published.
+    Drafts of new versions are reached from their published version.
+    """
+    return queryset.filter(superseded_by=None).exclude(published=False, previous_version__isnull=False)
+
+
+def draft_version(survey):
+    """
+    The draft of the next version of `survey`, copied from its latest
+    published version when there is none yet.
+    """
+    model = type(survey)
+    using = survey._state.db
+    if not survey.published:
+        return survey
+    if survey.superseded_by_id is not None:
+        survey = model.objects.using(using).get(pk=survey.superseded_by_id)
+    draft = model.objects.using(using).filter(previous_version=survey, published=False).first()
+    if draft is not None:
+        return draft
+    return copy_survey(survey)
+
+
+def supersede(survey):
+    """
+    Marks the versions preceding the just published `survey` as superseded
+    by it, and carries their counters over to it.
+    """
+    if survey.previous_version_id is None:
+        return 0
+    model = type(survey)
+    using = survey._state.db
+    with transaction.atomic(using=using):
+        fold(using, [survey.previous_version_id])
+        previous = model.objects.using(using).select_for_update().get(pk=survey.previous_version_id)
+        model.objects.using(using).filter(pk=survey.pk).update(
+            submission_count=F('submission_count') + previous.submission_count,
+            completed_count=F('completed_count') + previous.completed_count)
+        survey.refresh_from_db(using=using, fields=survey.COUNTERS)
+        return model.objects.using(using).filter(
+            Q(pk=survey.previous_version_id) | Q(superseded_by_id=survey.previous_version_id)
+        ).update(superseded_by=survey)
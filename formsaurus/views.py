@@ -1,32 +1,58 @@
 import logging
 
+from django.conf import settings
 from django.shortcuts import render, get_object_or_404, redirect
 from django.http import JsonResponse, Http404
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.views.generic.base import View
 from django.urls import reverse
 from django.utils import timezone
+from django.utils.cache import add_never_cache_headers
 from django.db.models import Count, Sum
 
 from formsaurus.models import (Question, Submission, FilledField, QuestionParameter)
 from formsaurus.serializer import Serializer
+from formsaurus.conditional import conditional_page
+from formsaurus.fragments import render_question
+from formsaurus.gates import answerable, can_view
+from formsaurus.identity import identity_map, resolve_route
+from formsaurus.tokens import forget_submission, remember_submission, remembered_submission, stateless
 from formsaurus.utils import get_survey_model
+from formsaurus.sharding import ShardMixin
 
 logger = logging.getLogger('formsaurus')
 
 Survey = get_survey_model()
 
-class SurveyView(View):
+# Header sent by the respondent page when posting an answer in fragment mode
+FRAGMENT_HEADER = 'X-Formsaurus-Fragment'
+
+
+def fragment_mode():
+    return getattr(settings, 'FORMSAURUS_FRAGMENT_MODE', False)
+
+
+def fragment_requested(request):
+    return request.headers.get(FRAGMENT_HEADER) is not None
+
+class SurveyView(ShardMixin, View):
     """This is the entry to a survey."""
+    survey_url = 'formsaurus:survey'
     question_url = 'formsaurus:question'
     completed_url = 'formsaurus:completed'
     closed_url = 'formsaurus:closed'
 
     def get(self, request, survey_id):
         survey = get_object_or_404(Survey, pk=survey_id)
-        if not survey.can_view(request.user):
+        if survey.superseded_by_id is not None:
+            # New respondents answer the latest published version
+            url = reverse(self.survey_url, args=[survey.superseded_by_id])
+            if request.GET:
+                url = f'{url}?{request.GET.urlencode()}'
+            return redirect(url)
+        if not can_view(survey, request.user):
             raise Http404
-        if not survey.answerable:
+        if not answerable(survey):
             return redirect(self.closed_url, survey.id)
 
         question = survey.first_question
@@ -43,17 +69,44 @@ class SurveyView(View):
                 value=value,
             )
         if question is None:
-            return redirect(self.completed_url, survey.id, submission.id)
-        return redirect(self.question_url, survey.id, question.id, submission.id)
+            response = redirect(self.completed_url, survey.id, submission.id)
+        else:
+            response = redirect(self.question_url, survey.id, question.id, submission.id)
+        if stateless():
+            remember_submission(response, submission)
+        # Every visit starts a new submission
+        add_never_cache_headers(response)
+        return response
 
 
-class QuestionView(View):
+class QuestionView(ShardMixin, View):
     """This is used to handle a particular question."""
     question_url = 'formsaurus:question'
     completed_url = 'formsaurus:completed'
+    closed_url = 'formsaurus:closed'
     template_name = 'formsaurus/question.html'
+    fragment_template_name = 'formsaurus/question_fragment.html'
+
+    def resolve(self, request, survey_id, question_id, submission_id):
+        if stateless() and remembered_submission(request, survey_id) != str(submission_id):
+            # Not the submission this browser started
+            raise Http404
+        return resolve_route(request, survey_id, question_id, submission_id)
+
+    def completed(self, request):
+        if not stateless():
+            request.session['submission'] = None
+
+    def quota_reached(self, request, survey):
+        """The survey's quota filled up while this submission was answered"""
+        url = reverse(self.closed_url, args=[survey.id])
+        response = JsonResponse({'redirect': url}) if fragment_requested(request) else redirect(url)
+        if stateless():
+            forget_submission(response, survey.id)
+        return response
 
     def context(self, question, survey, submission):
+        identities = identity_map(self.request)
         context = {}
         if question.parameters.orientation is None or question.parameters.orientation == QuestionParameter.STACK:
             context['question_base'] = 'formsaurus/templates/base_stack.html'
@@ -63,50 +116,63 @@ class QuestionView(View):
             context['question_base'] = 'formsaurus/templates/base_split.html'
         elif question.parameters.orientation == QuestionParameter.BACKGROUND:
             context['question_base'] = 'formsaurus/templates/base_background.html'
-        context['survey'] = Serializer.survey(survey)
-        context['question'] = Serializer.question(question)
+        context['survey'] = identities.memoize(survey, 'to_dict', lambda: Serializer.survey(survey))
+        context['question'] = identities.memoize(question, 'to_dict', lambda: Serializer.question(question, submission))
         context['submission'] = Serializer.submission(
             submission) if submission is not None else None
         if question.question_type == Question.RATING and question.parameters.shape is not None:
-            context['question_shape'] = survey.rating_shapes[question.parameters.shape]
+            shapes = identities.memoize(survey, 'rating_shapes', lambda: survey.rating_shapes)
+            context['question_shape'] = shapes[question.parameters.shape]
+        context['fragment_mode'] = fragment_mode()
 
         return context
 
-    def get(self, request, survey_id, question_id, submission_id):
-        survey = get_object_or_404(Survey, pk=survey_id)
-        if not survey.can_view(request.user):
-            raise Http404
-        if not survey.answerable:
-            return redirect(self.closed_url, survey.id)
-
-        question = get_object_or_404(Question, pk=question_id)
-        if question.survey_id != survey_id:
-            raise Http404
-        submission = get_object_or_404(Submission, pk=submission_id)
-        if submission.survey_id != survey_id:
-            raise Http404
+    def page(self, request, question, survey, submission, error=False):
         context = self.context(question, survey, submission)
+        context['error'] = error
+        context['question_html'] = render_question(request, self.fragment_template_name, context)
         return render(request, self.template_name, context=context)
 
-    def post(self, request, survey_id, question_id, submission_id):
-        survey = get_object_or_404(Survey, pk=survey_id)
+    def fragment(self, request, question, survey, submission, error=False):
+        """
+        Answer to a fragment mode POST: the question to show next, rendered
+        without the page around it, for the page to swap in.
+        """
+        url = reverse(self.question_url, args=[survey.id, question.id, submission.id])
+        if question.parameters.video_url is not None:
+            # Video players are set up by inline scripts, load the whole page
+            return JsonResponse({'redirect': url})
+        context = self.context(question, survey, submission)
+        context['error'] = error
+        return JsonResponse({
+            'question': str(question.id),
+            'url': url,
+            'error': error,
+            'html': render_question(request, self.fragment_template_name, context),
+        })
 
-        question = get_object_or_404(Question, pk=question_id)
-        if question.survey_id != survey_id:
+    def get(self, request, survey_id, question_id, submission_id):
+        survey, question, submission = self.resolve(request, survey_id, question_id, submission_id)
+        if not can_view(survey, request.user):
             raise Http404
+        if not answerable(survey):
+            return redirect(self.closed_url, survey.id)
 
-        submission = get_object_or_404(Submission, pk=submission_id)
-        if submission.survey_id != survey_id:
-            raise Http404
+        return conditional_page(
+            request, survey, lambda: self.page(request, question, survey, submission),
+            variant=f'{question.id}:{submission.id}:{fragment_mode()}', form=True)
+
+    def post(self, request, survey_id, question_id, submission_id):
+        survey, question, submission = self.resolve(request, survey_id, question_id, submission_id)
 
         answer, error = submission.record_answer(
             question, request.POST, request.FILES)
         if answer is None:
             logger.debug("No answer recorded")
             if error is not None:
-                context = self.context(question, survey, submission)
-                context['error'] = True
-                return render(request, self.template_name, context=context)
+                if fragment_requested(request):
+                    return self.fragment(request, question, survey, submission, error=True)
+                return self.page(request, question, survey, submission, error=True)
         else:
             logger.debug(f"Recorded answer {answer.id}")
 
@@ -115,19 +181,28 @@ class QuestionView(View):
 
         # Find Next Question
         if next_question is None:
-            submission.complete()
-            request.session['submission'] = None
-            return redirect(self.completed_url, survey.id, submission.id)
+            if not submission.complete():
+                return self.quota_reached(request, survey)
+            self.completed(request)
+            url = reverse(self.completed_url, args=[survey.id, submission.id])
+            response = JsonResponse({'redirect': url}) if fragment_requested(request) else redirect(url)
+            if stateless():
+                forget_submission(response, survey.id)
+            return response
         else:
             if next_question.question_type == Question.THANK_YOU_SCREEN:
-                submission.complete()
-                request.session['submission'] = None
+                # The thank you screen is still shown for this submission
+                if not submission.complete():
+                    return self.quota_reached(request, survey)
+                self.completed(request)
 
             print(f"{question.id} -> {next_question.id}")
+            if fragment_requested(request):
+                return self.fragment(request, next_question, survey, submission)
             return redirect(self.question_url, survey.id, next_question.id, submission.id)
 
 
-class CompletedView(View):
+class CompletedView(ShardMixin, View):
     """Shown when a survey has been completed."""
     template_name = 'formsaurus/completed.html'
     site_url = None
@@ -136,27 +211,35 @@ class CompletedView(View):
     def get(self, request, survey_id, submission_id):
         survey = get_object_or_404(Survey, pk=survey_id)
         submission = get_object_or_404(Submission, pk=submission_id)
-        context = {}
-        context['survey'] = Serializer.survey(survey)
-        context['submission'] = Serializer.submission(submission)
-        context['site_url'] = reverse(
-            self.site_url) if self.site_url is not None else None
-        context['register_url'] = reverse(
-            self.register_url) if self.register_url is not None else None
-        return render(request, self.template_name, context=context)
+
+        def page():
+            context = {}
+            context['survey'] = Serializer.survey(survey)
+            context['submission'] = Serializer.submission(submission)
+            context['site_url'] = reverse(
+                self.site_url) if self.site_url is not None else None
+            context['register_url'] = reverse(
+                self.register_url) if self.register_url is not None else None
+            return render(request, self.template_name, context=context)
+
+        return conditional_page(request, survey, page, variant=f'completed:{submission.id}:{submission.is_preview}')
 
 
-class ClosedView(View):
+class ClosedView(ShardMixin, View):
     template_name = 'formsaurus/closed.html'
     site_url = None
     register_url = None
 
     def get(self, request, survey_id):
         survey = get_object_or_404(Survey, pk=survey_id)
-        context = {}
-        context['survey'] = Serializer.survey(survey)
-        context['site_url'] = reverse(
-            self.site_url) if self.site_url is not None else None
-        context['register_url'] = reverse(
-            self.register_url) if self.register_url is not None else None
-        return render(request, self.template_name, context=context)
+
+        def page():
+            context = {}
+            context['survey'] = Serializer.survey(survey)
+            context['site_url'] = reverse(
+                self.site_url) if self.site_url is not None else None
+            context['register_url'] = reverse(
+                self.register_url) if self.register_url is not None else None
+            return render(request, self.template_name, context=context)
+
+        return conditional_page(request, survey, page, variant='closed', public=True)
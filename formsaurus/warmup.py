@@ -0,0 +1,120 @@
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils.module_loading import import_string
+
+from formsaurus.fragments import fragment_cache, render_question
+from formsaurus.models import Submission
+from formsaurus.serializer import choice_variant, choice_variants
+from formsaurus.sharding import using_shard
+
+#
+# Cache warm-up.
+#
+# The first respondents of a campaign would otherwise all miss the
+# fragment cache at once, each loading the question, its parameters and
+# choices and rendering its templates. Warming a survey renders every
+# question, in each of its choice orders, into the fragment cache ahead
+# of them; it also loads the templates and compiles the answer parsers
+# of the process doing it. At most FORMSAURUS_WARMUP_WORKERS questions
+# are rendered at a time, to keep the load on the database bounded.
+#
+# Fragments are cached per host, warm the one respondents use: see the
+# --host option of formsaurus_warmup. Publishing stays cheap, it only
+# hands the survey over to FORMSAURUS_WARMUP_TASK when one is set, with
+# the host the survey was published from, see `schedule_warmup`.
+#
+
+
+def warmup_workers():
+    return max(1, getattr(settings, 'FORMSAURUS_WARMUP_WORKERS', 2))
+
+
+def default_host():
+    for host in settings.ALLOWED_HOSTS:
+        if not host.startswith('.') and '*' not in host:
+            return host
+    return 'localhost'
+
+
+def variant_submissions(survey, randomized):
+    """Unsaved submissions covering every choice order of a question, one when not randomized"""
+    if not randomized:
+        return [Submission(id=uuid.uuid4(), survey=survey, is_preview=not survey.published)]
+    submissions = {}
+    while len(submissions) < choice_variants():
+        submission = Submission(id=uuid.uuid4(), survey=survey, is_preview=not survey.published)
+        submissions.setdefault(choice_variant(submission.id), submission)
+    return list(submissions.values())
+
+
+def warm_question(survey, question, scheme='http', host=None):
+    """Renders `question` into the fragment cache, returns the number of fragments"""
+    from django.test import RequestFactory
+    from formsaurus.views import QuestionView
+
+    if question.handler is None or question.handler.template_name is None:
+        return 0
+    # Compiled once per process
+    question.parser
+    factory = RequestFactory()
+    randomized = bool(getattr(question.parameters, 'randomize', False))
+    count = 0
+    for submission in variant_submissions(survey, randomized):
+        # A request per variant, the identity map keeps one serialized question per request
+        request = factory.get('/', secure=scheme == 'https', HTTP_HOST=host or default_host())
+        view = QuestionView()
+        view.setup(request)
+        context = view.context(question, survey, submission)
+        context['error'] = False
+        render_question(request, view.fragment_template_name, context)
+        count = count + 1
+    return count
+
+
+def warm_survey(survey, scheme='http', host=None, workers=None):
+    """Warms every question of `survey`, returns the number of fragments rendered"""
+    if fragment_cache() is None:
+        return 0
+    workers = warmup_workers() if workers is None else workers
+    database = survey._state.db
+    questions = survey.questions
+
+    def run(question):
+        with using_shard(database):
+            return warm_question(survey, question, scheme=scheme, host=host)
+
+    if workers <= 1:
+        return sum(run(question) for question in questions)
+
+    def run_in_thread(question):
+        try:
+            return run(question)
+        finally:
+            connections.close_all()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return sum(executor.map(run_in_thread, questions))
+
+
+def warmup_task():
+    path = getattr(settings, 'FORMSAURUS_WARMUP_TASK', None)
+    return import_string(path) if path is not None else None
+
+
+def schedule_warmup(survey, scheme='http', host=None):
+    """
+    Hands a published survey over to the task configured with
+    FORMSAURUS_WARMUP_TASK once the current transaction commits, a dotted
+    path to a callable taking the survey id, its database, the scheme and
+    the host (e.g. a function queueing a job that calls `warm_survey`).
+    Without one, surveys are warmed by formsaurus_warmup only.
+    """
+    task = warmup_task()
+    if task is None or fragment_cache() is None:
+        return
+    survey_id = survey.pk
+    using = survey._state.db or 'default'
+    transaction.on_commit(lambda: task(survey_id, using, scheme, host), using=using)